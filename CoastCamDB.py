@@ -2,15 +2,45 @@
 Access the CoastCamDB through a command line interface. After establishing a connection to the database. The user will
 have the option to read data from the database, add data to the database, or create YAML calibration files that they can use
 for rectifying imagery.
+Run 'python CoastCamDB.py export <connection csv> <output folder> [site ids]' to export sites without the interactive
+prompts. See sites2csv().
 '''
 
 ##### IMPORTS #####
 from coastcamDBfuncs import *
 from coastcamDB_yaml_funcs import *
+import argparse
 
 
 ##### MAIN #####
 if __name__ == "__main__":
+
+    ###non-interactive mode for exporting many sites at once###
+    #ex: python CoastCamDB.py export connection.csv C:/exports/ --workers 8
+    if (len(sys.argv) > 1) and (sys.argv[1] == 'export'):
+
+        parser = argparse.ArgumentParser(prog='CoastCamDB.py export', description='Export sites from the CoastCamDB in parallel.')
+        parser.add_argument('connection_csv', help='csv file with the parameters to connect to the database')
+        parser.add_argument('output_path', help='folder where the sites/ folder of exported files is stored')
+        parser.add_argument('site_ids', nargs='*', help='ids of the sites to export. Every site is exported if none are given')
+        parser.add_argument('--workers', type=int, default=4, help='number of sites exported at the same time')
+        parser.add_argument('--format', default='csv', choices=['csv', 'parquet', 'feather'], help='file format')
+        args = parser.parse_args(sys.argv[2:])
+
+        site_ids = args.site_ids
+        if len(site_ids) == 0:
+            connection = DBConnectCSV(args.connection_csv)
+            site_ids = [row['id'] for row in fetch_rows(connection, "SELECT id FROM site ORDER BY seq")]
+            connection.close()
+
+        session = DBSession(args.connection_csv, poolSize=args.workers)
+        results = sites2csv(site_ids, args.output_path, session, maxWorkers=args.workers, fileFormat=args.format)
+        session.close()
+
+        #non-zero exit status if any site failed
+        if any(result['error'] != None for result in results):
+            sys.exit(1)
+        sys.exit(0)
     
     print('-------------------------------------------------')
     print('Welcome to the CoastCamDB command line interface!')
@@ -40,7 +70,9 @@ if __name__ == "__main__":
                     quit()
                     
                 try:
-                    connection = DBConnectCSV(csv_path.strip())
+                    #session reconnects on its own if the server drops the connection while the user is idle
+                    connection = DBSession(csv_path.strip(), poolSize=1)
+                    connection.ping()
                     isValidPath = True
                     
                 except:
@@ -93,7 +125,8 @@ if __name__ == "__main__":
 
                 try:
                     
-                    connection = pymysql.connect(host=host, user=user, port=port, passwd=password, db=dbname)
+                    connection = DBSession(host=host, port=port, dbname=dbname, user=user, password=password, poolSize=1)
+                    connection.ping()
                     
                     areValidParameters = True
                     
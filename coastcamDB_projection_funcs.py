@@ -0,0 +1,466 @@
+'''
+Funcs for projecting between world coordinates and image pixels with the camera parameters stored in the CoastCamDB. Every
+function works on all the cameras in a Parameter object (see filename2param()) and on large arrays of points at once, in
+chunks so memory use stays bounded. Distortion uses the radial/tangential model stored in camera kc: [d1, d2, d3, t1, t2].
+'''
+
+##### IMPORTS #####
+from coastcamDBfuncs import *
+
+
+##### CONSTANTS #####
+#number of points projected at a time
+default_chunk_size = 100000
+
+
+##### FUNCTIONS #####
+def stationParameter(stationID, connection, unix_time=None):
+    '''
+    Build a Parameter object for a station straight from getParameterDicts(), for when there is no image filename to pass to
+    filename2param().
+    Inputs:
+        stationID (string) - specifies the "id" field for the "station" table
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        unix_time (int) - optional unix time. If given, only the cameras active at that time are used
+    Outputs:
+        params (Parameter object) - parameters for the station. None if no cameras were found
+    '''
+
+    if unix_time == None:
+        result = getParameterDicts(stationID, connection)
+    else:
+        result = getParameterDicts(stationID, connection, useUnix=True, unix_time=int(unix_time))
+
+    if result == None:
+        return None
+
+    extrinsics, intrinsics, metadata, local_origin = result
+    params = Parameter(extrinsics=extrinsics, intrinsics=intrinsics, metadata=metadata, local_origin=local_origin)
+
+    return params
+
+
+def distortNormalized(x, y, coefficients):
+    '''
+    Apply radial and tangential distortion to normalized image coordinates ((U - c0U) / fx, (V - c0V) / fy). All inputs
+    broadcast against each other, so one set of coefficients can be used for every point or there can be one set per point.
+    Inputs:
+        x (ndarray) - normalized U coordinates
+        y (ndarray) - normalized V coordinates
+        coefficients (ndarray) - ... x 5 distortion coefficients [d1, d2, d3, t1, t2]
+    Outputs:
+        xd (ndarray) - distorted normalized U coordinates
+        yd (ndarray) - distorted normalized V coordinates
+    '''
+
+    coefficients = np.asarray(coefficients, dtype=float)
+    d1 = coefficients[..., 0]
+    d2 = coefficients[..., 1]
+    d3 = coefficients[..., 2]
+    t1 = coefficients[..., 3]
+    t2 = coefficients[..., 4]
+
+    r2 = x * x + y * y
+    radial = 1 + d1 * r2 + d2 * r2 * r2 + d3 * r2 * r2 * r2
+
+    xd = x * radial + 2 * t1 * x * y + t2 * (r2 + 2 * x * x)
+    yd = y * radial + t1 * (r2 + 2 * y * y) + 2 * t2 * x * y
+
+    return xd, yd
+
+
+def maxDistortionRadius2(coefficients):
+    '''
+    Find how far from the principal point the radial distortion model stays one-to-one. Past this radius the distorted radius
+    r * (1 + d1 r^2 + d2 r^4 + d3 r^6) starts decreasing, so points out there fold back into the image and can't be
+    undistorted. It is the smallest positive root of 1 + 3 d1 s + 5 d2 s^2 + 7 d3 s^3 = 0 with s = r^2.
+    Inputs:
+        coefficients (ndarray) - N x 5 distortion coefficients [d1, d2, d3, t1, t2]
+    Outputs:
+        r2max (ndarray) - N squared normalized radii. inf where the model is one-to-one everywhere
+    '''
+
+    coefficients = np.asarray(coefficients, dtype=float).reshape(-1, 5)
+
+    r2max = np.full(len(coefficients), np.inf)
+    for i, (d1, d2, d3, t1, t2) in enumerate(coefficients):
+        polynomial = np.trim_zeros([7 * d3, 5 * d2, 3 * d1, 1], 'f')
+        if (len(polynomial) < 2) or np.isnan(polynomial).any():
+            continue
+
+        roots = np.roots(polynomial)
+        roots = roots[(np.abs(roots.imag) < 1e-12) & (roots.real > 0)].real
+        if len(roots) > 0:
+            r2max[i] = roots.min()
+
+    return r2max
+
+
+def undistortNormalized(xd, yd, coefficients, tol=1e-12, maxIter=20):
+    '''
+    Remove radial and tangential distortion from normalized image coordinates. This is the inverse of distortNormalized(),
+    solved with Newton iterations on every point at once. Inputs broadcast the same way as distortNormalized().
+    Inputs:
+        xd (ndarray) - distorted normalized U coordinates
+        yd (ndarray) - distorted normalized V coordinates
+        coefficients (ndarray) - ... x 5 distortion coefficients [d1, d2, d3, t1, t2]
+        tol (float) - optional convergence tolerance on the normalized coordinates
+        maxIter (int) - optional maximum number of Newton iterations
+    Outputs:
+        x (ndarray) - undistorted normalized U coordinates
+        y (ndarray) - undistorted normalized V coordinates
+    '''
+
+    coefficients = np.asarray(coefficients, dtype=float)
+    d1 = coefficients[..., 0]
+    d2 = coefficients[..., 1]
+    d3 = coefficients[..., 2]
+    t1 = coefficients[..., 3]
+    t2 = coefficients[..., 4]
+
+    xd, yd = np.broadcast_arrays(np.asarray(xd, dtype=float), np.asarray(yd, dtype=float))
+
+    #the distorted point is a good first guess for moderate distortion
+    x = xd.copy()
+    y = yd.copy()
+    for i in range(0, maxIter):
+
+        r2 = x * x + y * y
+        radial = 1 + d1 * r2 + d2 * r2 * r2 + d3 * r2 * r2 * r2
+        dradial = d1 + 2 * d2 * r2 + 3 * d3 * r2 * r2
+
+        fx = x * radial + 2 * t1 * x * y + t2 * (r2 + 2 * x * x) - xd
+        fy = y * radial + t1 * (r2 + 2 * y * y) + 2 * t2 * x * y - yd
+
+        #jacobian of the distortion
+        jxx = radial + 2 * x * x * dradial + 2 * t1 * y + 6 * t2 * x
+        jxy = 2 * x * y * dradial + 2 * t1 * x + 2 * t2 * y
+        jyx = 2 * x * y * dradial + 2 * t1 * x + 2 * t2 * y
+        jyy = radial + 2 * y * y * dradial + 6 * t1 * y + 2 * t2 * x
+
+        determinant = jxx * jyy - jxy * jyx
+        step_x = (jyy * fx - jxy * fy) / determinant
+        step_y = (jxx * fy - jyx * fx) / determinant
+
+        x = x - step_x
+        y = y - step_y
+
+        if np.nanmax(np.abs(step_x) + np.abs(step_y), initial=0) < tol:
+            break
+
+    return x, y
+
+
+def world2image(params, xyz, cameras=None, distort=True, useLocal=False, chunkSize=default_chunk_size):
+    '''
+    Project world points into the images of every camera in a Parameter object.
+    Inputs:
+        params (Parameter object) - camera parameters, eg from filename2param() or stationParameter()
+        xyz (ndarray) - M x 3 array of world coordinates
+        cameras (list) - optional list of camera positions (0 based) in params to project into. Defaults to every camera
+        distort (boolean) - optional flag for applying lens distortion. If False the undistorted pixel is returned
+        useLocal (boolean) - optional flag for xyz being in the local grid coordinates of params.local_origin instead of world
+                             coordinates
+        chunkSize (int) - optional number of points projected at a time
+    Outputs:
+        U (ndarray) - N x M pixel column of each point in each camera
+        V (ndarray) - N x M pixel row of each point in each camera
+        valid (ndarray) - N x M boolean array, True where the point is in front of the camera, inside the image, and inside
+                          the part of the image where the distortion model is one-to-one (see maxDistortionRadius2())
+    '''
+
+    xyz = np.asarray(xyz, dtype=float).reshape(-1, 3)
+
+    if useLocal == True:
+        xy = params.local_origin_inverse @ np.vstack([xyz[:, 0], xyz[:, 1], np.ones(len(xyz))])
+        xyz = np.column_stack([xy[0], xy[1], xyz[:, 2]])
+
+    if cameras == None:
+        cameras = list(range(0, len(params.cameras)))
+
+    P = params.P[cameras]
+    R = params.R[cameras]
+    centers = params.camera_centers[cameras]
+    camera_values = params.cameras[cameras]
+
+    #N x 1 so they broadcast against the points
+    fx = camera_values['fx'][:, None]
+    fy = camera_values['fy'][:, None]
+    c0U = camera_values['c0U'][:, None]
+    c0V = camera_values['c0V'][:, None]
+    NU = camera_values['NU'][:, None]
+    NV = camera_values['NV'][:, None]
+    coefficients = params.distortion[cameras][:, None, :]
+    r2max = maxDistortionRadius2(params.distortion[cameras])[:, None]
+
+    U = np.empty((len(cameras), len(xyz)))
+    V = np.empty((len(cameras), len(xyz)))
+    valid = np.empty((len(cameras), len(xyz)), dtype=bool)
+
+    for start in range(0, len(xyz), chunkSize):
+        end = min(start + chunkSize, len(xyz))
+        chunk = xyz[start:end]
+
+        #N x 3 x 4 times 4 x M
+        homogeneous = np.vstack([chunk.T, np.ones(end - start)])
+        UVW = P @ homogeneous
+        u = UVW[:, 0, :] / UVW[:, 2, :]
+        v = UVW[:, 1, :] / UVW[:, 2, :]
+
+        #points past the one-to-one part of the distortion model fold back into the image, so they are never valid
+        x = (u - c0U) / fx
+        y = (v - c0V) / fy
+        foldFree = x * x + y * y < r2max
+
+        if distort == True:
+            xd, yd = distortNormalized(x, y, coefficients)
+            u = xd * fx + c0U
+            v = yd * fy + c0V
+
+        #third row of R is the viewing direction
+        depth = np.einsum('nk,nkm->nm', R[:, 2, :], chunk.T[None, :, :] - centers[:, :, None])
+
+        inside = (depth > 0) & foldFree
+        inside = inside & (u >= 0) & (v >= 0)
+        #NU/NV of -1 means the image size isn't known, so don't check the upper bound
+        inside = inside & ((NU < 0) | (u < NU)) & ((NV < 0) | (v < NV))
+
+        U[:, start:end] = u
+        V[:, start:end] = v
+        valid[:, start:end] = inside
+
+    return U, V, valid
+
+
+def image2world(params, camera, U, V, z=0.0, undistort=True, useLocal=False, chunkSize=default_chunk_size, tol=1e-12, maxIter=20):
+    '''
+    Project image pixels from one camera onto a horizontal plane in world coordinates. Distortion is removed first with
+    undistortNormalized().
+    Inputs:
+        params (Parameter object) - camera parameters, eg from filename2param() or stationParameter()
+        camera (int) - camera position (0 based) in params
+        U (ndarray) - pixel columns
+        V (ndarray) - pixel rows
+        z (float or ndarray) - optional elevation of the plane, or one elevation per pixel
+        undistort (boolean) - optional flag for removing lens distortion. Set to False if the pixels are already undistorted
+        useLocal (boolean) - optional flag for returning local grid coordinates of params.local_origin instead of world
+                             coordinates
+        chunkSize (int) - optional number of pixels projected at a time
+        tol (float) - optional convergence tolerance for the undistortion
+        maxIter (int) - optional maximum number of Newton iterations for the undistortion
+    Outputs:
+        xyz (ndarray) - M x 3 array of coordinates on the plane
+    '''
+
+    U = np.asarray(U, dtype=float).reshape(-1)
+    V = np.asarray(V, dtype=float).reshape(-1)
+    z = np.broadcast_to(np.asarray(z, dtype=float), U.shape)
+
+    P = params.P[camera]
+    camera_values = params.cameras[camera]
+    fx = camera_values['fx']
+    fy = camera_values['fy']
+    c0U = camera_values['c0U']
+    c0V = camera_values['c0V']
+    coefficients = params.distortion[camera]
+
+    xyz = np.empty((len(U), 3))
+
+    for start in range(0, len(U), chunkSize):
+        end = min(start + chunkSize, len(U))
+        u = U[start:end]
+        v = V[start:end]
+        zc = z[start:end]
+
+        if undistort == True:
+            x, y = undistortNormalized((u - c0U) / fx, (v - c0V) / fy, coefficients, tol=tol, maxIter=maxIter)
+            u = x * fx + c0U
+            v = y * fy + c0V
+
+        #with z known, u = P0.X / P2.X and v = P1.X / P2.X are two linear equations in world x and y
+        a11 = P[0, 0] - u * P[2, 0]
+        a12 = P[0, 1] - u * P[2, 1]
+        a21 = P[1, 0] - v * P[2, 0]
+        a22 = P[1, 1] - v * P[2, 1]
+        b1 = u * (P[2, 2] * zc + P[2, 3]) - (P[0, 2] * zc + P[0, 3])
+        b2 = v * (P[2, 2] * zc + P[2, 3]) - (P[1, 2] * zc + P[1, 3])
+
+        determinant = a11 * a22 - a12 * a21
+        xyz[start:end, 0] = (b1 * a22 - a12 * b2) / determinant
+        xyz[start:end, 1] = (a11 * b2 - b1 * a21) / determinant
+        xyz[start:end, 2] = zc
+
+    if useLocal == True:
+        xy = params.local_origin_transform @ np.vstack([xyz[:, 0], xyz[:, 1], np.ones(len(xyz))])
+        xyz[:, 0] = xy[0]
+        xyz[:, 1] = xy[1]
+
+    return xyz
+
+
+def loadGCPObservations(connection, siteID=None, cameraID=None, time_start=None, time_end=None):
+    '''
+    Load every usedgcp observation together with its gcp coordinates, geometry solution, and camera with one joined query.
+    Filters can be combined. Used by calibrationQA().
+    Inputs:
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        siteID (string) - optional site id. Only observations from cameras at this site are loaded
+        cameraID (string) - optional camera id. Only observations from this camera are loaded
+        time_start (int) - optional unix time. Only cameras still active at or after this time are loaded
+        time_end (int) - optional unix time. Only cameras active at or before this time are loaded
+    Outputs:
+        result (pandas Dataframe) - one row per usedgcp observation, ordered by geometry seq then usedgcp seq
+    '''
+
+    query = "SELECT usedgcp.seq AS usedgcpSequence, usedgcp.gcpID, usedgcp.geometrySequence, usedgcp.U, usedgcp.V, " \
+            "gcp.x AS gcpX, gcp.y AS gcpY, gcp.z AS gcpZ, " \
+            "geometry.cameraID, geometry.m, geometry.azimuth, geometry.tilt, geometry.roll, " \
+            "camera.x AS cameraX, camera.y AS cameraY, camera.z AS cameraZ, camera.K, camera.kc, " \
+            "camera.timeIN, camera.timeOUT, station.siteID " \
+            "FROM usedgcp " \
+            "JOIN gcp ON gcp.id = usedgcp.gcpID " \
+            "JOIN geometry ON geometry.seq = usedgcp.geometrySequence " \
+            "JOIN camera ON camera.id = geometry.cameraID " \
+            "JOIN station ON station.id = camera.stationID"
+
+    conditions = []
+    args = []
+    if siteID != None:
+        conditions.append("station.siteID = %s")
+        args.append(siteID)
+    if cameraID != None:
+        conditions.append("camera.id = %s")
+        args.append(cameraID)
+    if time_start != None:
+        conditions.append("camera.timeOUT >= %s")
+        args.append(int(time_start))
+    if time_end != None:
+        conditions.append("camera.timeIN <= %s")
+        args.append(int(time_end))
+
+    if len(conditions) > 0:
+        query = query + " WHERE " + " AND ".join(conditions)
+    query = query + " ORDER BY geometry.seq, usedgcp.seq"
+
+    print(query)
+
+    rows = fetch_rows(connection, query, args)
+    columns = ['usedgcpSequence', 'gcpID', 'geometrySequence', 'U', 'V', 'gcpX', 'gcpY', 'gcpZ', 'cameraID', 'm', 'azimuth',
+               'tilt', 'roll', 'cameraX', 'cameraY', 'cameraZ', 'K', 'kc', 'timeIN', 'timeOUT', 'siteID']
+    result = pd.DataFrame(rows, columns=columns)
+
+    return result
+
+
+def reprojectObservations(observations, method='angles'):
+    '''
+    Project the gcp of every observation into the image with the geometry solution it belongs to. Every observation can use a
+    different camera and solution, so this is done row by row in one set of array operations.
+    Inputs:
+        observations (pandas Dataframe) - observations from loadGCPObservations()
+        method (string) - optional projection model. 'angles' uses the camera K, kc, and position with the geometry azimuth,
+                          tilt, and roll, and applies lens distortion. 'dlt' uses the 11 DLT coefficients in geometry m.
+    Outputs:
+        U_model (ndarray) - projected pixel column of each observation
+        V_model (ndarray) - projected pixel row of each observation
+    '''
+
+    gcp = observations[['gcpX', 'gcpY', 'gcpZ']].to_numpy(dtype=float)
+
+    if method == 'dlt':
+        m = decodeArrays(list(observations['m']))
+        if m.ndim == 1:
+            m = np.full((len(observations), 11), np.nan)
+
+        denominator = m[:, 8] * gcp[:, 0] + m[:, 9] * gcp[:, 1] + m[:, 10] * gcp[:, 2] + 1
+        U_model = (m[:, 0] * gcp[:, 0] + m[:, 1] * gcp[:, 1] + m[:, 2] * gcp[:, 2] + m[:, 3]) / denominator
+        V_model = (m[:, 4] * gcp[:, 0] + m[:, 5] * gcp[:, 1] + m[:, 6] * gcp[:, 2] + m[:, 7]) / denominator
+
+        return U_model, V_model
+
+    if method != 'angles':
+        raise ValueError("ValueError: method must be 'angles' or 'dlt'")
+
+    K = decodeArrays(list(observations['K']))
+    if K.ndim == 1:
+        K = np.full((len(observations), 3, 3), np.nan)
+    kc = decodeArrays(list(observations['kc']))
+    if kc.ndim == 1:
+        kc = np.full((len(observations), 5), np.nan)
+
+    fx = K[:, 0, 0]
+    fy = K[:, 1, 1]
+    c0U = K[:, 0, 2]
+    c0V = K[:, 1, 2]
+
+    R = angles2R(observations['azimuth'].to_numpy(dtype=float), observations['tilt'].to_numpy(dtype=float), observations['roll'].to_numpy(dtype=float))
+    centers = observations[['cameraX', 'cameraY', 'cameraZ']].to_numpy(dtype=float)
+
+    #point in camera coordinates. Same projection as Parameter.P, one camera per row
+    camera_xyz = np.einsum('nij,nj->ni', R, gcp - centers)
+    x = camera_xyz[:, 0] / camera_xyz[:, 2]
+    y = -camera_xyz[:, 1] / camera_xyz[:, 2]
+
+    xd, yd = distortNormalized(x, y, kc)
+    U_model = xd * fx + c0U
+    V_model = yd * fy + c0V
+
+    return U_model, V_model
+
+
+def calibrationQA(connection, siteID=None, cameraID=None, time_start=None, time_end=None, method='angles', outlierThreshold=3.0):
+    '''
+    Check the geometry solutions for a site, camera, or time range against their GCP observations. Every usedgcp observation is
+    loaded in bulk (see loadGCPObservations()), its gcp is reprojected with its geometry solution, and the pixel residuals
+    are summarized per solution. A solution is flagged as an outlier when its RMS is more than outlierThreshold robust standard
+    deviations (1.4826 x median absolute deviation) above the median RMS of the solutions for the same camera.
+    Inputs:
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        siteID (string) - optional site id
+        cameraID (string) - optional camera id
+        time_start (int) - optional start of the time range (unix time)
+        time_end (int) - optional end of the time range (unix time)
+        method (string) - optional projection model, 'angles' or 'dlt'. See reprojectObservations()
+        outlierThreshold (float) - optional number of robust standard deviations for flagging a solution
+    Outputs:
+        points (pandas Dataframe) - one row per observation with the observed and projected pixel, the residuals dU and dV,
+                                    and the residual length 'error'
+        solutions (pandas Dataframe) - one row per geometry solution with the camera id, number of points, RMS of dU, dV, and
+                                       error, and the 'outlier' flag
+    '''
+
+    observations = loadGCPObservations(connection, siteID=siteID, cameraID=cameraID, time_start=time_start, time_end=time_end)
+
+    points = observations[['usedgcpSequence', 'geometrySequence', 'cameraID', 'gcpID', 'U', 'V']].copy()
+    if len(points) == 0:
+        solutions = pd.DataFrame(columns=['geometrySequence', 'cameraID', 'numPoints', 'rmsU', 'rmsV', 'rms', 'outlier'])
+        return points, solutions
+
+    U_model, V_model = reprojectObservations(observations, method=method)
+
+    points['U_model'] = U_model
+    points['V_model'] = V_model
+    points['dU'] = points['U'].to_numpy(dtype=float) - U_model
+    points['dV'] = points['V'].to_numpy(dtype=float) - V_model
+    points['error'] = np.hypot(points['dU'].to_numpy(), points['dV'].to_numpy())
+
+    #per-solution RMS with one bincount per value instead of a loop over solutions
+    codes, sequences = pd.factorize(points['geometrySequence'])
+    counts = np.bincount(codes, minlength=len(sequences))
+
+    solutions = pd.DataFrame({'geometrySequence': sequences})
+    solutions['cameraID'] = points.groupby(codes, sort=True)['cameraID'].first().to_numpy()
+    solutions['numPoints'] = counts
+    for column, name in [('dU', 'rmsU'), ('dV', 'rmsV'), ('error', 'rms')]:
+        squared = points[column].to_numpy() ** 2
+        solutions[name] = np.sqrt(np.bincount(codes, weights=squared, minlength=len(sequences)) / counts)
+
+    #robust outlier test within each camera
+    median = solutions.groupby('cameraID')['rms'].transform('median')
+    mad = (solutions['rms'] - median).abs().groupby(solutions['cameraID']).transform('median')
+    scale = 1.4826 * mad
+    solutions['outlier'] = (solutions['rms'] - median) > (outlierThreshold * scale.where(scale > 0, np.inf))
+
+    print("{} observations in {} solutions, {} flagged as outliers".format(len(points), len(solutions), int(solutions['outlier'].sum())))
+
+    return points, solutions
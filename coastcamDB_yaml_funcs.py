@@ -37,7 +37,8 @@ def createYAMLfiles(stationID, output_path, connection):
         stationID (string) - specifies the "id" field for the "station" table, which is also the "stationID" field in the
                              "camera" table
         output_path (string) - specifies the folder where the YAML files will be saved to
-        connection (pymysql.connections.Connection object) - Object representing connection to DB
+        connection (pymysql.connections.Connection object) - Object representing connection to DB. Can also be a connection to
+                                                              a local mirror from openMirror()
     Outputs:
         none (but YAML files are created)
     '''
@@ -45,17 +46,15 @@ def createYAMLfiles(stationID, output_path, connection):
     print(stationID, 'heyo')
     extrinsics, intrinsics, metadata, local_origin = getParameterDicts(stationID, connection)
 
-    query = "SELECT * FROM camera WHERE stationID = '{}'".format(stationID)
-    result = pd.read_sql(query, con=connection)
+    query = "SELECT id FROM camera WHERE stationID = %s ORDER BY seq"
     camera_list = []
-    for ID in result.get('id'):
-        camera_list.append(ID)
+    for row in fetch_rows(connection, query, (stationID,)):
+        camera_list.append(row['id'])
 
     #need to query station table before going through camera list
-    query = "SELECT shortName FROM station WHERE id = '{}'".format(stationID)
-    result = pd.read_sql(query, con=connection)
+    query = "SELECT shortName FROM station WHERE id = %s"
     #station short name for YAML file name formatting. 
-    short_name = result.get('shortName')[0]
+    short_name = fetch_scalar(connection, query, (stationID,))
 
     ###CREATE DESCRIPTOR DICTS###
     metadata_descriptor_dict = {}
@@ -7,12 +7,13 @@ are equivalent to the fields in the Db table
 ##### IMPORTS #####
 import pandas as pd
 import pymysql
+import pymysql.cursors
 import csv
+import gzip
 import datetime
 import os
 import sys
 import ast
-import random
 import numpy as np
 import pytz
 import mysql.connector
@@ -23,6 +24,72 @@ from mysql.connector import errorcode
 from tabulate import tabulate
 import dateutil
 from dateutil import tz
+import time
+import copy
+import collections
+import collections.abc
+import struct
+import threading
+import queue
+import contextlib
+import decimal
+import itertools
+import concurrent.futures
+import sqlite3
+import bisect
+import functools
+import urllib.request
+from pymysql.constants import FIELD_TYPE
+
+
+##### CONSTANTS #####
+#header values for arrays stored in BLOB columns. See np2blob()
+array_blob_magic = b'CCNP'
+array_blob_version = 1
+
+#format used when writing arrays to the DB. 'text' for np2text(), 'binary' for np2blob(). See np2db()
+array_storage_format = 'text'
+
+#shape of each array column. Used by the Parquet/Feather exporters for fixed-size list columns
+array_column_shapes = {'K': (3, 3), 'kc': (5,), 'm': (11,)}
+
+#parameterized statements built by buildStatement(), keyed by statement kind, table, and columns
+statement_cache = {}
+
+#per-camera parameters held by a Parameter object. They are stored in one structured numpy array (camera_dtype) instead
+#of a dictionary per camera. Integer fields store -1 and float fields store NaN for missing values
+extrinsic_fields = ['x', 'y', 'z', 'a', 't', 'r']
+intrinsic_fields = ['NU', 'NV', 'fx', 'fy', 'c0U', 'c0V', 'd1', 'd2', 'd3', 't1', 't2']
+camera_int_fields = ['NU', 'NV']
+camera_dtype = np.dtype([(field, 'i8' if field in camera_int_fields else 'f8') for field in extrinsic_fields + intrinsic_fields])
+
+#tables copied into a local SQLite mirror by createMirror(), and the columns that get an index there
+mirror_tables = ['site', 'station', 'camera', 'cameramodel', 'lensmodel', 'ip', 'gcp', 'geometry', 'usedgcp']
+mirror_index_columns = ['id', 'stationID', 'cameraID', 'siteID', 'gcpID', 'geometrySequence', 'timeIN', 'timeOUT']
+
+#SQLite column types for the MySQL column types. Anything not listed (TEXT/BLOB included) gets no type so values are
+#stored exactly as they come from the server
+mirror_column_types = {FIELD_TYPE.TINY: 'INTEGER', FIELD_TYPE.SHORT: 'INTEGER', FIELD_TYPE.LONG: 'INTEGER',
+                       FIELD_TYPE.LONGLONG: 'INTEGER', FIELD_TYPE.INT24: 'INTEGER', FIELD_TYPE.FLOAT: 'REAL',
+                       FIELD_TYPE.DOUBLE: 'REAL', FIELD_TYPE.DECIMAL: 'REAL', FIELD_TYPE.NEWDECIMAL: 'REAL'}
+
+#connections with an open UnitOfWork, keyed by connectionKey(connection). The value is how many units of work are nested on it
+open_units_of_work = {}
+
+#number of rows written per batched statement by Site.addSite2db(). See executeBatch()
+default_batch_size = 500
+
+#KeyIndex in use on a connection, keyed by connectionKey(connection). The check functions use it instead of querying. See keyExists()
+open_key_indexes = {}
+
+#StationIndex for each connection filenames are looked up on, keyed by id() of the connection (or of the DBSession, whose
+#threads all see the same DB). The value is (connection, StationIndex); holding the connection keeps its id from being reused
+#by a connection to a different DB (eg the MySQL server and a local mirror). See stationIndexFor()
+station_indexes = {}
+
+#prefix for the placeholder ids given to new fk rows before their real id is known. The rest of the placeholder is the row's
+#own AUTO_INCREMENT seq, so placeholders are unique without having to look them up first. See insertWithPlaceholderID()
+placeholder_id_prefix = 'tmp'
 
 
 ##### FUNCTIONS #####
@@ -115,7 +182,8 @@ def parseFilename(path, noLocal=False, timezone='utc'):
 def DBConnectCSV(filepath):
     '''
     Connect to the DB using parameters stored in a CSV. If the user doesn't want to use a csv
-    they can use the pymysql.connect() function directly.
+    they can use the pymysql.connect() function directly. For long running or multi-worker programs, use a DBSession
+    instead so connections are pooled and reconnected when the server drops them.
     Inputs:
         filepath (string) - filepath of the csv
     Outputs:
@@ -133,2345 +201,5092 @@ def DBConnectCSV(filepath):
     return connection
 
 
-def np2text(array):
+def adaptQuery(query, connection):
     '''
-    Serialize a numpy array into a text blob and return the text. Makes it so that the array can be inserted into the database.
-    ---assume to onlyt be working with 1D or 2D arrays---
+    Convert the %s placeholders used throughout this module into the ? placeholders used by sqlite3, when the connection is to
+    a local mirror created with createMirror(). Queries for any other connection are returned unchanged.
     Inputs:
-        array (numpy ndarray) - array to be inserted into the DB
+        query (string) - SQL query with %s placeholders
+        connection (pymysql.connections.Connection or sqlite3.Connection object) - object representing the connection to the DB
     Outputs:
-        blob (string) - array converted into formatted text
+        query (string) - SQL query with placeholders for the connection's driver
     '''
 
-    blob = np.array2string(array, precision=4)
-    blob = blob.replace('\n', ',')
+    if isinstance(connection, sqlite3.Connection):
+        return query.replace('%s', '?')
 
-    return blob
-        
+    return query
 
-def db2np(connection, table, column, ID='', seq=0):
+
+def createMirror(connection, mirror_path, tables=None, chunkSize=10000):
     '''
-    Fetch an array from a TEXT field in the CoastCamDB and return it as a numpy array.
-    ---assume to onlyt be working with 1D or 2D arrays---
+    Copy the CoastCamDB tables into a local SQLite file that can be used instead of the MySQL server for looking up parameters,
+    eg on machines that can't reach the server. Open the file with openMirror() and pass that connection to getParameterDicts(),
+    filename2param(), filenames2params(), createYAMLfiles(), or any other read function.
+    Rows are streamed from the server in chunks. The file is written next to mirror_path first and only replaces an existing
+    mirror once it is complete. Indexes are created on the id, stationID, cameraID, siteID, gcpID, geometrySequence, timeIN,
+    and timeOUT columns.
     Inputs:
         connection (pymysql.connections.Connection object) - object representing the connection to the DB
-        table (string) - table the function will pull from
-        column (string) - column the function will pull the TEXT array from
-        ID (string) - associated ID (row #) for the data field where the array lives
-        seq (int) - optional variable used if user wants pull data from an existing row. seq only used for
-                    geometry and usedgcp tables.
+        mirror_path (string) - path of the SQLite file to create
+        tables (list) - optional list of tables to copy. Defaults to mirror_tables.
+        chunkSize (int) - optional number of rows copied at a time
     Outputs:
-        array (ndarray) - numpy array pulled from the database
+        row_counts (dict) - number of rows copied for each table
     '''
-    
-    #grab the data from the text field
-    if (ID != ''):
 
-        check_id(ID, table, connection)
-        query = "SELECT {} FROM {} WHERE id = '{}'".format(column, table, ID)
+    if tables == None:
+        tables = mirror_tables
 
-    elif (seq != 0):
+    temp_path = mirror_path + '.tmp'
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
 
-        check_seq(seq, table, connection)
-        query = "SELECT {} FROM {} WHERE seq = {}".format(column, table, seq)
+    mirror = sqlite3.connect(temp_path)
+    row_counts = {}
+    try:
+        for table in tables:
 
-    else:
+            cursor = connection.cursor(pymysql.cursors.SSCursor)
+            try:
+                cursor.execute("SELECT * FROM {}".format(table))
 
-        raise NoIDError("NoIDError: No id or seq value given to specify what row to insert data into column {} in table '{}'".format(column, table))
-    #print(query)
+                columns = [description[0] for description in cursor.description]
+                column_types = [mirror_column_types.get(description[1], '') for description in cursor.description]
 
-    result = pd.read_sql(query, con=connection)
-    result = result.get(column)[0]
+                definitions = ', '.join([(column + ' ' + column_type).strip() for column, column_type in zip(columns, column_types)])
+                mirror.execute("CREATE TABLE {} ({})".format(table, definitions))
 
+                query = "INSERT INTO {} ({}) VALUES ({})".format(table, ', '.join(columns), ', '.join(['?'] * len(columns)))
 
-    #Number of dimnesions of array equal the number of ']' brackets at the end of the array.
-    #Split the text on '[' bracket and check the last element of the resulting list for ']'
-    dim_count = 0
-    split = result.split('[')
-    dim_count = split[-1].count(']')
+                row_count = 0
+                rows = cursor.fetchmany(chunkSize)
+                while len(rows) > 0:
+                    mirror.executemany(query, [coerceRow(row) for row in rows])
+                    row_count = row_count + len(rows)
+                    rows = cursor.fetchmany(chunkSize)
+            finally:
+                cursor.close()
 
-    if dim_count == 1:
-        #format for np.fromstring()
-        array = result.replace('[', '')
-        array = array.replace(']', '')
-        array = np.fromstring(array, dtype=float, sep=' ')
+            for column in mirror_index_columns:
+                if column in columns:
+                    mirror.execute("CREATE INDEX idx_{}_{} ON {} ({})".format(table, column, table, column))
 
-    elif dim_count == 2:        
-        #remove outside brackets from 2D array to make it easier to grab the rows
-        result = result[1 : -1]
-        rows = result.split(',')
+            row_counts[table] = row_count
+            print("Copied {} rows from {}".format(row_count, table))
 
-        array = []
-        for row in rows:
-            #Format string to use np.fromstring()
-            row = row.lstrip()
-            row = row.replace('[', '')
-            row = row.replace(']', '')
-            row = np.fromstring(row, dtype=float, sep=' ')
-            array.append(row)
+        #record when the mirror was made so users can tell how old it is
+        mirror.execute("CREATE TABLE mirrorinfo (name TEXT, value TEXT)")
+        mirror.execute("INSERT INTO mirrorinfo (name, value) VALUES (?, ?)", ('created', str(int(time.time()))))
+        mirror.commit()
+    finally:
+        mirror.close()
 
-        #stack list of 1D arrays into single 2D array
-        array = np.stack(array, axis=0)
+    os.replace(temp_path, mirror_path)
+    print("Saved mirror to", mirror_path)
 
-    return array
+    return row_counts
 
 
-def id_seq_match(ID, seq, table, connection):
+def openMirror(mirror_path):
     '''
-    Checks if the supplied id and seq match in the approporiate table in the database--a 'match' being that they belong
-    to the same row. Return True if match, False if not.
+    Open a local SQLite mirror created with createMirror() read-only. The returned connection can be passed as the connection
+    argument of the read functions in this module.
     Inputs:
-        ID (string) - id to check in the database table
-        seq (int) - seq to check in the database table
-        table (string) - name of the database table
-        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        mirror_path (string) - path of the SQLite file
     Outputs:
-        True/False - true if there is a match. False if not
+        connection (sqlite3.Connection object) - read-only connection to the mirror
     '''
 
-    query = "SELECT id FROM {} WHERE seq = {}".format(table, seq)
-            #ex: SELECT id FROM site WHERE seq = 1
-    try:
+    if not os.path.exists(mirror_path):
+        raise FileNotFoundError("FileNotFoundError: no mirror found at {}".format(mirror_path))
 
-        result = pd.read_sql(query, con=connection)
-        result = result.get('id')[0]
+    uri = 'file:{}?mode=ro'.format(urllib.request.pathname2url(os.path.abspath(mirror_path)))
+    connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
 
-        if result != ID:
-            raise MismatchIDError("MismatchIDError: given 'id' and 'seq' values in table '{}' are not in the same row".format(table)) 
+    return connection
 
-    except Exception as e:
-        sys.exit(e.message)
-        
 
-def check_id(ID, table, connection):
+def executeQuery(cursor, query, args=None):
     '''
-    Check if the given id value exists in the table. 
+    Execute a read query on a cursor from either a MySQL connection or a local SQLite mirror (see adaptQuery()).
     Inputs:
-        ID (string) - id value to check
-        table (string) - database table that that the id column exists in
-        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        cursor (pymysql.cursors.Cursor or sqlite3.Cursor object) - cursor to execute the query with
+        query (string) - SQL query with %s placeholders for the values
+        args (tuple or list) - optional values for the placeholders
     Outputs:
-        e (Exception) - return Exception if try/except hits exception
+        none
     '''
 
-    query = "SELECT id FROM {} WHERE id = '{}'".format(table, ID)
-            #ex: SELECT id FROM site WHERE id = 'EXXXXXX'
-    try:
-        
-        result = pd.read_sql(query, con=connection)
-        
-        #NULL return, no id found
-        if result.size == 0:
-            raise NoMatchIDError("NoMatchIDError: No 'id' {} found in table '{}'".format(ID, table))
-        
-    except Exception as e:
-        #sys.exit(e.message)
-        return e
+    if isinstance(cursor, sqlite3.Cursor):
+        query = query.replace('%s', '?')
+
+    if args is None:
+        cursor.execute(query)
+    else:
+        cursor.execute(query, args)
 
 
-def check_seq(seq, table, connection):
+def fetch_rows(connection, query, args=None):
     '''
-    Check if the given seq value exists in the table. 
+    Run a query with a raw cursor and return the rows as a list of dictionaries. Much lighter than pd.read_sql() when the
+    result is only used internally. Values are passed as bound parameters using %s placeholders.
+    ex: fetch_rows(connection, "SELECT id, shortName FROM station WHERE siteID = %s", (siteID,))
     Inputs:
-        seq (int) - seq value to check
-        table (string) - database table that that the id column exists in
         connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        query (string) - SQL query with %s placeholders for the values
+        args (tuple or list) - optional values for the placeholders
     Outputs:
-        none
+        rows (list) - list of dictionaries where the key is the column name and the value is the column value
     '''
 
-    query = "SELECT seq FROM {} WHERE seq = {}".format(table, seq)
-            #ex: SELECT seq FROM site WHERE seq = '1'
+    cursor = connection.cursor()
     try:
-        
-        result = pd.read_sql(query, con=connection)
-        
-        #NULL return, no seq found
-        if result.size == 0:
-            raise NoSeqError("NoSeqError: No 'seq' {} found in table '{}'".format(seq, table))
-        
-    except Exception as e:
-        sys.exit(e.message)
+        executeQuery(cursor, query, args)
+        columns = [description[0] for description in cursor.description]
+        rows = [dict(zip(columns, coerceRow(row))) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
 
+    return rows
 
-def check_linked_key(value, column, linked_table, connection):
+
+def fetch_scalar(connection, query, args=None):
     '''
-    Check that the value actually exists in the id/seq column of the linked table
+    Run a query with a raw cursor and return the first column of the first row.
+    ex: fetch_scalar(connection, "SELECT MAX(seq) FROM geometry")
     Inputs:
-        value (string or int) - seq/id value to be checked
-        column (string) - name of the fk column
-        linked_table (string) - table that the fk links to
         connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        query (string) - SQL query with %s placeholders for the values
+        args (tuple or list) - optional values for the placeholders
     Outputs:
-        e (Exception) - return execpetion if exception is raised
+        value (object) - value of the first cell. None if the query returned no rows or the cell is NULL.
     '''
 
-    if column == 'geometrySequence':
+    cursor = connection.cursor()
+    try:
+        executeQuery(cursor, query, args)
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
 
-        query = "SELECT seq FROM geometry WHERE seq = {}".format(value)
+    if row == None:
+        return None
 
-        print(query)
-        
-        try:
-            
-            result = pd.read_sql(query, con=connection)
-            
-            #NULL return, no seq found
-            if result.size == 0:
-                raise NoSeqError("NoSeqError: No 'seq' {} found in table '{}'".format(value, 'geometry'))
-        
-        except Exception as e:
-            return e
-            
-    else:
+    return coerceRow(row)[0]
 
-        query = "SELECT id FROM {} WHERE id = '{}'".format(linked_table, value)
 
-        print(query)
+def exists(connection, query, args=None):
+    '''
+    Run a query with a raw cursor and return whether it found any rows. The query should select as little as possible and
+    end with LIMIT 1.
+    ex: exists(connection, "SELECT 1 FROM site WHERE id = %s LIMIT 1", (siteID,))
+    Inputs:
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        query (string) - SQL query with %s placeholders for the values
+        args (tuple or list) - optional values for the placeholders
+    Outputs:
+        True/False - True if the query returned at least one row
+    '''
 
-        try:
-            
-            result = pd.read_sql(query, con=connection)
-            
-            #NULL return, no id found
-            if result.size == 0:
-                raise NoIDError("NoSeqError: No 'id' {} found in table '{}'".format(value, linked_table))
-        
-        except Exception as e:
-            return e
+    cursor = connection.cursor()
+    try:
+        executeQuery(cursor, query, args)
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
 
+    return row != None
 
-def yaml2dict(yamlfile):
-    """ Import contents of a YAML file as a dict
-    Args:
-        yamlfile (str): YAML file to read
-    Returns:
-        dict interpreted from YAML file
-    """
-    dictname = None
-    with open(yamlfile, "r") as infile:
-        try:
-            dictname = yaml.safe_load(infile)
-        except yaml.YAMLerror as exc:
-            print(exc)
-    return dictname
 
-def get_formatted_result(query, connection):
+def coerceRow(row):
     '''
-    given a SQL query, return the result formatted without numbered indices.
+    Convert DECIMAL values in a row from the cursor to floats, the same as pd.read_sql() does by default.
     Inputs:
-        query (string) - SQL query
-        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        row (tuple) - row returned by a cursor
     Outputs:
-        result (pandas Dataframe) - resulting dataframe returned from the SQl query
+        row (list) - row with decimal.Decimal values converted to float
     '''
 
-    result = pd.read_sql(query, con=connection)
-    blankIndex = [''] * len(result)
-    result.index = blankIndex
-    return result
-        
+    return [float(value) if isinstance(value, decimal.Decimal) else value for value in row]
+
 
-def displaySite(siteID, connection):
+def buildStatement(kind, table, columns, where_columns=[]):
     '''
-    Display all the columns for a site given a site id. Use the site id to get 'cascading' foreign keys for every table below
-    'site' in the coastcamdb hierarchy.Returns a list of tuples where the first element of the tuple is the table name and the
-    second element is the table dataframe.
+    Build a parameterized INSERT or UPDATE statement with %s placeholders for every value. Statements are cached by their shape,
+    so the same text is reused for every row written to the same columns.
+    ex: buildStatement('insert', 'camera', ['stationID', 'id']) -> "INSERT INTO camera (stationID, id) VALUES (%s, %s)"
+        buildStatement('update', 'camera', ['x'], ['id']) -> "UPDATE camera SET x = %s WHERE id = %s"
     Inputs:
-        siteID (string) - id for site in the 'site' table
-        connection (pymysql.connections.Connection object) - object representing the connection to the DB
-        df_list (list) - list of tuples where the first element of the tuple is the table name and the
-                         second element is the table dataframe.
-    outputs:
-        df_list (list) - list of Pandas dataframe obuects, one for each table corresponding to the site.
+        kind (string) - 'insert' or 'update'
+        table (string) - name of the table
+        columns (list) - names of the columns being written
+        where_columns (list) - for 'update', names of the columns in the WHERE clause. Conditions are joined with AND.
+    Outputs:
+        query (string) - SQL statement. Values are passed separately as bound parameters in the same order as the columns,
+                         followed by the where columns.
     '''
 
-    pd.set_option('display.width' ,160)
-    pd.set_option('display.max_columns', 40)
-
-    df_list = []
+    key = (kind, table, tuple(columns), tuple(where_columns))
+    if key in statement_cache:
+        return statement_cache[key]
 
-    #site
-    query = "SELECT * FROM site WHERE id = '{}'".format(siteID)
-    result = get_formatted_result(query, connection)
-    print('---SITE---')
-    print(result)
+    if kind == 'insert':
+        query = "INSERT INTO {} ({}) VALUES ({})".format(table, ', '.join(columns), ', '.join(['%s'] * len(columns)))
+    elif kind == 'update':
+        query = "UPDATE {} SET {}".format(table, ', '.join([column + ' = %s' for column in columns]))
+        if len(where_columns) > 0:
+            query = query + " WHERE " + ' AND '.join([column + ' = %s' for column in where_columns])
+    else:
+        raise ValueError("ValueError: statement kind must be 'insert' or 'update'")
 
-    #don't add empty tables to the dataframe list
-    if not result.empty:
-        df_tuple = ('site', result)
-        df_list.append(df_tuple)
+    statement_cache[key] = query
 
-    #station
-    query = "SELECT * FROM station WHERE siteID = '{}'".format(siteID)
-    result = get_formatted_result(query, connection)
-    stationID = result.get('id')
-    try:
-        if result.empty:
-            raise Exception
-        print('\n---STATION---')
-        print(result)
+    return query
 
-        if not result.empty:
-            df_tuple = ('station', result)
-            df_list.append(df_tuple)
-    except:
-        pass
 
-    #camera
-    camera_result = []
-    try:
-        for ID in stationID:
-            query = "SELECT * FROM camera WHERE stationID = '{}'".format(ID)
-            camera_result.append(pd.read_sql(query, con=connection))
-        #account for multiple stations. Concatenate all results into 1 dataframe
-        if len(stationID) > 1:
-            result = pd.concat(camera_result, axis=0)
-        else:
-            result = camera_result[0]
-        cameraID = result.get('id')
-        modelID = result.get('modelID')
-        lensmodelID = result.get('lensmodelID')
-        li_IP = result.get('li_IP')
-        blankIndex = [''] * len(result)
-        result.index = blankIndex
-        print('\n---CAMERA---')
-        print(result)
+def statementTable(query):
+    '''
+    Get the table a write statement writes to.
+    ex: statementTable("UPDATE station SET shortName = %s WHERE id = %s") -> 'station'
+    Inputs:
+        query (string) - INSERT, REPLACE, UPDATE or DELETE statement
+    Outputs:
+        table (string) - lower case name of the table. None if the statement isn't one of those writes.
+    '''
 
-        if not result.empty:
-            df_tuple = ('camera', result)
-            df_list.append(df_tuple)
-    except:
-        pass
+    words = query.replace('`', ' ').replace('(', ' ').split()
+    verbs = [word.upper() for word in words]
 
-    #cameramodel
-    cameramodel_result = []
-    try:
-        for ID in modelID:
-            query = "SELECT * FROM cameramodel WHERE id = '{}'".format(ID)
-            cameramodel_result.append(pd.read_sql(query, con=connection))
-        #account for multiple stations. Concatenate all results into 1 dataframe
-        if len(modelID) > 1:
-            result = pd.concat(cameramodel_result, axis=0)
-            result = result.drop_duplicates(subset='id', keep='first')
-        else:
-            result = cameramodel_result[0]
-        print('\n---CAMERAMODEL---')
-        print(result)
+    if (len(words) > 1) and (verbs[0] == 'UPDATE'):
+        return words[1].lower()
 
-        if not result.empty:
-            df_tuple = ('cameramodel', result)
-            df_list.append(df_tuple)
-    except:
-        pass
+    if (len(words) > 2) and (verbs[0] in ['INSERT', 'REPLACE', 'DELETE']):
+        for i in range(1, len(words) - 1):
+            if verbs[i] in ['INTO', 'FROM']:
+                return words[i + 1].lower()
 
-    #lensmodel
-    lensmodel_result = []
-    try:
-        for ID in lensmodelID:
-            query = "SELECT * FROM lensmodel WHERE id = '{}'".format(ID)
-            lensmodel_result.append(pd.read_sql(query, con=connection))
-        if len(lensmodelID) > 1:
-            result = pd.concat(lensmodel_result, axis=0)
-            result = result.drop_duplicates(subset='id', keep='first')
-        else:
-            result = lensmodel_result[0]
-        print('\n---LENSMODEL---')
-        print(result)
+    return None
 
-        if not result.empty:
-            df_tuple = ('lensmodel', result)
-            df_list.append(df_tuple)
-    except:
-        pass
 
-    #ip
-    li_IP_result = []
-    try:
-        for ID in li_IP:
-            query = "SELECT * FROM ip WHERE id = '{}'".format(ID)
-            li_IP_result.append(pd.read_sql(query, con=connection))
-        if len(li_IP) > 1:
-            result = pd.concat(li_IP_result, axis=0)
-            result = result.drop_duplicates(subset='id', keep='first')
-        else:
-            result = li_IP_result[0]
-        print('\n---IP---')
-        print(result)
+def value2db(value):
+    '''
+    Convert a value into something the driver can send as a bound parameter. Arrays are serialized with np2db() and numpy
+    scalars are converted to the matching python type.
+    Inputs:
+        value (object) - value to be written to the DB
+    Outputs:
+        value (object) - value ready to be passed to cursor.execute()
+    '''
 
-        if not result.empty:
-            df_tuple = ('ip', result)
-            df_list.append(df_tuple)
-    except:
-        pass
-    
-    #gcp
-    query = "SELECT * FROM gcp WHERE siteID = '{}'".format(siteID)
-    result = get_formatted_result(query, connection)
-    gcpID = result.get('id')
-    try:
-        if result.empty:
-            raise Exception
-        print('\n---GCP---')
-        print(result)
+    if isinstance(value, np.ndarray):
+        return np2db(value)
+    if isinstance(value, np.generic):
+        return value.item()
 
-        if not result.empty:
-            df_tuple = ('gcp', result)
-            df_list.append(df_tuple)
-    except:
-        pass
+    return value
 
-    #geometry
-    geometry_result = []
-    try:
-        for ID in cameraID:
-            query = "SELECT * FROM geometry WHERE cameraID = '{}'".format(ID)
-            geometry_result.append(pd.read_sql(query, con=connection))
-        if len(cameraID) > 1:
-            result = pd.concat(geometry_result, axis=0)
-            result = result.drop_duplicates(subset='seq', keep='first')
-        else:
-            result = geometry_result[0]
-        geometrySequence = result.get('seq')
-        print('\n---GEOMETRY---')
-        print(result)
 
-        if not result.empty:
-            df_tuple = ('geometry', result)
-            df_list.append(df_tuple)
-    except:
-        pass
+def np2db(array):
+    '''
+    Serialize a numpy array for an array column (K, kc, m) using the storage format set by array_storage_format. 'text' uses
+    np2text() and 'binary' uses np2blob(). Only switch to 'binary' once the columns have been converted with
+    migrateArrays2blob(), since a TEXT column can't hold the binary format.
+    Inputs:
+        array (numpy ndarray) - array to be inserted into the DB
+    Outputs:
+        value (string or bytes) - serialized array
+    '''
 
-    #usedgcp
-    try:
-        usedgcp_result = []
-        for ID in gcpID:
-            for seq in geometrySequence:
-                query = "SELECT * FROM usedgcp WHERE gcpID = '{}' AND geometrySequence = {}".format(ID, seq)
-                usedgcp_result.append(pd.read_sql(query, con=connection))
-        if (len(gcpID) > 1) or (len(geometrySequence) > 1):
-            result = pd.concat(usedgcp_result, axis=0)
-            result = result.drop_duplicates(subset='seq', keep='first')
-        else:
-            result = usedgcp_result[0]
-        print('\n---USEDGCP---')
-        print(result)
+    if array_storage_format == 'binary':
+        return np2blob(array)
 
-        if not result.empty:
-            df_tuple = ('usedgcp', result)
-            df_list.append(df_tuple)
-    except:
-        pass
+    return np2text(array)
 
-    return df_list
 
-def getParameterDicts(stationID, connection, useUnix=False, unix_time=None):
+def executeStatement(connection, query, args=None, cursor=None, commit=True):
     '''
-    Given a stationID, return parameter dictionaries for extrinsics, intrinsics, metadata, and local origin.
-    Extrinsics, intrinsics, and metadata will be stored as lists, where each item in the list is a dictionary of
-    parameters. There will be one dictionary for each camera at the station.
+    Execute a parameterized write statement and commit it. Errors from the DB are printed instead of raised, the same as the rest
+    of the write path. Pass a cursor to reuse it across several statements.
     Inputs:
-        stationID (string) - specifies the "id" field for the "station" table, which is also the "stationID" field in the
-                             "camera" table
-        connection (pymysql.connections.Connection object) - Object representing connection to DB
-        useUnix (boolean) - flag for specifying if a unix time should be used to narrow the data the user is looking for
-        unix_time (int) - timestamp of the filename needed for searching relevant data
-        
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        query (string) - SQL statement with %s placeholders for the values
+        args (tuple or list) - optional values for the placeholders
+        cursor (pymysql.cursors.Cursor object) - optional cursor to execute the statement with
+        commit (boolean) - flag for committing after the statement. Set to False when the caller commits once per batch.
     Outputs:
-        extrinsics (list) - list of extrinsic paramater dictionaries. One dictionary for each camera.
-        intrinsics (list) - list of intrinsic parameter dictionaries. One dictionary for each camera.
-        metadata (list) - list of metadata parameter dictionaries. One dictionary for each camera.
-        local_origin (dictionary) - dictionary of local origin parameters
+        rowcount (int) - number of rows affected by the statement. 0 if the statement failed.
     '''
 
-    #accounting for unix time
-    if useUnix == True:
-        if unix_time != None:
-            query = "SELECT * FROM camera WHERE stationID = '{}' AND timeIN <= {} AND timeOUT >= {} ".format(stationID, unix_time, unix_time)
-        else:
-            query = "SELECT * FROM camera WHERE stationID = '{}'".format(stationID)
-    else:
-        query = "SELECT * FROM camera WHERE stationID = '{}'".format(stationID)
-
-    print(query)
+    closeCursor = False
+    if cursor == None:
+        cursor = connection.cursor()
+        closeCursor = True
 
-    result = pd.read_sql(query, con=connection)
-    camera_list = []
-    for ID in result.get('id'):
-        camera_list.append(ID)
+    if statementTable(query) == 'station':
+        invalidateStationIndexes()
 
-    #lists of dictionaries. One dictionary in every list for each camera.
-    metadata_dict_list = []
-    extrinsic_dict_list = []
-    intrinsic_dict_list = []
+    rowcount = 0
+    try:
+        rowcount = cursor.execute(query, args)
+        if commit == True:
+            commitWrite(connection)
+    except (mysql.connector.Error, pymysql.MySQLError) as err:
+        #inside a unit of work the whole transaction has to be rolled back, so let the error through
+        if inUnitOfWork(connection):
+            raise
+        print(err)
+    finally:
+        if closeCursor == True:
+            cursor.close()
+
+    return rowcount
+
+
+def executeBatch(connection, query, arg_list, batchSize=None, cursor=None):
+    '''
+    Execute one parameterized write statement for many rows with cursor.executemany(), committing once per batch. For an
+    INSERT ... VALUES statement the driver sends each batch as a single multi-row INSERT. Errors from the DB are printed and the
+    rest of the rows are still written.
+    Inputs:
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        query (string) - SQL statement with %s placeholders for the values
+        arg_list (list) - list of argument tuples/lists, one per row
+        batchSize (int) - number of rows per executemany() call and commit. Defaults to default_batch_size.
+        cursor (pymysql.cursors.Cursor object) - optional cursor to execute the statements with
+    Outputs:
+        rowcount (int) - total number of rows affected
+    '''
 
-    #need to query station table before going through camera list
-    query = "SELECT siteID, name FROM station WHERE id = '{}'".format(stationID)
-    result = pd.read_sql(query, con=connection)
-    #siteID for querying site table 
-    siteID = result.get('siteID')[0]
-    #name for metadata dict
-    name = result.get('name')[0]
+    if batchSize == None:
+        batchSize = default_batch_size
 
-    if len(camera_list) != 0:
+    if statementTable(query) == 'station':
+        invalidateStationIndexes()
 
-        for i in range(0, len(camera_list)):
+    closeCursor = False
+    if cursor == None:
+        cursor = connection.cursor()
+        closeCursor = True
 
-            ###GET METADATA###
-            #yaml_metadata_dict is dict of YAML field names and corresponding values
-            metadata_dict = {}
+    rowcount = 0
+    try:
+        for i in range(0, len(arg_list), batchSize):
+            try:
+                rowcount = rowcount + cursor.executemany(query, arg_list[i : i + batchSize])
+                commitWrite(connection)
+            except (mysql.connector.Error, pymysql.MySQLError) as err:
+                if inUnitOfWork(connection):
+                    raise
+                print(err)
+    finally:
+        if closeCursor == True:
+            cursor.close()
 
-            metadata_dict['name'] = name
+    return rowcount
 
-            query = "SELECT cameraSN, cameraNumber,timeIN, li_IP FROM camera WHERE id = '{}'".format(camera_list[i])
-            result = pd.read_sql(query, con=connection)
-            metadata_dict['serial_number'] = result.get('cameraSN')[0]
-            metadata_dict['camera_number'] = result.get('cameraNumber')[0]
-            metadata_dict['calibration_date'] = result.get('timeIN')[0]
 
-            #key for accessing IP table
-            IP = result.get('li_IP')[0]
+def executeInsert(connection, query, args=None, cursor=None, commit=True):
+    '''
+    Execute a parameterized INSERT and return the seq the server generated for the new row. The value is read from the cursor
+    (LAST_INSERT_ID() for this connection), so it is correct even when other writers are inserting into the same table.
+    Inputs:
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        query (string) - INSERT statement with %s placeholders for the values
+        args (tuple or list) - optional values for the placeholders
+        cursor (pymysql.cursors.Cursor object) - optional cursor to execute the statement with
+        commit (boolean) - flag for committing after the statement. Set to False when the caller commits once per batch.
+    Outputs:
+        seq (int) - AUTO_INCREMENT value of the new row. None if the insert failed.
+    '''
 
-            metadata_dict['coordinate_system'] = 'geo'
+    closeCursor = False
+    if cursor == None:
+        cursor = connection.cursor()
+        closeCursor = True
 
-            metadata_dict_list.append(metadata_dict)
-            
+    if statementTable(query) == 'station':
+        invalidateStationIndexes()
 
-            ###GET INTRINSICS###
-            intrinsic_dict = {}
+    seq = None
+    try:
+        cursor.execute(query, args)
+        seq = cursor.lastrowid
+        if commit == True:
+            commitWrite(connection)
+    except (mysql.connector.Error, pymysql.MySQLError) as err:
+        if inUnitOfWork(connection):
+            raise
+        print(err)
+    finally:
+        if closeCursor == True:
+            cursor.close()
+
+    return seq
+
+
+def executeInsertBatch(connection, table, columns, arg_list, batchSize=None, cursor=None, onDuplicate=False):
+    '''
+    Insert many rows with one multi-row INSERT ... VALUES statement per batch and return the seq generated for every row. The
+    server gives the rows of a single multi-row INSERT (a "simple insert") consecutive AUTO_INCREMENT values, so each row's seq
+    is the first id of its statement (cursor.lastrowid) plus its position in the batch. That only holds when
+    @@auto_increment_increment is 1, which is checked before anything is written.
+    With onDuplicate, rows whose unique key already exists update the existing row instead, so lastrowid can't be used. The
+    seqs are then read back by id if id is one of the columns, and are None otherwise.
+    Inputs:
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        table (string) - name of the table
+        columns (list) - names of the columns being written
+        arg_list (list) - list of argument tuples/lists, one per row, in the same order as the columns
+        batchSize (int) - number of rows per statement and commit. Defaults to default_batch_size.
+        cursor (pymysql.cursors.Cursor object) - optional cursor to execute the statements with
+        onDuplicate (boolean) - optional flag for adding ON DUPLICATE KEY UPDATE for every column
+    Outputs:
+        seq_list (list) - seq of every row in the same order as arg_list. None for rows in a batch that failed, or if the seqs
+                          can't be known (see onDuplicate).
+    '''
 
-            query = "SELECT width, height FROM ip WHERE id = '{}'".format(IP)
-            result = pd.read_sql(query, con=connection)
-            intrinsic_dict['NU'] = result.get('width')[0]
-            intrinsic_dict['NV'] = result.get('height')[0]
+    if batchSize == None:
+        batchSize = default_batch_size
 
-            #get matrices for rest of intrinsics
-            K = db2np(connection, 'camera' , 'K', ID=camera_list[i])
-            kc = db2np(connection, 'camera', 'kc', ID=camera_list[i])
-            intrinsic_dict['fx'] = K[0][0]
-            intrinsic_dict['fy'] = K[1][1]
-            intrinsic_dict['c0U'] = K[0][2]
-            intrinsic_dict['c0V'] = K[1][2]
-            intrinsic_dict['d1'] = kc[0]
-            intrinsic_dict['d2'] = kc[1]
-            intrinsic_dict['d3'] = kc[2]
-            intrinsic_dict['t1'] = kc[3]
-            intrinsic_dict['t2'] = kc[4]
+    if (len(arg_list) > 0) and (onDuplicate == False):
+        increment = fetch_scalar(connection, "SELECT @@auto_increment_increment")
+        try:
+            if int(increment) != 1:
+                raise AutoIncrementError("AutoIncrementError: @@auto_increment_increment is {}. Seqs of a multi-row insert can't be worked out from lastrowid".format(increment))
+        except AutoIncrementError as e:
+            sys.exit(e.message)
 
-            intrinsic_dict_list.append(intrinsic_dict)
-            
+    if table == 'station':
+        invalidateStationIndexes()
 
-            ###GET EXTRINSICS###
-            extrinsic_dict = {}
+    closeCursor = False
+    if cursor == None:
+        cursor = connection.cursor()
+        closeCursor = True
 
-            query = "SELECT x, y, z FROM camera WHERE id = '{}'".format(camera_list[i])
-            result = pd.read_sql(query, con=connection)
-            extrinsic_dict['x'] = result.get('x')[0]
-            extrinsic_dict['y'] = result.get('y')[0]
-            extrinsic_dict['z'] = result.get('z')[0]
+    row_placeholder = '(' + ', '.join(['%s'] * len(columns)) + ')'
+    update_clause = ''
+    if onDuplicate == True:
+        update_clause = " ON DUPLICATE KEY UPDATE " + ', '.join(['{0} = VALUES({0})'.format(column) for column in columns])
 
-            query = "SELECT azimuth, tilt, roll FROM geometry WHERE cameraID = '{}'".format(camera_list[i])
-            result = pd.read_sql(query, con=connection)
-            extrinsic_dict['a'] = result.get('azimuth')[0]
-            extrinsic_dict['t'] = result.get('tilt')[0]
-            extrinsic_dict['r'] = result.get('roll')[0]
+    seq_list = []
+    try:
+        for i in range(0, len(arg_list), batchSize):
+            batch = arg_list[i : i + batchSize]
+            query = "INSERT INTO {} ({}) VALUES {}".format(table, ', '.join(columns), ', '.join([row_placeholder] * len(batch))) + update_clause
+            args = [value for row in batch for value in row]
+            try:
+                cursor.execute(query, args)
+                if onDuplicate == False:
+                    first_seq = cursor.lastrowid
+                    seq_list.extend(range(first_seq, first_seq + len(batch)))
+                elif 'id' in columns:
+                    seq_list.extend(fetchSeqsByID(table, [row[columns.index('id')] for row in batch], cursor))
+                else:
+                    seq_list.extend([None] * len(batch))
+                commitWrite(connection)
+            except (mysql.connector.Error, pymysql.MySQLError) as err:
+                if inUnitOfWork(connection):
+                    raise
+                print(err)
+                seq_list.extend([None] * len(batch))
+    finally:
+        if closeCursor == True:
+            cursor.close()
 
-            extrinsic_dict_list.append(extrinsic_dict)
-            
+    return seq_list
 
-        ###GET LOCAL ORIGIN DICT###
-        local_origin_dict = {}
-        query = "SELECT UTMEasting, UTMNorthing, degFromN FROM site WHERE id = '{}'".format(siteID)
-        result = pd.read_sql(query, con=connection)
-        local_origin_dict['x'] = result.get('UTMEasting')[0]
-        local_origin_dict['y'] = result.get('UTMNorthing')[0]
-        local_origin_dict['angd'] = result.get('degFromN')[0]
 
-        extrinsics = extrinsic_dict_list
-        intrinsics = intrinsic_dict_list
-        metadata = metadata_dict_list
-        local_origin = local_origin_dict
+def fetchSeqsByID(table, ids, cursor):
+    '''
+    Read the seq of the rows with the given ids, eg after an INSERT ... ON DUPLICATE KEY UPDATE where lastrowid doesn't say which
+    rows were inserted and which were updated.
+    Inputs:
+        table (string) - name of the table
+        ids (list) - id values
+        cursor (pymysql.cursors.Cursor object) - cursor to run the query with (same transaction as the insert)
+    Outputs:
+        seq_list (list) - seq for each id in the same order. None for ids that weren't found
+    '''
 
-        return extrinsics, intrinsics, metadata, local_origin
+    query = "SELECT id, seq FROM {} WHERE id IN ({})".format(table, ', '.join(['%s'] * len(ids)))
+    cursor.execute(query, list(ids))
+    seqs = dict((str(ID), seq) for ID, seq in cursor.fetchall())
 
+    return [seqs.get(str(ID)) for ID in ids]
 
 
-def unix2dt(unixnumber, timezone='utc'):
-    """
-    Get local time from unix number
-    Input:
-        unixnumber (string) - string containing unix time (aka epoch)
+def flushStatements(connection, statements, batchSize=None, cursor=None):
+    '''
+    Execute a queue of (query, args) pairs. With no batchSize every statement is executed and committed on its own. With a
+    batchSize, consecutive statements that share the same query text are sent together with executeBatch().
+    Inputs:
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        statements (list) - list of (query, args) tuples in the order they should run
+        batchSize (int) - optional number of rows per batch
+        cursor (pymysql.cursors.Cursor object) - optional cursor to execute the statements with
     Outputs:
-        date_time_string (string) - datetime string in the local user's timezone 
-        date_time_object (datetime) - datetime object in the local user's timezone
-        tzone (dateutil.tz) - dateutil timezone object
-    """
-    
-    if timezone.lower() == 'eastern':
-        tzone = tz.gettz('America/New_York')
-    elif timezone.lower() == 'pacific':
-        tzone = tz.gettz('America/Los_Angeles')
-    elif timezone.lower() == 'utc':
-        tzone = tz.gettz('UTC')
-        
-    # replace last digit with zero
-    ts = int( unixnumber[:-1]+'0')
-    date_time_obj =  datetime.datetime.utcfromtimestamp(ts)
-    #convert from UTC to local time zone on user's machine
-    date_time_obj = date_time_obj.replace(tzinfo=datetime.timezone.utc).astimezone(tz=tzone)
-    date_time_str = date_time_obj.strftime('%Y-%m-%d %H:%M:%S')
-    return date_time_str, date_time_obj, tzone
+        rowcount (int) - total number of rows affected
+    '''
 
-    
-def filename2param(filename, connection, timezone='utc'):
+    rowcount = 0
+
+    if batchSize == None:
+        for query, args in statements:
+            print(query)
+            rowcount = rowcount + executeStatement(connection, query, args, cursor=cursor)
+        return rowcount
+
+    for query, group in itertools.groupby(statements, key=lambda statement: statement[0]):
+        arg_list = [args for query, args in group]
+        print("{} ({} rows)".format(query, len(arg_list)))
+        rowcount = rowcount + executeBatch(connection, query, arg_list, batchSize=batchSize, cursor=cursor)
+
+    return rowcount
+
+
+def commitBatch(connection, count, batchSize):
     '''
-    Given the filename of a CoastCam image (with the short name of the station in the filename), create a Python object
-    that stores important rectification parameters: extrinsics, intrinsics, metadata, local origin. Extrinsics, intrinsics, and
-    metadata will be stored as lists, where each item in the list is a dictionary of parameters. There will be one dictionary for
-    each camera at the station. Is the unix time in the filename to search the database for data that corresponds to this time--this
-    will use timeIN and timeOUT fields.
-    This function will also create a datetime object in the user's local timezone (they must specify in the function arguments).
-    This datetime object will be assigned as an attribute of the Parameter object
+    Commit after every batchSize statements. Used by the write loops that need to run their statements one at a time (for
+    example when each row checks for a blank id left by the previous one) but should still only commit once per batch.
     Inputs:
-        filename(string) - image filename
         connection (pymysql.connections.Connection object) - object representing the connection to the DB
-        timezone (string) - user's local timezone. Used when returning the datetime object
+        count (int) - number of statements executed so far
+        batchSize (int) - number of statements per commit. None means every statement was already committed.
     Outputs:
-        params (Paramater object) - Python object storing the parameters associated with the station
-        return None if the filename doesn't match any existing station short names
+        none
     '''
 
-    filename_elements = filename.split('.')
-    unix_time = int(filename_elements[0])
-    query = "SELECT shortName FROM station"
-    result = pd.read_sql(query, con=connection)
-    shortName = result.get('shortName')
+    if (batchSize != None) and (count % batchSize == 0):
+        commitWrite(connection)
 
-    try:
-        #check to see if any of the station shortnames exist in the given filename
-        for i, name in enumerate(shortName):
 
-            if str(name) in filename:
+def commitWrite(connection):
+    '''
+    Commit the write path's pending statements, unless a UnitOfWork is open on the connection. In that case the unit of work
+    commits (or rolls back) everything once when it ends.
+    Inputs:
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+    Outputs:
+        none
+    '''
 
-                print("Short name '{}' found in filename {}".format(name, filename))
+    if not inUnitOfWork(connection):
+        connection.commit()
 
-                query = "SELECT id FROM station WHERE shortName = '{}'".format(name)
-                result = pd.read_sql(query, con=connection)
-                stationID = result.get('id')[0]
 
-                filename_el = filename.split('.')
-                unix_time = filename_el[0]
+def connectionKey(connection):
+    '''
+    Key used for a connection in open_units_of_work and open_key_indexes. A DBSession hands every thread its own pooled
+    connection, so for a DBSession the key is the calling thread's connection rather than the session shared by all threads.
+    Inputs:
+        connection (pymysql.connections.Connection object or DBSession) - object representing the connection to the DB
+    Outputs:
+        key (int) - id() of the connection the statements actually run on
+    '''
 
-                date_time_str, date_time_obj, tzone = unix2dt(unix_time, timezone=timezone)
+    if isinstance(connection, DBSession):
+        connection = connection.threadConnection()
 
-                extrinsics, intrinsics, metadata, local_origin = getParameterDicts(stationID, connection, useUnix=True, unix_time=unix_time)
+    return id(connection)
 
-                params = Parameter(extrinsics=extrinsics, intrinsics=intrinsics, metadata=metadata, local_origin=local_origin, date_time_obj=date_time_obj, date_time_str=date_time_str, tzone=tzone)
-                return params
 
-            else:
-                #whole list has been checked
-                if i == len(shortName) - 1:
-                    print('no existing station short names match the given filename')
-                    return None
-    except:
-        print("unable to get parameters")
-        return None
+def inUnitOfWork(connection):
+    '''
+    Check if a UnitOfWork is open on the connection.
+    Inputs:
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+    Outputs:
+        True/False - True if commits on this connection are being deferred
+    '''
 
+    return connectionKey(connection) in open_units_of_work
 
-def check_duplicate_id(table, ID, connection):
+
+def activeKeyIndex(connection):
     '''
-    check if id already exists in the table
+    Get the KeyIndex in use on the connection.
     Inputs:
-        table (string) - table to be checked
-        ID (string) - ID to be checked
         connection (pymysql.connections.Connection object) - object representing the connection to the DB
     Outputs:
-        isDuplicate (boolean) - true/false variable stating whether or not the id is a duplicate
+        keyIndex (KeyIndex) - the KeyIndex, or None if no KeyIndex is open on the connection
     '''
 
-    query = "SELECT * FROM {} WHERE id = '{}'".format(table, ID)
+    return open_key_indexes.get(connectionKey(connection))
 
-    result = pd.read_sql(query, con=connection)
 
-    if result.size == 0:
-        isDuplicate = False
-    else:
-        isDuplicate = True
+def keyExists(connection, table, column, value):
+    '''
+    Check if a value exists in a key column (id, seq or foreign key) of a table. If a KeyIndex is open on the connection the
+    check is done in memory, otherwise the DB is queried.
+    Inputs:
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        table (string) - name of the table
+        column (string) - name of the key column
+        value (string or int) - value to look for
+    Outputs:
+        True/False - True if the value is in the column
+    '''
 
-    return isDuplicate
+    keyIndex = activeKeyIndex(connection)
+    if keyIndex != None:
+        return keyIndex.contains(table, column, value)
 
+    query = "SELECT 1 FROM {} WHERE {} = %s LIMIT 1".format(table, column)
+    return exists(connection, query, (value,))
 
-def column2csv(column, table, csv_path, connection):
+
+def findKeys(connection, table, column, values):
     '''
-    Store a data read from a column in the database into a csv file. There will be a single file for the column.
+    Check which of a list of values exist in a key column of a table. Uses the KeyIndex open on the connection if there is one,
+    otherwise one SELECT ... IN (...) query per chunk of values (see get_rows_in()).
     Inputs:
-        column (string) - column name
-        csv_path (string) - optional input specified by the user for where they'd like to store csvs of the data read from
-                                 the database.
-        table (string) - input needed when writing  to csv because nott every column name in the database is unique.
         connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        table (string) - name of the table
+        column (string) - name of the key column
+        values (list) - values to look for
     Outputs:
-        result (Pandas dataframe) - resultant dataframe containing column data
+        found (numpy ndarray) - boolean array, True where the value is in the column
     '''
 
-    query = "SELECT {} FROM {}".format(column, table)
-    result = get_formatted_result(query, connection)
-
-    filename = table + '_' + column + '.csv'
-    folder_path = csv_path + 'columns/'
+    keyIndex = activeKeyIndex(connection)
+    if keyIndex != None:
+        return keyIndex.isin(table, column, values)
 
-    #if folders for saving csv does not exist, create directory
-    if not os.path.exists(folder_path):
-        os.makedirs(folder_path)
-        
-    full_path = folder_path + filename
-    result.to_csv(full_path, encoding='utf-8', index=False)
+    result = get_rows_in(table, column, values, connection)
 
-    print("Saved csv file to", full_path)
-    
-    return result
+    #compare as strings so a seq queued as '12' matches 12 from the DB, and the way the DB's collation matched them (see indexKey())
+    keys = [indexKey(value) for value in result[column].tolist()]
+    return np.isin(np.array([indexKey(value) for value in values], dtype=object), np.array(keys, dtype=object))
 
 
-def table2csv(table, csv_path, connection):
+def addKeys(connection, table, column, values):
     '''
-    Store a data read from a table in the database into a csv file. There will be a single file for the table.
+    Add newly written key values to the KeyIndex open on the connection, so later checks in the same batch see them. Does
+    nothing if no KeyIndex is open.
     Inputs:
-        csv_path (string) - optional input specified by the user for where they'd like to store csvs of the data read from
-                                 the database.
-        table (string) - table name
         connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        table (string) - name of the table
+        column (string) - name of the key column
+        values (list) - values that were written
     Outputs:
-        result (Pandas dataframe) - resultant dataframe containing column data
+        none
     '''
 
-    query = "SELECT * FROM {}".format(table)
-    result = get_formatted_result(query, connection)
+    keyIndex = activeKeyIndex(connection)
+    if keyIndex != None:
+        keyIndex.add(table, column, values)
 
-    filename = table + '.csv'
-    folder_path = csv_path + 'tables/'
 
-    #if folders for saving csv does not exist, create directory
-    if not os.path.exists(folder_path):
-        os.makedirs(folder_path)
-        
-    full_path = folder_path + filename
-    result.to_csv(full_path, encoding='utf-8', index=False)
+def removeKeys(connection, table, column, values):
+    '''
+    Remove key values that no longer exist (eg an id that was renamed) from the KeyIndex open on the connection. Does nothing if
+    no KeyIndex is open.
+    Inputs:
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        table (string) - name of the table
+        column (string) - name of the key column
+        values (list) - values that were removed
+    Outputs:
+        none
+    '''
 
-    print("Saved csv file to", full_path)
-    
-    return result
+    keyIndex = activeKeyIndex(connection)
+    if keyIndex != None:
+        keyIndex.remove(table, column, values)
 
 
-def site2csv(siteID, csv_path, connection):
+def insertWithPlaceholderID(table_name, columns, args, connection, cursor=None, commit=True):
     '''
-    Store a data read from a site in the database into a csv file using a specific siteID. There will be a folder for the site
-    where there's one csv file per table.
+    Insert a new row whose real id isn't known yet (eg a camera row holding only its foreign keys) and give it the placeholder
+    id placeholder_id_prefix + seq. Only one row per table can have a blank id, so the row is never left blank: it goes in with
+    a server-generated UUID_SHORT() temporary id and is then renamed by its own seq. Both statements run before the commit,
+    so concurrent writers can't collide on the id and no duplicate checks are needed. idColumn.insertNewID() later replaces
+    the placeholder with the real id using the returned seq.
     Inputs:
-        csv_path (string) - optional input specified by the user for where they'd like to store csvs of the data read from
-                                 the database.
-        table (string) - table name
+        table_name (string) - name of the table
+        columns (list) - names of the columns being written, not including id
+        args (list) - values for the columns
         connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        cursor (pymysql.cursors.Cursor object) - optional, cursor to execute with. A new cursor is made if not given
+        commit (boolean) - optional, commit after the row has its placeholder id (default is True)
     Outputs:
-        output_list (list) - list of Pandas datframes, one for each non-empty table associated with the given siteID
+        seq (int) - AUTO_INCREMENT value of the new row. None if the insert failed.
     '''
 
-    df_list = []
+    query = "INSERT INTO {} ({}, id) VALUES ({}, CONCAT(%s, UUID_SHORT()))".format(table_name, ', '.join(columns), ', '.join(['%s'] * len(columns)))
+    print(query)
+    seq = executeInsert(connection, query, list(args) + [placeholder_id_prefix], cursor=cursor, commit=False)
 
-    #site
-    query = "SELECT * FROM site WHERE id = '{}'".format(siteID)
-    result = get_formatted_result(query, connection)
+    if seq != None:
+        query = "UPDATE {} SET id = CONCAT(%s, seq) WHERE seq = %s".format(table_name)
+        print(query)
+        executeStatement(connection, query, [placeholder_id_prefix, seq], cursor=cursor, commit=False)
+        addKeys(connection, table_name, 'id', [placeholder_id_prefix + str(seq)])
 
-    #don't add empty tables to the dataframe list
-    if not result.empty:
-        df_tuple = ('site', result)
-        df_list.append(df_tuple)
+    if commit == True:
+        commitWrite(connection)
 
-    #station
-    query = "SELECT * FROM station WHERE siteID = '{}'".format(siteID)
-    result = get_formatted_result(query, connection)
-    stationID = result.get('id')
-    try:
-        if result.empty:
-            raise Exception
+    return seq
 
-        df_tuple = ('station', result)
-        df_list.append(df_tuple)
-    except:
-        pass
 
-    #camera
-    camera_result = []
-    try:
-        for ID in stationID:
-            query = "SELECT * FROM camera WHERE stationID = '{}'".format(ID)
-            camera_result.append(pd.read_sql(query, con=connection))
-        #account for multiple stations. Concatenate all results into 1 dataframe
-        if len(stationID) > 1:
-            result = pd.concat(camera_result, axis=0)
-        else:
-            result = camera_result[0]
-        cameraID = result.get('id')
-        modelID = result.get('modelID')
-        lensmodelID = result.get('lensmodelID')
-        li_IP = result.get('li_IP')
-        blankIndex = [''] * len(result)
-        result.index = blankIndex
+def np2text(array):
+    '''
+    Serialize a numpy array into a text blob and return the text. Makes it so that the array can be inserted into the database.
+    ---assume to onlyt be working with 1D or 2D arrays---
+    Inputs:
+        array (numpy ndarray) - array to be inserted into the DB
+    Outputs:
+        blob (string) - array converted into formatted text
+    '''
 
-        if not result.empty:
-            df_tuple = ('camera', result)
-            df_list.append(df_tuple)
-    except:
-        pass
+    blob = np.array2string(array, precision=4)
+    blob = blob.replace('\n', ',')
 
-    #cameramodel
-    cameramodel_result = []
-    try:
-        for ID in modelID:
-            query = "SELECT * FROM cameramodel WHERE id = '{}'".format(ID)
-            cameramodel_result.append(pd.read_sql(query, con=connection))
-        #account for multiple stations. Concatenate all results into 1 dataframe
-        if len(modelID) > 1:
-            result = pd.concat(cameramodel_result, axis=0)
-            result = result.drop_duplicates(subset='id', keep='first')
-        else:
-            result = cameramodel_result[0]
+    return blob
+        
 
-        if not result.empty:
-            df_tuple = ('cameramodel', result)
-            df_list.append(df_tuple)
-    except:
-        pass
+def np2blob(array):
+    '''
+    Serialize a numpy array into the binary format used for BLOB array columns (K, kc, m). Unlike np2text(), no precision is
+    lost and reading it back doesn't need any string parsing.
+    Format: 4 byte magic b'CCNP', 1 byte format version, 1 byte number of dimensions, 2 byte dtype code (b'f8'), one
+    little-endian uint32 per dimension for the shape, zero padding up to a multiple of 8 bytes, then the raw little-endian
+    float64 values in C order.
+    Inputs:
+        array (numpy ndarray) - array to be inserted into the DB
+    Outputs:
+        blob (bytes) - array converted into the binary format
+    '''
 
-    #lensmodel
-    lensmodel_result = []
-    try:
-        for ID in lensmodelID:
-            query = "SELECT * FROM lensmodel WHERE id = '{}'".format(ID)
-            lensmodel_result.append(pd.read_sql(query, con=connection))
-        if len(lensmodelID) > 1:
-            result = pd.concat(lensmodel_result, axis=0)
-            result = result.drop_duplicates(subset='id', keep='first')
-        else:
-            result = lensmodel_result[0]
+    array = np.ascontiguousarray(array, dtype='<f8')
 
-        if not result.empty:
-            df_tuple = ('lensmodel', result)
-            df_list.append(df_tuple)
-    except:
-        pass
+    header = array_blob_magic + struct.pack('<BB2s', array_blob_version, array.ndim, b'f8')
+    header = header + struct.pack('<{}I'.format(array.ndim), *array.shape)
+    #pad so the values start on an 8 byte boundary
+    header = header + b'\x00' * (-len(header) % 8)
 
-    #ip
-    li_IP_result = []
-    try:
-        for ID in li_IP:
-            query = "SELECT * FROM ip WHERE id = '{}'".format(ID)
-            li_IP_result.append(pd.read_sql(query, con=connection))
-        if len(li_IP) > 1:
-            result = pd.concat(li_IP_result, axis=0)
-            result = result.drop_duplicates(subset='id', keep='first')
-        else:
-            result = li_IP_result[0]
+    blob = header + array.tobytes()
 
-        if not result.empty:
-            df_tuple = ('ip', result)
-            df_list.append(df_tuple)
-    except:
-        pass
-    
-    #gcp
-    query = "SELECT * FROM gcp WHERE siteID = '{}'".format(siteID)
-    result = get_formatted_result(query, connection)
-    gcpID = result.get('id')
-    try:
-        if result.empty:
-            raise Exception
+    return blob
 
-        if not result.empty:
-            df_tuple = ('gcp', result)
-            df_list.append(df_tuple)
-    except:
-        pass
 
-    #geometry
-    geometry_result = []
-    try:
-        for ID in cameraID:
-            query = "SELECT * FROM geometry WHERE cameraID = '{}'".format(ID)
-            geometry_result.append(pd.read_sql(query, con=connection))
-        if len(cameraID) > 1:
-            result = pd.concat(geometry_result, axis=0)
-            result = result.drop_duplicates(subset='seq', keep='first')
-        else:
-            result = geometry_result[0]
-        geometrySequence = result.get('seq')
+def blob2np(blob):
+    '''
+    Convert a blob created by np2blob() back into a numpy array. The array is a read-only view on the blob, no copy is made.
+    Blobs with a different format version or dtype in the header are rejected rather than misread.
+    Inputs:
+        blob (bytes) - array stored in the binary format
+    Outputs:
+        array (ndarray) - numpy array decoded from the blob
+    '''
 
-        if not result.empty:
-            df_tuple = ('geometry', result)
-            df_list.append(df_tuple)
-    except:
-        pass
+    if bytes(blob[0:4]) != array_blob_magic:
+        raise ValueError("ValueError: blob is not in the binary array format")
 
-    #usedgcp
-    try:
-        usedgcp_result = []
-        for ID in gcpID:
-            for seq in geometrySequence:
-                query = "SELECT * FROM usedgcp WHERE gcpID = '{}' AND geometrySequence = {}".format(ID, seq)
-                usedgcp_result.append(pd.read_sql(query, con=connection))
-        if (len(gcpID) > 1) or (len(geometrySequence) > 1):
-            result = pd.concat(usedgcp_result, axis=0)
-            result = result.drop_duplicates(subset='seq', keep='first')
-        else:
-            result = usedgcp_result[0]
+    version, ndim, dtype_code = struct.unpack_from('<BB2s', blob, 4)
+    if version != array_blob_version:
+        raise ValueError("ValueError: blob is binary array format version {}, only version {} can be read".format(version, array_blob_version))
+    if dtype_code != b'f8':
+        raise ValueError("ValueError: blob holds dtype {!r}, only b'f8' can be read".format(dtype_code))
 
-        if not result.empty:
-            df_tuple = ('usedgcp', result)
-            df_list.append(df_tuple)
-    except:
-        pass
+    shape = struct.unpack_from('<{}I'.format(ndim), blob, 8)
 
-    #list of dataframes to output
-    output_list = []
+    offset = 8 + 4 * ndim
+    offset = offset + (-offset % 8)
 
-    #add tables to csv files
-    for df_tuple in df_list:
-        table = df_tuple[0]
-        df = df_tuple[1]
+    count = 1
+    for length in shape:
+        count = count * length
 
-        output_list.append(df)
+    array = np.frombuffer(blob, dtype='<f8', count=count, offset=offset).reshape(shape)
 
-        filename = table + '.csv'
-        folder_path = csv_path + '/sites/' + siteID + '/tables/'
+    return array
 
-        #if folders for saving csv does not exist, create directory
-        if not os.path.exists(folder_path):
-            os.makedirs(folder_path)
-            
-        full_path = folder_path + filename
-        df.to_csv(full_path, encoding='utf-8', index=False)
 
-    print("Saved csv files to", folder_path)
+def decodeArray(value):
+    '''
+    Decode an array column value read from the database, detecting the storage format. Values written by np2blob() are decoded
+    with blob2np(). Anything else is treated as np2text() formatted text, which covers old TEXT rows and TEXT rows read out of a
+    column that has been converted to BLOB.
+    Inputs:
+        value (bytes or string) - value of a K, kc, or m field
+    Outputs:
+        array (ndarray) - numpy array decoded from the value. None if the value is NULL or blank
+    '''
 
-    return output_list
+    #NULL comes back as None or NaN depending on the driver
+    if (value is None) or (isinstance(value, float) and (value != value)) or (len(value) == 0):
+        return None
 
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        if bytes(value[0:4]) == array_blob_magic:
+            return blob2np(value)
+        value = bytes(value).decode('utf-8')
 
-def csv2db(csv_path, connection):
+    return text2np(value)
+
+
+def migrateArrays2blob(connection, columns=None, alterColumns=True, batchSize=500):
     '''
-    Use a csv file to add data to a table in a database. The csv will be taken froma  template where there is 1 row for the column
-    headers and 1 row of data. id field must not be blank (if applicable) and Foreign key values must be included (if applicable).
-    Filename must be [table name].csv
+    Convert the array columns from np2text() TEXT to np2blob() binary. If alterColumns is True the columns are first changed to
+    BLOB (the existing text bytes are kept as they are, so rows still read with db2np() at every point of the migration). Then
+    every row that still holds text is decoded and rewritten in the binary format.
+    Note the migration can't recover the precision already lost by np2text(), it only stops further loss.
     Inputs:
-        csv_path (string) - filepath to the csv file
         connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        columns (list) - optional list of (table, column, key column) tuples to convert. Defaults to camera K, camera kc,
+                         and geometry m.
+        alterColumns (boolean) - flag for changing the column types to BLOB before converting the rows
+        batchSize (int) - number of rows rewritten per commit
     Outputs:
-        none
+        converted (dict) - number of converted rows for each "table.column"
     '''
 
-    with open(csv_path, 'r') as csv_file:
-        csvreader = csv.reader(csv_file)
+    if columns == None:
+        columns = [('camera', 'K', 'id'), ('camera', 'kc', 'id'), ('geometry', 'm', 'seq')]
 
-        for i, row in enumerate(csvreader):
-            #get rid of weird formatting from UTF-8 encoding
-            row[0] = row[0].replace('ï»¿', '')
+    cursor = connection.cursor()
+    converted = {}
+    for table, column, key in columns:
 
-            if i == 0:
-                column_names = row
-            elif i == 1:
-                column_values = row
+        if alterColumns == True:
+            query = "ALTER TABLE {} MODIFY {} BLOB".format(table, column)
+            print(query)
+            cursor.execute(query)
+            connection.commit()
 
-    validTables = ['site', 'station', 'gcp', 'camera', 'cameramodel', 'lensmodel' , 'ip', 'geometry', 'usedgcp']
-    fk_column_list = ['siteID', 'stationID', 'modelID', 'lensmodelID', 'li_IP', 'cameraID', 'siteID', 'gcpID', 'geometrySequence']
+        query = "SELECT {}, {} FROM {} WHERE {} IS NOT NULL".format(key, column, table, column)
+        print(query)
+        cursor.execute(query)
+        rows = cursor.fetchall()
 
-    path_elements = csv_path.split('/')
-    filename = path_elements[-1]
-    filename_elements = filename.split('.')
+        update_args = []
+        for key_value, value in rows:
+            #skip rows that are already binary and blank rows
+            if isinstance(value, (bytes, bytearray, memoryview)) and (bytes(value[0:4]) == array_blob_magic):
+                continue
+            if len(value) == 0:
+                continue
 
-    try:
-        table_name = filename_elements[0]
-        if table_name not in validTables:
-            raise Exception
-    except:
-        print('Not a valid table name in the filename')
-        return
+            array = decodeArray(value)
+            update_args.append((np2blob(array), key_value))
 
-    table = Table(table_name, 'coastcamdb', connection)
-    for i, column in enumerate(column_names):
+        query = "UPDATE {} SET {} = %s WHERE {} = %s".format(table, column, key)
+        for i in range(0, len(update_args), batchSize):
+            cursor.executemany(query, update_args[i : i + batchSize])
+            connection.commit()
 
-        if column in fk_column_list:
-            table.__dict__[column] = fkColumn(column_name=column, table=table, value=column_values[i])
+        converted[table + '.' + column] = len(update_args)
+        print("Converted {} rows in {}.{}".format(len(update_args), table, column))
 
-        elif column == 'id':
-            table.__dict__[column] = idColumn(table=table, value=column_values[i])
+    return converted
 
-        else:
-            table.__dict__[column] = Column(column_name=column, table=table, value=column_values[i])
 
-    table.insertTable2db()
+def db2np(connection, table, column, ID='', seq=0):
+    '''
+    Fetch an array from a TEXT or BLOB field in the CoastCamDB and return it as a numpy array.
+    ---assume to onlyt be working with 1D or 2D arrays---
+    Inputs:
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        table (string) - table the function will pull from
+        column (string) - column the function will pull the TEXT array from
+        ID (string) - associated ID (row #) for the data field where the array lives
+        seq (int) - optional variable used if user wants pull data from an existing row. seq only used for
+                    geometry and usedgcp tables.
+    Outputs:
+        array (ndarray) - numpy array pulled from the database. None if the field is NULL
+    '''
+    
+    #grab the data from the text field
+    if (ID != ''):
 
+        check_id(ID, table, connection)
+        query = "SELECT {} FROM {} WHERE id = %s".format(column, table)
+        args = (ID,)
 
-            
-      
-         
-##### CLASSES #####
-class MismatchIDError(Exception):
-    '''exception for id and seq mismatch'''
-    def __init__(self, message="mismatch between 'id' and 'seq' in database table"):
-        self.message = message
-        
+    elif (seq != 0):
 
-class NoMatchIDError(Exception):
-    '''exception for if id is not found in a table'''
-    def __init__(self, message="no matching value for 'id' found in the database table"):
-        self.message = message
-        
+        check_seq(seq, table, connection)
+        query = "SELECT {} FROM {} WHERE seq = %s".format(column, table)
+        args = (seq,)
 
-class NoSeqError(Exception):
-    '''exception for if seq is not found in a table'''
-    def __init__(self, message="no matching value for 'seq' found in the database table"):
-        self.message = message
-        
+    else:
 
-class ListLengthError(Exception):
-    '''exception if the number of given id/seq values to insert into table isn't the same as the number of values to insert'''
-    def __init__(self, message="number of given id/seq values is not the same as the number of values to be inserted"):
-        self.message = message
+        raise NoIDError("NoIDError: No id or seq value given to specify what row to insert data into column {} in table '{}'".format(column, table))
+    #print(query)
 
-class NoIDError(Exception):
-    '''exception if no id or seq is given when inserting into the DB'''
-    def __init__(self, message="no id or seq value given to specify row to insert into"):
-        self.message = message
+    result = fetch_scalar(connection, query, args)
 
-class FKError(Exception):
-    '''exception raised if a function requires foreign key args but no foreign keys were given'''
-    def __init__(self, message="foreign keys required but no foreign keys passed as arguments"):
-        self.message = message
+    #TEXT and binary rows are both handled
+    array = decodeArray(result)
 
-class EmptyValueError(Exception):
-    '''exception raised if user tries to add values to database and the value list for a column is empty'''
-    def __init__(self, message="value list for column is empty"):
-        self.message = message
-        
-        
-class Site:
-    '''
-    This class represents a CoastCam site. This object's attributes will store Table objects.
-    table_dict attribute holds the names of all the tables associated with this site.
-    '''
+    return array
 
-    def __init__(self, name, database, connection):
-        '''
-        Initialization function for this object.
-        Inputs:
-            name (string) - name of the site
-            database (string) - name of the database this site is associated with
-            connection (pymysql.connections.Connection object) - object representing the connection to the DB
-        outputs:
-            (none)
-        '''
-        
-        self.name = name
-        self.database = database
-        self.connection = connection
 
-    def showTables(self):
-        '''
-        Print all the tables and their fields connected to this site
-        Inputs:
-            (none)
-        Outputs:
-            (none)
-        '''
+def db2np_many(connection, table, column, ids=None):
+    '''
+    Fetch an array column for many rows with one query and return the arrays stacked into a single numpy array, eg N x 3 x 3
+    for camera K or N x 5 for camera kc. Text values are decoded with one vectorized parse for all rows (see decodeArrays()).
+    Every decoded array must have the same shape. Rows that don't exist or have a NULL/blank value are filled with NaN.
+    Inputs:
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        table (string) - table the function will pull from
+        column (string) - column the function will pull the arrays from
+        ids (list) - optional list of id (string) values, or seq (int) values for the geometry and usedgcp tables. If not
+                     given, every row in the table is fetched.
+    Outputs:
+        id_list (list) - list of id/seq values, in the same order as the first axis of array
+        array (ndarray) - stacked numpy array with one entry per id/seq
+    '''
 
-        print('SITE:', self.name, '\n------------------------------------------')
-        for table in self.__dict__:
-            #don't print unless it's a Table object
-            if isinstance(self.__dict__[table], Table):
-                print('\n')
-                self.__dict__[table].showFields()
+    if (table == 'geometry') or (table == 'usedgcp'):
+        key = 'seq'
+    else:
+        key = 'id'
 
-    def addSite2db(self):
-        '''
-        Add this site and all it's associated tables to a DB
-        Inputs:
-            connection (pymysql.connections.Connection object) - object representing the connection to the DB
-        Outputs:
-            (none)
-        '''
+    if ids == None:
+        query = "SELECT {}, {} FROM {}".format(key, column, table)
+        args = None
+    else:
+        id_list = list(ids)
+        if len(id_list) == 0:
+            return [], np.empty((0,))
 
-        #tables need to be added in specific order. Populate list accordingly
-        table_list = [None] * 9 
-        for table in self.__dict__:
-            if isinstance(self.__dict__[table], Table):
+        query = "SELECT {}, {} FROM {} WHERE {} IN ({})".format(key, column, table, key, ', '.join(['%s'] * len(id_list)))
+        args = id_list
 
-                if self.__dict__[table].table_name == 'site':
-                    table_list[0] = self.__dict__[table]
+    print(query)
 
-                elif self.__dict__[table].table_name == 'cameramodel':
-                    table_list[1] = self.__dict__[table]
+    rows = fetch_rows(connection, query, args)
+    values = {}
+    for row in rows:
+        values[row[key]] = row[column]
 
-                elif self.__dict__[table].table_name == 'lensmodel':
-                    table_list[2] = self.__dict__[table]
+    if ids == None:
+        id_list = [row[key] for row in rows]
 
-                elif self.__dict__[table].table_name == 'ip':
-                    table_list[3] = self.__dict__[table]
+    array = decodeArrays([values.get(ID) for ID in id_list])
 
-                elif self.__dict__[table].table_name == 'station':
-                    table_list[4] = self.__dict__[table]
+    return id_list, array
 
-                elif self.__dict__[table].table_name == 'gcp':
-                    table_list[5] = self.__dict__[table]
 
-                elif self.__dict__[table].table_name == 'camera':
-                    table_list[6] = self.__dict__[table]
+def decodeArrays(values):
+    '''
+    Decode many array column values into one stacked numpy array. All text values are cleaned and parsed together with a
+    single np.fromstring() call instead of one parse per row, and binary values are read with blob2np(). Every value must
+    decode to the same shape.
+    Inputs:
+        values (list) - list of K, kc, or m field values (string, bytes, or None)
+    Outputs:
+        array (ndarray) - stacked numpy array. The first axis matches the order of values. Missing values are filled with NaN.
+    '''
 
-                elif self.__dict__[table].table_name == 'geometry':
-                    table_list[7] = self.__dict__[table]
+    present = []
+    for i, value in enumerate(values):
+        #NULL comes back as None or NaN depending on the driver
+        if (value is None) or (isinstance(value, float) and (value != value)) or (len(value) == 0):
+            continue
+        present.append(i)
+
+    if len(present) == 0:
+        return np.full((len(values),), np.nan)
+
+    #every row has the same shape, so use the first value to get it
+    shape = arrayShape(values[present[0]])
+    array = np.full((len(values),) + shape, np.nan)
+
+    text_index = []
+    text_values = []
+    blob_index = []
+    blob_values = []
+    for i in present:
+        value = values[i]
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            if bytes(value[0:4]) == array_blob_magic:
+                blob_index.append(i)
+                blob_values.append(value)
+                continue
+            value = bytes(value).decode('utf-8')
+        text_index.append(i)
+        text_values.append(value)
+
+    if len(text_values) > 0:
+        #brackets and row separators carry no information once the shape is known
+        text = ' '.join(text_values).translate(str.maketrans('[],', '   '))
+        parsed = np.fromstring(text, dtype=float, sep=' ')
+
+        if parsed.size != len(text_index) * int(np.prod(shape)):
+            raise ValueError("ValueError: array values don't all have the shape {}".format(shape))
+
+        array[text_index] = parsed.reshape((len(text_index),) + shape)
+
+    if len(blob_values) > 0:
+        array[blob_index] = np.stack([blob2np(value) for value in blob_values], axis=0)
 
-                elif self.__dict__[table].table_name == 'usedgcp':
-                    table_list[8] = self.__dict__[table]
+    return array
 
-        for table in table_list:
-            table.addTable2db()
 
-    
-class Table:
+def arrayShape(value):
     '''
-    This class represents a table in the CoastCamDB. The attributes of this class represent the columns in the table.
-    This Table object can be added to a Site object as an attribute
+    Work out the shape of an array column value without decoding it with text2np(). Text values are parsed the same way as
+    decodeArrays() parses them, so commas left by np2text() line wrapping don't matter.
+    Inputs:
+        value (bytes or string) - value of a K, kc, or m field
+    Outputs:
+        shape (tuple) - shape of the array stored in the value
     '''
 
-    def __init__(self, table_name, database, connection, site=None):
-        '''
-        Initialization function for this object.
-        Inputs:
-            field_name (string) - name of the Table
-            database (string) - name of the database this Table is in
-            connection (pymysql.connections.Connection object) - object representing the connection to the DB
-            site (Site object) - site that this object corresponds to.
-        Outputs:
-            (none)
-        '''
-
-        self.table_name = table_name
-        self.database = database
-        self.site = site
-        self.connection = connection
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        if bytes(value[0:4]) == array_blob_magic:
+            return blob2np(value).shape
+        value = bytes(value).decode('utf-8')
 
+    value = value.strip()
+    size = np.fromstring(value.translate(str.maketrans('[],', '   ')), dtype=float, sep=' ').size
 
-    def showFields(self):
-        '''
-        Print the field name and value for each field in the table
-        Inputs:
-            (none)
-        Outputs:
-            (none)
-        '''
+    #number of dimensions is the number of ']' brackets at the end of the text, the same as text2np()
+    if value.split('[')[-1].count(']') == 2:
+        rows = value.count('[') - 1
+        return (rows, size // rows)
 
-        print('TABLE:', self.table_name, '\n---------------------')
-        for column in self.__dict__:
-            #don't print unless it's a Column object
-            if isinstance(self.__dict__[column], Column) or isinstance(self.__dict__[column], idColumn) or isinstance(self.__dict__[column], fkColumn):
-                self.__dict__[column].showColumn()
+    return (size,)
 
-    def getTableSeqs(self):
-        '''
-        Query the database and get all the entries in the seq column in this table
-        '''
 
-        query = "SELECT seq FROM {}".format(self.table_name)
-        print(query)
+def text2np(text):
+    '''
+    Convert a text blob created by np2text() back into a numpy array. Used by db2np() and by any function that already has
+    the TEXT field value in memory and doesn't need to query the database for it.
+    ---assume to onlyt be working with 1D or 2D arrays---
+    Inputs:
+        text (string) - array stored as formatted text
+    Outputs:
+        array (ndarray) - numpy array parsed from the text
+    '''
 
-        results = pd.read_sql(query, con=self.connection)
-        results = results.get('seq')
-        seq_list = []
-        for result in results:
-            seq_list.append(result)
+    result = text
 
-        return seq_list
+    #Number of dimnesions of array equal the number of ']' brackets at the end of the array.
+    #Split the text on '[' bracket and check the last element of the resulting list for ']'
+    dim_count = 0
+    split = result.split('[')
+    dim_count = split[-1].count(']')
 
+    if dim_count == 1:
+        #format for np.fromstring(). Long 1D arrays (eg m) are line-wrapped by np2text(), which leaves a comma at each wrap
+        array = result.replace('[', '')
+        array = array.replace(']', '')
+        array = array.replace(',', ' ')
+        array = np.fromstring(array, dtype=float, sep=' ')
 
-    def insertMultipleFK(self, returnSeqListFlag=False):
-        '''
-        Insert multiple foreign key values into the database at the same time. Used for the special case tables camera and usedgcp
-        Inputs:
-            returnSeqListFlag (boolean) - Optional argument specifying whether or not the function will return a seq_list. This
-                                          seq_list is a list of seq values from the database associated with each new foreign key
-                                          inserted into the database
-        Outputs:
-            seq_list (list) - optional output argument that is a list of seq values from the database
-        '''
+    elif dim_count == 2:        
+        #remove outside brackets from 2D array to make it easier to grab the rows
+        result = result[1 : -1]
+        rows = result.split(',')
+
+        array = []
+        for row in rows:
+            #Format string to use np.fromstring()
+            row = row.lstrip()
+            row = row.replace('[', '')
+            row = row.replace(']', '')
+            row = np.fromstring(row, dtype=float, sep=' ')
+            array.append(row)
+
+        #stack list of 1D arrays into single 2D array
+        array = np.stack(array, axis=0)
+
+    return array
+
+
+def id_seq_match(ID, seq, table, connection):
+    '''
+    Checks if the supplied id and seq match in the approporiate table in the database--a 'match' being that they belong
+    to the same row. Return True if match, False if not.
+    Inputs:
+        ID (string) - id to check in the database table
+        seq (int) - seq to check in the database table
+        table (string) - name of the database table
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+    Outputs:
+        True/False - true if there is a match. False if not
+    '''
+
+    query = "SELECT id FROM {} WHERE seq = %s".format(table)
+            #ex: SELECT id FROM site WHERE seq = 1
+    try:
+
+        result = fetch_scalar(connection, query, (seq,))
+
+        if result != ID:
+            raise MismatchIDError("MismatchIDError: given 'id' and 'seq' values in table '{}' are not in the same row".format(table)) 
+
+    except Exception as e:
+        sys.exit(e.message)
+        
+
+def check_id(ID, table, connection):
+    '''
+    Check if the given id value exists in the table. 
+    Inputs:
+        ID (string) - id value to check
+        table (string) - database table that that the id column exists in
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+    Outputs:
+        e (Exception) - return Exception if try/except hits exception
+    '''
+
+    try:
+        
+        #NULL return, no id found
+        if not keyExists(connection, table, 'id', ID):
+            raise NoMatchIDError("NoMatchIDError: No 'id' {} found in table '{}'".format(ID, table))
+        
+    except Exception as e:
+        #sys.exit(e.message)
+        return e
+
+
+def check_seq(seq, table, connection):
+    '''
+    Check if the given seq value exists in the table. 
+    Inputs:
+        seq (int) - seq value to check
+        table (string) - database table that that the id column exists in
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+    Outputs:
+        none
+    '''
+
+    try:
+        
+        #NULL return, no seq found
+        if not keyExists(connection, table, 'seq', seq):
+            raise NoSeqError("NoSeqError: No 'seq' {} found in table '{}'".format(seq, table))
+        
+    except Exception as e:
+        sys.exit(e.message)
+
+
+def check_linked_key(value, column, linked_table, connection):
+    '''
+    Check that the value actually exists in the id/seq column of the linked table
+    Inputs:
+        value (string or int) - seq/id value to be checked
+        column (string) - name of the fk column
+        linked_table (string) - table that the fk links to
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+    Outputs:
+        e (Exception) - return execpetion if exception is raised
+    '''
+
+    if column == 'geometrySequence':
+
+        try:
+            
+            #NULL return, no seq found
+            if not keyExists(connection, 'geometry', 'seq', value):
+                raise NoSeqError("NoSeqError: No 'seq' {} found in table '{}'".format(value, 'geometry'))
+        
+        except Exception as e:
+            return e
+            
+    else:
+
+        try:
+            
+            #NULL return, no id found
+            if not keyExists(connection, linked_table, 'id', value):
+                raise NoIDError("NoSeqError: No 'id' {} found in table '{}'".format(value, linked_table))
+        
+        except Exception as e:
+            return e
+
+
+def yaml2dict(yamlfile):
+    """ Import contents of a YAML file as a dict
+    Args:
+        yamlfile (str): YAML file to read
+    Returns:
+        dict interpreted from YAML file
+    """
+    dictname = None
+    with open(yamlfile, "r") as infile:
+        try:
+            dictname = yaml.safe_load(infile)
+        except yaml.YAMLerror as exc:
+            print(exc)
+    return dictname
+
+def get_formatted_result(query, connection, args=None):
+    '''
+    given a SQL query, return the result formatted without numbered indices.
+    Inputs:
+        query (string) - SQL query
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        args (tuple or list) - optional values for %s placeholders in the query
+    Outputs:
+        result (pandas Dataframe) - resulting dataframe returned from the SQl query
+    '''
+
+    result = pd.read_sql(adaptQuery(query, connection), con=connection, params=args)
+    blankIndex = [''] * len(result)
+    result.index = blankIndex
+    return result
+        
+
+def get_rows_in(table, column, values, connection, chunkSize=1000):
+    '''
+    Get every row of a table where a column matches any value in a list, using one SELECT ... WHERE column IN (...) query per
+    chunk of values instead of one query per value. Values are deduplicated and blank values are skipped before querying.
+    Inputs:
+        table (string) - table name
+        column (string) - column to match the values against
+        values (list or pandas Series) - values to look up
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        chunkSize (int) - optional maximum number of values per query
+    Outputs:
+        result (pandas Dataframe) - matching rows ordered by seq, formatted without numbered indices
+    '''
+
+    if values is None:
+        values = []
+
+    #dict keeps the first occurence of each value in order
+    values = [value for value in dict.fromkeys(values) if (value is not None) and (value == value) and (value != '')]
+
+    if len(values) == 0:
+        query = "SELECT * FROM {} WHERE 1 = 0".format(table)
+        return get_formatted_result(query, connection)
+
+    result_list = []
+    for i in range(0, len(values), chunkSize):
+        chunk = values[i : i + chunkSize]
+        query = "SELECT * FROM {} WHERE {} IN ({}) ORDER BY seq".format(table, column, ', '.join(['%s'] * len(chunk)))
+        result_list.append(get_formatted_result(query, connection, chunk))
+
+    if len(result_list) > 1:
+        result = pd.concat(result_list, axis=0)
+    else:
+        result = result_list[0]
+
+    return result
+
+
+def loadSiteSnapshot(siteID, connection, chunkSize=1000):
+    '''
+    Load every table row that belongs to a site in one pass. Each table in the site -> station -> camera -> cameramodel/lensmodel/ip
+    -> gcp -> geometry -> usedgcp hierarchy is read with a single JOIN or IN (...) query and deduplicated in memory, instead of
+    one query per foreign key value. The result is shared by displaySite(), site2csv(), and any other function that needs the
+    whole site.
+    Inputs:
+        siteID (string) - id for site in the 'site' table
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        chunkSize (int) - optional maximum number of values per IN (...) query
+    Outputs:
+        snapshot (OrderedDict) - dictionary where the key is the table name and the value is a dataframe of the table rows for
+                                 the site. Tables are in hierarchy order. Tables with no rows for the site are empty dataframes.
+    '''
+
+    snapshot = collections.OrderedDict()
+
+    query = "SELECT * FROM site WHERE id = %s"
+    snapshot['site'] = get_formatted_result(query, connection, (siteID,))
+
+    query = "SELECT * FROM station WHERE siteID = %s ORDER BY seq"
+    snapshot['station'] = get_formatted_result(query, connection, (siteID,))
+
+    query = '''SELECT camera.* FROM camera
+               JOIN station ON camera.stationID = station.id
+               WHERE station.siteID = %s
+               ORDER BY camera.seq'''
+    snapshot['camera'] = get_formatted_result(query, connection, (siteID,)).drop_duplicates(subset='seq', keep='first')
+
+    #models and ips are shared between cameras, so look up each distinct id once
+    camera = snapshot['camera']
+    snapshot['cameramodel'] = get_rows_in('cameramodel', 'id', camera['modelID'], connection, chunkSize).drop_duplicates(subset='id', keep='first')
+    snapshot['lensmodel'] = get_rows_in('lensmodel', 'id', camera['lensmodelID'], connection, chunkSize).drop_duplicates(subset='id', keep='first')
+    snapshot['ip'] = get_rows_in('ip', 'id', camera['li_IP'], connection, chunkSize).drop_duplicates(subset='id', keep='first')
+
+    query = "SELECT * FROM gcp WHERE siteID = %s ORDER BY seq"
+    snapshot['gcp'] = get_formatted_result(query, connection, (siteID,))
+
+    query = '''SELECT geometry.* FROM geometry
+               JOIN camera ON geometry.cameraID = camera.id
+               JOIN station ON camera.stationID = station.id
+               WHERE station.siteID = %s
+               ORDER BY geometry.seq'''
+    snapshot['geometry'] = get_formatted_result(query, connection, (siteID,)).drop_duplicates(subset='seq', keep='first')
+
+    #usedgcp rows need both a gcp and a geometry from this site
+    query = '''SELECT usedgcp.* FROM usedgcp
+               JOIN gcp ON usedgcp.gcpID = gcp.id
+               JOIN geometry ON usedgcp.geometrySequence = geometry.seq
+               JOIN camera ON geometry.cameraID = camera.id
+               JOIN station ON camera.stationID = station.id
+               WHERE gcp.siteID = %s AND station.siteID = %s
+               ORDER BY usedgcp.seq'''
+    snapshot['usedgcp'] = get_formatted_result(query, connection, (siteID, siteID)).drop_duplicates(subset='seq', keep='first')
+
+    return snapshot
+
+
+def snapshot2list(snapshot):
+    '''
+    Convert a site snapshot from loadSiteSnapshot() into a list of (table name, dataframe) tuples, leaving out empty tables.
+    Inputs:
+        snapshot (OrderedDict) - site snapshot from loadSiteSnapshot()
+    Outputs:
+        df_list (list) - list of tuples where the first element of the tuple is the table name and the second element is the
+                         table dataframe.
+    '''
+
+    df_list = []
+    for table, result in snapshot.items():
+        #don't add empty tables to the dataframe list
+        if not result.empty:
+            df_list.append((table, result))
+
+    return df_list
+
+
+def displaySite(siteID, connection, snapshot=None):
+    '''
+    Display all the columns for a site given a site id. Use the site id to get 'cascading' foreign keys for every table below
+    'site' in the coastcamdb hierarchy.Returns a list of tuples where the first element of the tuple is the table name and the
+    second element is the table dataframe.
+    Inputs:
+        siteID (string) - id for site in the 'site' table
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        snapshot (OrderedDict) - optional site snapshot from loadSiteSnapshot(). If not given, the site is loaded from the DB.
+    outputs:
+        df_list (list) - list of tuples where the first element of the tuple is the table name and the
+                         second element is the table dataframe.
+    '''
+
+    pd.set_option('display.width' ,160)
+    pd.set_option('display.max_columns', 40)
+
+    if snapshot == None:
+        snapshot = loadSiteSnapshot(siteID, connection)
+
+    df_list = snapshot2list(snapshot)
+
+    for i, df_tuple in enumerate(df_list):
+        table = df_tuple[0]
+        result = df_tuple[1]
+
+        if i == 0:
+            print('---{}---'.format(table.upper()))
+        else:
+            print('\n---{}---'.format(table.upper()))
+        print(result)
+
+    return df_list
+
+def getParameterDicts(stationID, connection, useUnix=False, unix_time=None):
+    '''
+    Given a stationID, return parameter dictionaries for extrinsics, intrinsics, metadata, and local origin.
+    Extrinsics, intrinsics, and metadata will be stored as lists, where each item in the list is a dictionary of
+    parameters. There will be one dictionary for each camera at the station.
+    Inputs:
+        stationID (string) - specifies the "id" field for the "station" table, which is also the "stationID" field in the
+                             "camera" table
+        connection (pymysql.connections.Connection object) - Object representing connection to DB. Can also be a
+                                                             connection to a local mirror from openMirror()
+        useUnix (boolean) - flag for specifying if a unix time should be used to narrow the data the user is looking for
+        unix_time (int) - timestamp of the filename needed for searching relevant data
+        
+    Outputs:
+        extrinsics (list) - list of extrinsic paramater dictionaries. One dictionary for each camera.
+        intrinsics (list) - list of intrinsic parameter dictionaries. One dictionary for each camera.
+        metadata (list) - list of metadata parameter dictionaries. One dictionary for each camera.
+        local_origin (dictionary) - dictionary of local origin parameters
+    '''
+
+    #all camera, ip, geometry, station, and site values for the station come back in one query
+    rows = getStationRows(stationID, connection, useUnix=useUnix, unix_time=unix_time)
+
+    if len(rows) != 0:
+
+        extrinsics, intrinsics, metadata, local_origin = rows2parameterDicts(rows)
+
+        return extrinsics, intrinsics, metadata, local_origin
+
+
+def getStationRows(stationID, connection, useUnix=False, unix_time=None):
+    '''
+    Fetch everything needed to build the parameter dictionaries for a station with a single joined query. The camera table is
+    joined to ip, geometry, station, and site so the station costs one round trip no matter how many cameras it has.
+    Inputs:
+        stationID (string) - specifies the "id" field for the "station" table
+        connection (pymysql.connections.Connection object) - Object representing connection to DB
+        useUnix (boolean) - flag for specifying if a unix time should be used to narrow the data the user is looking for
+        unix_time (int) - timestamp of the filename needed for searching relevant data
+    Outputs:
+        rows (list) - list of dictionaries, one per camera/geometry pair. Keys are the column names in the joined query.
+                      Rows are ordered by camera seq, then geometry seq.
+    '''
+
+    query = "SELECT camera.id AS cameraID, camera.cameraSN, camera.cameraNumber, camera.timeIN, camera.timeOUT, " \
+            "camera.x, camera.y, camera.z, camera.K, camera.kc, ip.width, ip.height, " \
+            "geometry.seq AS geometrySequence, geometry.azimuth, geometry.tilt, geometry.roll, " \
+            "station.name AS stationName, station.siteID, site.UTMEasting, site.UTMNorthing, site.degFromN " \
+            "FROM camera " \
+            "JOIN station ON station.id = camera.stationID " \
+            "LEFT JOIN site ON site.id = station.siteID " \
+            "LEFT JOIN ip ON ip.id = camera.li_IP " \
+            "LEFT JOIN geometry ON geometry.cameraID = camera.id " \
+            "WHERE camera.stationID = %s"
+    args = [stationID]
+
+    #accounting for unix time
+    if (useUnix == True) and (unix_time != None):
+        query = query + " AND camera.timeIN <= %s AND camera.timeOUT >= %s"
+        args = args + [int(unix_time), int(unix_time)]
+
+    query = query + " ORDER BY camera.seq, geometry.seq"
+
+    print(query)
+
+    rows = fetch_rows(connection, query, args)
+
+    return rows
+
+
+def rows2parameterDicts(rows):
+    '''
+    Build the extrinsic, intrinsic, metadata, and local origin dictionaries from the rows returned by getStationRows(). No
+    database access happens here. If a camera has more than one geometry row, the first (lowest seq) is used.
+    Inputs:
+        rows (list) - list of row dictionaries from getStationRows()
+    Outputs:
+        extrinsics (list) - list of extrinsic paramater dictionaries. One dictionary for each camera.
+        intrinsics (list) - list of intrinsic parameter dictionaries. One dictionary for each camera.
+        metadata (list) - list of metadata parameter dictionaries. One dictionary for each camera.
+        local_origin (dictionary) - dictionary of local origin parameters
+    '''
+
+    #lists of dictionaries. One dictionary in every list for each camera.
+    metadata_dict_list = []
+    extrinsic_dict_list = []
+    intrinsic_dict_list = []
+
+    camera_list = []
+    for row in rows:
+
+        #joined rows repeat the camera once per geometry row. Only keep the first one
+        if row['cameraID'] in camera_list:
+            continue
+        camera_list.append(row['cameraID'])
+
+        ###GET METADATA###
+        metadata_dict = {}
+        metadata_dict['name'] = row['stationName']
+        metadata_dict['serial_number'] = row['cameraSN']
+        metadata_dict['camera_number'] = row['cameraNumber']
+        metadata_dict['calibration_date'] = row['timeIN']
+        metadata_dict['coordinate_system'] = 'geo'
+
+        metadata_dict_list.append(metadata_dict)
+
+        ###GET INTRINSICS###
+        intrinsic_dict = {}
+        intrinsic_dict['NU'] = row['width']
+        intrinsic_dict['NV'] = row['height']
+
+        #get matrices for rest of intrinsics
+        #NULL K/kc leave the matching intrinsics as None
+        K = decodeArray(row['K'])
+        kc = decodeArray(row['kc'])
+        if K is not None:
+            intrinsic_dict['fx'] = K[0][0]
+            intrinsic_dict['fy'] = K[1][1]
+            intrinsic_dict['c0U'] = K[0][2]
+            intrinsic_dict['c0V'] = K[1][2]
+        else:
+            intrinsic_dict['fx'] = intrinsic_dict['fy'] = intrinsic_dict['c0U'] = intrinsic_dict['c0V'] = None
+        if kc is not None:
+            intrinsic_dict['d1'] = kc[0]
+            intrinsic_dict['d2'] = kc[1]
+            intrinsic_dict['d3'] = kc[2]
+            intrinsic_dict['t1'] = kc[3]
+            intrinsic_dict['t2'] = kc[4]
+        else:
+            intrinsic_dict['d1'] = intrinsic_dict['d2'] = intrinsic_dict['d3'] = intrinsic_dict['t1'] = intrinsic_dict['t2'] = None
+
+        intrinsic_dict_list.append(intrinsic_dict)
+
+        ###GET EXTRINSICS###
+        extrinsic_dict = {}
+        extrinsic_dict['x'] = row['x']
+        extrinsic_dict['y'] = row['y']
+        extrinsic_dict['z'] = row['z']
+        extrinsic_dict['a'] = row['azimuth']
+        extrinsic_dict['t'] = row['tilt']
+        extrinsic_dict['r'] = row['roll']
+
+        extrinsic_dict_list.append(extrinsic_dict)
+
+    ###GET LOCAL ORIGIN DICT###
+    #every row carries the same site values
+    local_origin_dict = {}
+    local_origin_dict['x'] = rows[0]['UTMEasting']
+    local_origin_dict['y'] = rows[0]['UTMNorthing']
+    local_origin_dict['angd'] = rows[0]['degFromN']
+
+    extrinsics = extrinsic_dict_list
+    intrinsics = intrinsic_dict_list
+    metadata = metadata_dict_list
+    local_origin = local_origin_dict
+
+    return extrinsics, intrinsics, metadata, local_origin
+
+
+
+def record2array_value(field, value):
+    '''
+    Convert a camera parameter value for storage in a camera_dtype array. Missing values (None/NaN) become -1 for the integer
+    fields and NaN for the float fields.
+    Inputs:
+        field (string) - field name
+        value (object) - value from the database or a parameter dictionary
+    Outputs:
+        value (int or float) - value to store
+    '''
+
+    if (value is None) or (value != value):
+        if field in camera_int_fields:
+            return -1
+        return np.nan
+
+    return value
+
+
+def dicts2cameraArray(extrinsics=None, intrinsics=None):
+    '''
+    Pack lists of extrinsic and intrinsic parameter dictionaries (one dictionary per camera, see rows2parameterDicts()) into a
+    single structured numpy array with dtype camera_dtype.
+    Inputs:
+        extrinsics (list) - optional list of extrinsic parameter dictionaries
+        intrinsics (list) - optional list of intrinsic parameter dictionaries
+    Outputs:
+        array (ndarray) - structured array with one row per camera. Fields not given are filled as missing.
+    Raises CameraFieldError if a dictionary has a key that isn't in extrinsic_fields/intrinsic_fields, since it couldn't be kept.
+    '''
+
+    if extrinsics == None:
+        extrinsics = []
+    if intrinsics == None:
+        intrinsics = []
+
+    for kind, fields, dict_list in [('extrinsic', extrinsic_fields, extrinsics), ('intrinsic', intrinsic_fields, intrinsics)]:
+        for i, parameter_dict in enumerate(dict_list):
+            unknown = [key for key in parameter_dict if key not in fields]
+            if len(unknown) > 0:
+                raise CameraFieldError("CameraFieldError: {} parameters of camera {} have unknown key(s) {}. Allowed keys are {}".format(kind, i, unknown, fields))
+
+    array = np.empty(max(len(extrinsics), len(intrinsics)), dtype=camera_dtype)
+    for field in camera_dtype.names:
+        array[field] = record2array_value(field, None)
+
+    for fields, dict_list in [(extrinsic_fields, extrinsics), (intrinsic_fields, intrinsics)]:
+        for i, parameter_dict in enumerate(dict_list):
+            for field in fields:
+                array[field][i] = record2array_value(field, parameter_dict.get(field))
+
+    return array
+
+
+def angles2R(azimuth, tilt, roll):
+    '''
+    Build rotation matrices from camera azimuth, tilt, and roll (radians). Works on single values or on arrays of angles, in
+    which case the result is a stack with one matrix per angle.
+    Inputs:
+        azimuth (float or ndarray) - camera azimuth
+        tilt (float or ndarray) - camera tilt
+        roll (float or ndarray) - camera roll
+    Outputs:
+        R (ndarray) - ... x 3 x 3 rotation matrices
+    '''
+
+    azimuth, tilt, roll = np.broadcast_arrays(np.asarray(azimuth, dtype=float), np.asarray(tilt, dtype=float), np.asarray(roll, dtype=float))
+
+    ca = np.cos(azimuth)
+    sa = np.sin(azimuth)
+    ct = np.cos(tilt)
+    st = np.sin(tilt)
+    cr = np.cos(roll)
+    sr = np.sin(roll)
+
+    R = np.empty(azimuth.shape + (3, 3))
+    R[..., 0, 0] = ca * cr + sa * sr * ct
+    R[..., 0, 1] = -cr * sa + sr * ca * ct
+    R[..., 0, 2] = sr * st
+    R[..., 1, 0] = -sr * ca + cr * sa * ct
+    R[..., 1, 1] = sr * sa + cr * ca * ct
+    R[..., 1, 2] = cr * st
+    R[..., 2, 0] = st * sa
+    R[..., 2, 1] = st * ca
+    R[..., 2, 2] = -ct
+
+    return R
+
+
+def unix2dt(unixnumber, timezone='utc'):
+    """
+    Get local time from unix number
+    Input:
+        unixnumber (string) - string containing unix time (aka epoch)
+    Outputs:
+        date_time_string (string) - datetime string in the local user's timezone 
+        date_time_object (datetime) - datetime object in the local user's timezone
+        tzone (dateutil.tz) - dateutil timezone object
+    """
+    
+    if timezone.lower() == 'eastern':
+        tzone = tz.gettz('America/New_York')
+    elif timezone.lower() == 'pacific':
+        tzone = tz.gettz('America/Los_Angeles')
+    elif timezone.lower() == 'utc':
+        tzone = tz.gettz('UTC')
+        
+    # replace last digit with zero
+    ts = int( unixnumber[:-1]+'0')
+    date_time_obj =  datetime.datetime.utcfromtimestamp(ts)
+    #convert from UTC to local time zone on user's machine
+    date_time_obj = date_time_obj.replace(tzinfo=datetime.timezone.utc).astimezone(tz=tzone)
+    date_time_str = date_time_obj.strftime('%Y-%m-%d %H:%M:%S')
+    return date_time_str, date_time_obj, tzone
+
+    
+def filename2param(filename, connection, timezone='utc', useCache=False, cache=None):
+    '''
+    Given the filename of a CoastCam image (with the short name of the station in the filename), create a Python object
+    that stores important rectification parameters: extrinsics, intrinsics, metadata, local origin. Extrinsics, intrinsics, and
+    metadata will be stored as lists, where each item in the list is a dictionary of parameters. There will be one dictionary for
+    each camera at the station. Is the unix time in the filename to search the database for data that corresponds to this time--this
+    will use timeIN and timeOUT fields.
+    This function will also create a datetime object in the user's local timezone (they must specify in the function arguments).
+    This datetime object will be assigned as an attribute of the Parameter object
+    With useCache the parameters are kept in an in-process cache (see ParameterCache) so every frame from the same calibration
+    epoch only costs one database load. Cached parameters don't see later edits to the DB until the cache is invalidated.
+    Inputs:
+        filename(string) - image filename
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB. Can also
+                                                             be a connection to a local mirror from openMirror()
+        timezone (string) - user's local timezone. Used when returning the datetime object
+        useCache (boolean) - optional flag for using the parameter cache (default is False). If False, the parameters are always
+                             rebuilt from the DB
+        cache (ParameterCache object) - optional cache to use instead of the module-level parameter_cache
+    Outputs:
+        params (Paramater object) - Python object storing the parameters associated with the station
+        return None if the filename doesn't match any existing station short names
+    '''
+
+    filename_elements = filename.split('.')
+    unix_time = int(filename_elements[0])
+
+    try:
+        #find the station with the connection's index instead of scanning every short name
+        name, stationID = stationIndexFor(connection).lookup(filename, connection)
+
+        if stationID == None:
+            print('no existing station short names match the given filename')
+            return None
+
+        print("Short name '{}' found in filename {}".format(name, filename))
+
+        unix_time = filename_elements[0]
+
+        date_time_str, date_time_obj, tzone = unix2dt(unix_time, timezone=timezone)
+
+        if useCache == True:
+
+            if cache == None:
+                cache = parameter_cache
+
+            params = getCachedParameter(stationID, int(unix_time), connection, cache)
+            if params == None:
+                print("no cameras active at station '{}' for time {}".format(stationID, unix_time))
+                return None
+
+            #the cached Parameter is shared, so return a copy with this frame's time
+            params = params.withTime(date_time_obj=date_time_obj, date_time_str=date_time_str, tzone=tzone)
+            return params
+
+        extrinsics, intrinsics, metadata, local_origin = getParameterDicts(stationID, connection, useUnix=True, unix_time=int(unix_time))
+
+        params = Parameter(extrinsics=extrinsics, intrinsics=intrinsics, metadata=metadata, local_origin=local_origin, date_time_obj=date_time_obj, date_time_str=date_time_str, tzone=tzone)
+        return params
+
+    except:
+        print("unable to get parameters")
+        return None
+
+
+def isActive(row, unix_time):
+    '''
+    Check if a camera row was active at the given unix time, ie timeIN <= unix_time <= timeOUT. Rows with a missing timeIN or
+    timeOUT are never active, the same as the SQL comparison used by getParameterDicts().
+    Inputs:
+        row (dict) - camera row with 'timeIN' and 'timeOUT' keys
+        unix_time (int) - unix time to check
+    Outputs:
+        True/False - True if the camera was active at the given time
+    '''
+
+    timeIN = row['timeIN']
+    timeOUT = row['timeOUT']
+
+    #NULL values come back as None or NaN depending on the driver
+    if (timeIN is None) or (timeOUT is None) or (timeIN != timeIN) or (timeOUT != timeOUT):
+        return False
+
+    return (timeIN <= unix_time) and (timeOUT >= unix_time)
+
+
+def calibrationEpoch(rows, unix_time):
+    '''
+    Find the calibration epoch that contains the given unix time. An epoch is the longest stretch of time around unix_time over
+    which the set of active cameras at a station (camera timeIN/timeOUT) doesn't change, so every time inside it gets the
+    same parameters. Builds a CameraIntervalIndex; keep the index instead when looking up more than one time.
+    Inputs:
+        rows (list) - camera row dictionaries for every camera at the station (see getStationRows())
+        unix_time (int) - unix time the epoch must contain
+    Outputs:
+        epoch_start (int) - first unix time in the epoch. None if the epoch has no lower bound
+        epoch_end (int) - last unix time in the epoch. None if the epoch has no upper bound
+    '''
+
+    return CameraIntervalIndex(rows).epochAt(unix_time)
+
+
+def getCachedParameter(stationID, unix_time, connection, cache):
+    '''
+    Return the Parameter object for a station at a given unix time, using the cache if possible. On a cache miss every camera
+    row for the station is loaded with one query, the epoch containing unix_time is worked out from the timeIN/timeOUT values,
+    and the new Parameter is stored in the cache for the whole epoch.
+    The returned object is shared with the cache and has no date/time attributes set. Use Parameter.withTime() to get a copy
+    for a specific frame.
+    Inputs:
+        stationID (string) - specifies the "id" field for the "station" table
+        unix_time (int) - unix time of the image
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        cache (ParameterCache object) - cache to read from and store into
+    Outputs:
+        params (Parameter object) - parameters for the station at the given time. None if no cameras were active
+    '''
+
+    params = cache.get(stationID, unix_time)
+    if params != None:
+        return params
+
+    index = CameraIntervalIndex(getStationRows(stationID, connection))
+    params = buildEpochParameter(stationID, index, unix_time, cache)
+
+    return params
+
+
+def buildEpochParameter(stationID, index, unix_time, cache):
+    '''
+    Build the Parameter object for the epoch containing unix_time from rows that are already in memory and store it in the
+    cache. No database access happens here.
+    Inputs:
+        stationID (string) - specifies the "id" field for the "station" table
+        index (CameraIntervalIndex object) - interval index over every camera row at the station (see getStationRows())
+        unix_time (int) - unix time of the image
+        cache (ParameterCache object) - cache to store the new Parameter in
+    Outputs:
+        params (Parameter object) - parameters for the station at the given time. None if no cameras were active
+    '''
+
+    active_rows = index.activeAt(unix_time)
+    if len(active_rows) == 0:
+        return None
+
+    epoch_start, epoch_end = index.epochAt(unix_time)
+
+    extrinsics, intrinsics, metadata, local_origin = rows2parameterDicts(active_rows)
+    params = Parameter(extrinsics=extrinsics, intrinsics=intrinsics, metadata=metadata, local_origin=local_origin)
+
+    cache.put(stationID, epoch_start, epoch_end, params)
+
+    return params
+
+
+def filenames2params(filenames, connection, timezone='utc', useCache=False, cache=None):
+    '''
+    Bulk version of filename2param(). Every filename is parsed with parseFilename(), the names are grouped by station and
+    by calibration epoch, and each group is resolved once: station ids come from the StationIndex, there is one query per
+    station for the camera rows, and one Parameter object is built per epoch. Reprocessing a day of imagery from one station
+    therefore costs a single camera query instead of a parameter rebuild per file.
+    Inputs:
+        filenames (list or string) - iterable of image filenames/filepaths in the Argus format, or the path to a directory of
+                                     images
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB. Can also
+                                                             be a connection to a local mirror from openMirror()
+        timezone (string) - user's local timezone. Used when setting the datetime attributes of each Parameter object
+        useCache (boolean) - optional flag for using the module-level parameter cache (default is False). If False, a temporary
+                             cache is used for this call only
+        cache (ParameterCache object) - optional cache to use instead of the module-level parameter_cache
+    Outputs:
+        params_dict (dict) - dictionary where the key is the filename and the value is the Parameter object for that file. The
+                             value is None if the filename isn't valid, the station isn't found, or no cameras were active.
+    '''
+
+    #a directory was given instead of a list of files
+    if isinstance(filenames, str):
+        if os.path.isdir(filenames):
+            filenames = [os.path.join(filenames, name) for name in sorted(os.listdir(filenames))]
+        else:
+            filenames = [filenames]
+
+    if useCache == True:
+        if cache == None:
+            cache = parameter_cache
+    else:
+        cache = ParameterCache(maxsize=float('inf'))
+
+    #group files by the station field of the Argus filename. Dict keeps the input order of the files
+    params_dict = {}
+    station_groups = {}
+    for filename in filenames:
+        params_dict[filename] = None
+
+        components = parseFilename(filename, noLocal=True)
+        if components == None:
+            continue
+
+        if components['station'] not in station_groups:
+            station_groups[components['station']] = []
+        station_groups[components['station']].append((filename, components['time']))
+
+    if len(station_groups) == 0:
+        return params_dict
+
+    #station ids come from the connection's index, which only queries the DB if the station table changed
+    station_index = stationIndexFor(connection)
+    station_index.ensureCurrent(connection)
+
+    for short_name in station_groups:
+
+        stationID = station_index.getID(short_name)
+        if stationID == None:
+            print("no existing station short names match '{}'".format(short_name))
+            continue
+
+        #camera rows are only loaded if the cache can't cover every file for this station
+        files = station_groups[short_name]
+        index = None
+        if any(cache.get(stationID, int(unix_time)) == None for filename, unix_time in files):
+            index = CameraIntervalIndex(getStationRows(stationID, connection))
+            epoch_groups = index.splitByEpoch(files, [int(unix_time) for filename, unix_time in files])
+        else:
+            #everything is cached. Epoch boundaries aren't known here, so look up each file on its own
+            epoch_groups = {i: [file] for i, file in enumerate(files)}
+
+        #each calibration epoch is built at most once, then shared by every file in it
+        for epoch_files in epoch_groups.values():
+
+            params = None
+            for filename, unix_time in epoch_files:
+
+                if params == None:
+                    params = cache.get(stationID, int(unix_time))
+                if (params == None) and (index != None):
+                    params = buildEpochParameter(stationID, index, int(unix_time), cache)
+
+                if params == None:
+                    print("no cameras active at station '{}' for file {}".format(stationID, filename))
+                    continue
+
+                date_time_str, date_time_obj, tzone = unix2dt(unix_time, timezone=timezone)
+                params_dict[filename] = params.withTime(date_time_obj=date_time_obj, date_time_str=date_time_str, tzone=tzone)
+
+    return params_dict
+
+
+def check_duplicate_id(table, ID, connection):
+    '''
+    check if id already exists in the table
+    Inputs:
+        table (string) - table to be checked
+        ID (string) - ID to be checked
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+    Outputs:
+        isDuplicate (boolean) - true/false variable stating whether or not the id is a duplicate
+    '''
+
+    isDuplicate = keyExists(connection, table, 'id', ID)
+
+    return isDuplicate
+
+
+def column2csv(column, table, csv_path, connection):
+    '''
+    Store a data read from a column in the database into a csv file. There will be a single file for the column.
+    Inputs:
+        column (string) - column name
+        csv_path (string) - optional input specified by the user for where they'd like to store csvs of the data read from
+                                 the database.
+        table (string) - input needed when writing  to csv because nott every column name in the database is unique.
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+    Outputs:
+        result (Pandas dataframe) - resultant dataframe containing column data
+    '''
+
+    query = "SELECT {} FROM {}".format(column, table)
+    result = get_formatted_result(query, connection)
+
+    filename = table + '_' + column + '.csv'
+    folder_path = csv_path + 'columns/'
+
+    #if folders for saving csv does not exist, create directory
+    if not os.path.exists(folder_path):
+        os.makedirs(folder_path)
+        
+    full_path = folder_path + filename
+    result.to_csv(full_path, encoding='utf-8', index=False)
+
+    print("Saved csv file to", full_path)
+    
+    return result
+
+
+def table2csv(table, csv_path, connection):
+    '''
+    Store a data read from a table in the database into a csv file. There will be a single file for the table.
+    Inputs:
+        csv_path (string) - optional input specified by the user for where they'd like to store csvs of the data read from
+                                 the database.
+        table (string) - table name
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+    Outputs:
+        result (Pandas dataframe) - resultant dataframe containing column data
+    '''
+
+    query = "SELECT * FROM {}".format(table)
+    result = get_formatted_result(query, connection)
+
+    filename = table + '.csv'
+    folder_path = csv_path + 'tables/'
+
+    #if folders for saving csv does not exist, create directory
+    if not os.path.exists(folder_path):
+        os.makedirs(folder_path)
+        
+    full_path = folder_path + filename
+    result.to_csv(full_path, encoding='utf-8', index=False)
+
+    print("Saved csv file to", full_path)
+    
+    return result
+
+
+def csvValue(value):
+    '''
+    Convert a value from a database row into what gets written to a csv cell by the streaming exporters. Arrays stored in the
+    binary format are written as np2text() text so the csv stays readable, NULL is written as an empty cell.
+    Inputs:
+        value (object) - value from a database row
+    Outputs:
+        value (object) - value to be written by csv.writer
+    '''
+
+    if value is None:
+        return ''
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        if bytes(value[0:4]) == array_blob_magic:
+            return np2text(blob2np(value))
+        return bytes(value).decode('utf-8')
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+
+    return value
+
+
+def query2csvStream(query, full_path, connection, chunkSize=10000, compress=False, args=None):
+    '''
+    Run a query with an unbuffered server-side cursor (SSCursor) and write the result to a csv file in chunks of rows. Only one
+    chunk is held in memory at a time, so memory use doesn't grow with the size of the table. Other queries can't be run on the
+    connection until the export finishes. Connections that aren't pymysql (eg a local mirror from openMirror()) use a plain
+    cursor, which is read in chunks with fetchmany() the same way.
+    Inputs:
+        query (string) - SQL query
+        full_path (string) - path of the csv file to write. '.gz' is added if compress is True and the path doesn't end in it.
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB. Can also
+                                                             be a connection to a local mirror from openMirror()
+        chunkSize (int) - optional number of rows fetched from the server and written per chunk
+        compress (boolean) - optional flag for writing a gzip compressed csv
+        args (tuple or list) - optional values for %s placeholders in the query
+    Outputs:
+        full_path (string) - path of the csv file written
+        row_count (int) - number of rows written, not counting the header
+    '''
+
+    if (compress == True) and (not full_path.endswith('.gz')):
+        full_path = full_path + '.gz'
+
+    row_count = 0
+    cursor = None
+    csv_file = None
+    try:
+        if isinstance(connection, (pymysql.connections.Connection, DBSession)):
+            cursor = connection.cursor(pymysql.cursors.SSCursor)
+        else:
+            cursor = connection.cursor()
+
+        if compress == True:
+            csv_file = gzip.open(full_path, 'wt', encoding='utf-8', newline='')
+        else:
+            csv_file = open(full_path, 'w', encoding='utf-8', newline='')
+
+        executeQuery(cursor, query, args)
+        writer = csv.writer(csv_file)
+        writer.writerow([description[0] for description in cursor.description])
+
+        rows = cursor.fetchmany(chunkSize)
+        while len(rows) > 0:
+            writer.writerows([[csvValue(value) for value in row] for row in rows])
+            row_count = row_count + len(rows)
+            rows = cursor.fetchmany(chunkSize)
+    finally:
+        #only what was opened before a failure is closed
+        if cursor != None:
+            cursor.close()
+        if csv_file != None:
+            csv_file.close()
+
+    return full_path, row_count
+
+
+def column2csvStream(column, table, csv_path, connection, chunkSize=10000, compress=False):
+    '''
+    Streaming version of column2csv(). The column is written to the csv file in chunks straight from a server-side cursor
+    instead of being loaded into a dataframe first. Use this for columns of large tables.
+    Inputs:
+        column (string) - column name
+        table (string) - table name
+        csv_path (string) - path to the folder where the 'columns/' folder of csv files is stored
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        chunkSize (int) - optional number of rows written per chunk
+        compress (boolean) - optional flag for writing a gzip compressed csv
+    Outputs:
+        full_path (string) - path of the csv file written
+    '''
+
+    query = "SELECT {} FROM {}".format(column, table)
+
+    filename = table + '_' + column + '.csv'
+    folder_path = csv_path + 'columns/'
+
+    #if folders for saving csv does not exist, create directory
+    if not os.path.exists(folder_path):
+        os.makedirs(folder_path)
+
+    full_path, row_count = query2csvStream(query, folder_path + filename, connection, chunkSize=chunkSize, compress=compress)
+
+    print("Saved {} rows to csv file {}".format(row_count, full_path))
+
+    return full_path
+
+
+def table2csvStream(table, csv_path, connection, chunkSize=10000, compress=False):
+    '''
+    Streaming version of table2csv(). The table is written to the csv file in chunks straight from a server-side cursor
+    instead of being loaded into a dataframe first. Use this for large tables like geometry and usedgcp.
+    Inputs:
+        table (string) - table name
+        csv_path (string) - path to the folder where the 'tables/' folder of csv files is stored
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        chunkSize (int) - optional number of rows written per chunk
+        compress (boolean) - optional flag for writing a gzip compressed csv
+    Outputs:
+        full_path (string) - path of the csv file written
+    '''
+
+    query = "SELECT * FROM {}".format(table)
+
+    filename = table + '.csv'
+    folder_path = csv_path + 'tables/'
+
+    #if folders for saving csv does not exist, create directory
+    if not os.path.exists(folder_path):
+        os.makedirs(folder_path)
+
+    full_path, row_count = query2csvStream(query, folder_path + filename, connection, chunkSize=chunkSize, compress=compress)
+
+    print("Saved {} rows to csv file {}".format(row_count, full_path))
+
+    return full_path
+
+
+def site2csv(siteID, csv_path, connection, snapshot=None):
+    '''
+    Store a data read from a site in the database into a csv file using a specific siteID. There will be a folder for the site
+    where there's one csv file per table.
+    Inputs:
+        csv_path (string) - optional input specified by the user for where they'd like to store csvs of the data read from
+                                 the database.
+        table (string) - table name
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        snapshot (OrderedDict) - optional site snapshot from loadSiteSnapshot(). If not given, the site is loaded from the DB.
+    Outputs:
+        output_list (list) - list of Pandas datframes, one for each non-empty table associated with the given siteID
+    '''
+
+    if snapshot == None:
+        snapshot = loadSiteSnapshot(siteID, connection)
+
+    df_list = snapshot2list(snapshot)
+
+    #list of dataframes to output
+    output_list = []
+
+    #add tables to csv files
+    for df_tuple in df_list:
+        table = df_tuple[0]
+        df = df_tuple[1]
+
+        output_list.append(df)
+
+        filename = table + '.csv'
+        folder_path = csv_path + '/sites/' + siteID + '/tables/'
+
+        #if folders for saving csv does not exist, create directory
+        if not os.path.exists(folder_path):
+            os.makedirs(folder_path)
+            
+        full_path = folder_path + filename
+        df.to_csv(full_path, encoding='utf-8', index=False)
+
+    print("Saved csv files to", folder_path)
+
+    return output_list
+
+
+def importArrow():
+    '''
+    Import pyarrow for the Parquet/Feather exporters. pyarrow is only needed for those exporters, so it is imported when they
+    are called instead of at the top of the module.
+    Inputs:
+        none
+    Outputs:
+        pa (module) - pyarrow
+    '''
+
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet
+        import pyarrow.feather
+    except ImportError:
+        raise ImportError("ImportError: pyarrow is needed to export Parquet or Feather files. Install it with 'pip install pyarrow'")
+
+    return pa
+
+
+def arrays2arrow(values, column, pa):
+    '''
+    Decode the values of an array column (K, kc, m) and convert them to an Arrow fixed-size list column of float64. K becomes a
+    fixed-size list of 3 fixed-size lists of 3, kc a fixed-size list of 5, and m a fixed-size list of 11. NULL/blank values
+    become null entries.
+    Inputs:
+        values (list) - list of K, kc, or m field values (string, bytes, or None)
+        column (string) - column name, used for the shape when every value is NULL
+        pa (module) - pyarrow
+    Outputs:
+        arrow_array (pyarrow FixedSizeListArray) - decoded arrays
+    '''
+
+    array = decodeArrays(list(values))
+
+    if array.ndim == 1:
+        #no values to decode, so every row is null
+        list_type = pa.float64()
+        for length in reversed(array_column_shapes[column]):
+            list_type = pa.list_(list_type, length)
+        return pa.nulls(len(values), type=list_type)
+
+    arrow_array = pa.array(array.reshape(-1), type=pa.float64())
+    for length in reversed(array.shape[1:]):
+        arrow_array = pa.FixedSizeListArray.from_arrays(arrow_array, length)
+
+    #rows that were NULL/blank were filled with NaN by decodeArrays()
+    missing = np.isnan(array.reshape(len(array), -1)).all(axis=1)
+    if missing.any():
+        arrow_array = pa.array([None if missing[i] else row for i, row in enumerate(arrow_array.to_pylist())], type=arrow_array.type)
+
+    return arrow_array
+
+
+def frame2arrow(df):
+    '''
+    Convert a dataframe read from the database into an Arrow table with real column types. Array columns (K, kc, m) are decoded
+    into fixed-size list columns instead of being kept as np2text() strings.
+    Inputs:
+        df (pandas Dataframe) - dataframe read from the database
+    Outputs:
+        arrow_table (pyarrow Table) - table ready to be written as Parquet or Feather
+    '''
+
+    pa = importArrow()
+
+    array_columns = [column for column in df.columns if column in array_column_shapes]
+    arrow_table = pa.Table.from_pandas(df.drop(columns=array_columns), preserve_index=False)
+
+    #put the decoded array columns back in their original position
+    for column in array_columns:
+        position = list(df.columns).index(column)
+        arrow_table = arrow_table.add_column(position, column, arrays2arrow(df[column], column, pa))
+
+    return arrow_table
+
+
+def writeArrow(df, full_path, fileFormat='parquet'):
+    '''
+    Write a dataframe read from the database to a Parquet or Feather (Arrow IPC) file. See frame2arrow().
+    Inputs:
+        df (pandas Dataframe) - dataframe read from the database
+        full_path (string) - path of the file to write, without the extension
+        fileFormat (string) - 'parquet' or 'feather'
+    Outputs:
+        full_path (string) - path of the file written, with the extension
+    '''
+
+    pa = importArrow()
+    arrow_table = frame2arrow(df)
+
+    if fileFormat == 'parquet':
+        full_path = full_path + '.parquet'
+        pa.parquet.write_table(arrow_table, full_path)
+    elif fileFormat == 'feather':
+        full_path = full_path + '.feather'
+        pa.feather.write_feather(arrow_table, full_path)
+    else:
+        raise ValueError("ValueError: fileFormat must be 'parquet' or 'feather'")
+
+    return full_path
+
+
+def column2parquet(column, table, path, connection, fileFormat='parquet'):
+    '''
+    Store a data read from a column in the database into a Parquet or Feather file. There will be a single file for the column.
+    Inputs:
+        column (string) - column name
+        table (string) - table name
+        path (string) - path to the folder where the 'columns/' folder of files is stored
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        fileFormat (string) - optional file format, 'parquet' or 'feather'
+    Outputs:
+        full_path (string) - path of the file written
+    '''
+
+    query = "SELECT {} FROM {}".format(column, table)
+    result = pd.read_sql(query, con=connection)
+
+    folder_path = path + 'columns/'
+
+    #if folders for saving file does not exist, create directory
+    if not os.path.exists(folder_path):
+        os.makedirs(folder_path)
+
+    full_path = writeArrow(result, folder_path + table + '_' + column, fileFormat)
+
+    print("Saved {} file to {}".format(fileFormat, full_path))
+
+    return full_path
+
+
+def table2parquet(table, path, connection, fileFormat='parquet'):
+    '''
+    Store a data read from a table in the database into a Parquet or Feather file. There will be a single file for the table.
+    Inputs:
+        table (string) - table name
+        path (string) - path to the folder where the 'tables/' folder of files is stored
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        fileFormat (string) - optional file format, 'parquet' or 'feather'
+    Outputs:
+        full_path (string) - path of the file written
+    '''
+
+    query = "SELECT * FROM {}".format(table)
+    result = pd.read_sql(query, con=connection)
+
+    folder_path = path + 'tables/'
+
+    #if folders for saving file does not exist, create directory
+    if not os.path.exists(folder_path):
+        os.makedirs(folder_path)
+
+    full_path = writeArrow(result, folder_path + table, fileFormat)
+
+    print("Saved {} file to {}".format(fileFormat, full_path))
+
+    return full_path
+
+
+def site2parquet(siteID, path, connection, snapshot=None, fileFormat='parquet'):
+    '''
+    Store a data read from a site in the database into Parquet or Feather files using a specific siteID. There will be a folder
+    for the site where there's one file per table, the same layout as site2csv().
+    Inputs:
+        siteID (string) - id for site in the 'site' table
+        path (string) - path to the folder where the 'sites/' folder is stored
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        snapshot (OrderedDict) - optional site snapshot from loadSiteSnapshot(). If not given, the site is loaded from the DB.
+        fileFormat (string) - optional file format, 'parquet' or 'feather'
+    Outputs:
+        path_list (list) - list of paths of the files written, one for each non-empty table associated with the given siteID
+    '''
+
+    if snapshot == None:
+        snapshot = loadSiteSnapshot(siteID, connection)
+
+    folder_path = path + '/sites/' + siteID + '/tables/'
+
+    #if folders for saving files does not exist, create directory
+    if not os.path.exists(folder_path):
+        os.makedirs(folder_path)
+
+    path_list = []
+    for table, df in snapshot2list(snapshot):
+        path_list.append(writeArrow(df, folder_path + table, fileFormat))
+
+    print("Saved {} files to {}".format(fileFormat, folder_path))
+
+    return path_list
+
+
+def sites2csv(site_ids, csv_path, connection_source, maxWorkers=4, fileFormat='csv'):
+    '''
+    Export many sites at the same time with a bounded pool of worker threads. Each worker exports one site at a time with
+    site2csv() (or site2parquet() for 'parquet'/'feather') on its own connection, since a single connection can only run one
+    query at a time. A site that fails is reported and the rest of the sites are still exported.
+    Inputs:
+        site_ids (list) - list of site ids to export
+        csv_path (string) - path to the folder where the 'sites/' folder is stored
+        connection_source (DBSession object or string) - a DBSession to borrow connections from, or the path to a csv file
+                                                         with the connection parameters (see DBConnectCSV()). With a DBSession
+                                                         the pool size also bounds the number of sites exported at once.
+        maxWorkers (int) - optional maximum number of sites exported at the same time
+        fileFormat (string) - optional file format, 'csv', 'parquet', or 'feather'
+    Outputs:
+        results (list) - list of dictionaries, one per site in the same order as site_ids. Keys are 'siteID', 'seconds' (time
+                         taken to export the site), 'tables' (number of tables written), and 'error' (None if the export
+                         succeeded, otherwise the error message)
+    '''
+
+    def exportSite(siteID):
+        start = time.perf_counter()
+        result = {'siteID': siteID, 'seconds': None, 'tables': 0, 'error': None}
+
+        try:
+            if isinstance(connection_source, DBSession):
+                session_connection = connection_source.connection()
+            else:
+                session_connection = contextlib.closing(DBConnectCSV(connection_source))
+
+            with session_connection as connection:
+                if fileFormat == 'csv':
+                    output_list = site2csv(siteID, csv_path, connection)
+                else:
+                    output_list = site2parquet(siteID, csv_path, connection, fileFormat=fileFormat)
+            result['tables'] = len(output_list)
+
+        except Exception as e:
+            result['error'] = getattr(e, 'message', None) or repr(e)
+
+        result['seconds'] = time.perf_counter() - start
+
+        if result['error'] == None:
+            print("Exported site {} ({} tables) in {:.2f} s".format(siteID, result['tables'], result['seconds']))
+        else:
+            print("Failed to export site {} after {:.2f} s: {}".format(siteID, result['seconds'], result['error']))
+
+        return result
+
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+        results = list(executor.map(exportSite, site_ids))
+
+    failed = [result['siteID'] for result in results if result['error'] != None]
+    print("Exported {} of {} sites in {:.2f} s".format(len(results) - len(failed), len(results), time.perf_counter() - start))
+    if len(failed) > 0:
+        print("Failed sites:", ', '.join(failed))
+
+    return results
+
+
+def csv2db(csv_path, connection):
+    '''
+    Use a csv file to add data to a table in a database. The csv will be taken froma  template where there is 1 row for the column
+    headers and 1 row of data. id field must not be blank (if applicable) and Foreign key values must be included (if applicable).
+    Filename must be [table name].csv
+    Inputs:
+        csv_path (string) - filepath to the csv file
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB
+    Outputs:
+        none
+    '''
+
+    with open(csv_path, 'r') as csv_file:
+        csvreader = csv.reader(csv_file)
+
+        for i, row in enumerate(csvreader):
+            #get rid of weird formatting from UTF-8 encoding
+            row[0] = row[0].replace('ï»¿', '')
+
+            if i == 0:
+                column_names = row
+            elif i == 1:
+                column_values = row
+
+    validTables = ['site', 'station', 'gcp', 'camera', 'cameramodel', 'lensmodel' , 'ip', 'geometry', 'usedgcp']
+    fk_column_list = ['siteID', 'stationID', 'modelID', 'lensmodelID', 'li_IP', 'cameraID', 'siteID', 'gcpID', 'geometrySequence']
+
+    path_elements = csv_path.split('/')
+    filename = path_elements[-1]
+    filename_elements = filename.split('.')
+
+    try:
+        table_name = filename_elements[0]
+        if table_name not in validTables:
+            raise Exception
+    except:
+        print('Not a valid table name in the filename')
+        return
+
+    table = Table(table_name, 'coastcamdb', connection)
+    for i, column in enumerate(column_names):
+
+        if column in fk_column_list:
+            table.__dict__[column] = fkColumn(column_name=column, table=table, value=column_values[i])
+
+        elif column == 'id':
+            table.__dict__[column] = idColumn(table=table, value=column_values[i])
+
+        else:
+            table.__dict__[column] = Column(column_name=column, table=table, value=column_values[i])
+
+    table.insertTable2db()
+
+
+            
+      
+         
+##### CLASSES #####
+class MismatchIDError(Exception):
+    '''exception for id and seq mismatch'''
+    def __init__(self, message="mismatch between 'id' and 'seq' in database table"):
+        self.message = message
+        
+
+class NoMatchIDError(Exception):
+    '''exception for if id is not found in a table'''
+    def __init__(self, message="no matching value for 'id' found in the database table"):
+        self.message = message
+        
+
+class NoSeqError(Exception):
+    '''exception for if seq is not found in a table'''
+    def __init__(self, message="no matching value for 'seq' found in the database table"):
+        self.message = message
+        
+
+class ListLengthError(Exception):
+    '''exception if the number of given id/seq values to insert into table isn't the same as the number of values to insert'''
+    def __init__(self, message="number of given id/seq values is not the same as the number of values to be inserted"):
+        self.message = message
+
+class NoIDError(Exception):
+    '''exception if no id or seq is given when inserting into the DB'''
+    def __init__(self, message="no id or seq value given to specify row to insert into"):
+        self.message = message
+
+class FKError(Exception):
+    '''exception raised if a function requires foreign key args but no foreign keys were given'''
+    def __init__(self, message="foreign keys required but no foreign keys passed as arguments"):
+        self.message = message
+
+class EmptyValueError(Exception):
+    '''exception raised if user tries to add values to database and the value list for a column is empty'''
+    def __init__(self, message="value list for column is empty"):
+        self.message = message
+
+class KeyIndexError(Exception):
+    '''exception raised if keys added to a KeyIndex are not found in the database when the batch is verified'''
+    def __init__(self, message="keys written during the batch were not found in the database"):
+        self.message = message
+
+class AutoIncrementError(Exception):
+    '''exception raised if the server's AUTO_INCREMENT settings don't allow working out the seqs of a multi-row insert'''
+    def __init__(self, message="@@auto_increment_increment must be 1 to work out the seqs of a multi-row insert"):
+        self.message = message
+
+class ConnectionLostError(Exception):
+    '''exception raised if the connection of an open unit of work was dropped, which loses the transaction'''
+    def __init__(self, message="connection with an open transaction was dropped by the server"):
+        self.message = message
+
+class PoolTimeoutError(Exception):
+    '''exception raised if no pooled connection becomes available before the timeout'''
+    def __init__(self, message="no database connection available in the pool"):
+        self.message = message
+
+class CameraFieldError(Exception):
+    '''exception raised if an extrinsic/intrinsic parameter dictionary has a key that a Parameter object can't store'''
+    def __init__(self, message="unknown camera parameter key"):
+        self.message = message
+
+
+class DBSession:
+    '''
+    Pool of connections to the CoastCamDB. A DBSession can be passed to any function or class in this module in place of a
+    raw pymysql connection: cursor(), commit(), and rollback() are forwarded to a pooled connection pinned to the calling
+    thread, so each worker thread gets its own connection. Connections that have been idle for longer than pingInterval are
+    pinged (and reconnected if the server dropped them, eg after MySQL wait_timeout) before they are handed out. A connection
+    with an open UnitOfWork or KeyIndex is never reconnected; ConnectionLostError is raised instead.
+    Use connection() to borrow a raw connection for a block of code instead of pinning one to the thread.
+    '''
+
+    def __init__(self, filepath=None, host=None, port=3306, dbname=None, user=None, password=None, poolSize=4, pingInterval=60,
+                 acquireTimeout=60):
+        '''
+        Initialization function for this object. Connection parameters come from a csv (same format as DBConnectCSV()) or
+        are passed directly. No connections are opened until they are needed.
+        Inputs:
+            filepath (string) - optional filepath of the csv with the connection parameters
+            host (string) - database host, if not using a csv
+            port (int) - database port, if not using a csv
+            dbname (string) - database name, if not using a csv
+            user (string) - database user name, if not using a csv
+            password (string) - password for the user, if not using a csv
+            poolSize (int) - maximum number of open connections
+            pingInterval (float) - connections idle for longer than this many seconds are checked before being reused
+            acquireTimeout (float) - number of seconds a thread waits for its first connection before PoolTimeoutError is
+                                     raised. None waits forever.
+        Outputs:
+            (none)
+        '''
+
+        if filepath != None:
+            csv_parameters = parseCSV(filepath)
+            host = csv_parameters[0]
+            port = int(csv_parameters[1])
+            dbname = csv_parameters[2]
+            user = csv_parameters[3]
+            password = csv_parameters[4]
+
+        self.host = host
+        self.port = port
+        self.dbname = dbname
+        self.user = user
+        self.password = password
+
+        self.poolSize = poolSize
+        self.pingInterval = pingInterval
+        self.acquireTimeout = acquireTimeout
+
+        #idle connections are stored as (connection, time last used). LIFO so the warmest connection is reused first
+        self.idle = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(poolSize)
+        self.local = threading.local()
+        self.closed = False
+
+    def newConnection(self):
+        '''
+        Open a new connection to the database.
+        Outputs:
+            connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        '''
+
+        connection = pymysql.connect(host=self.host, user=self.user, port=self.port, passwd=self.password, db=self.dbname)
+        return connection
+
+    def hasOpenWork(self, connection):
+        '''
+        Check if a UnitOfWork or KeyIndex is open on a connection. Such a connection is never reconnected or given back to the
+        pool, since that would silently drop the transaction on the server.
+        Inputs:
+            connection (pymysql.connections.Connection object) - connection to check
+        Outputs:
+            True/False - True if a UnitOfWork or KeyIndex is open on the connection
+        '''
+
+        return (id(connection) in open_units_of_work) or (id(connection) in open_key_indexes)
+
+    def checkConnection(self, connection, lastUsed):
+        '''
+        Make sure a connection that has been idle is still alive. Reconnect if the server dropped it.
+        A connection with an open UnitOfWork or KeyIndex is never pinged or reconnected, since reconnecting would silently drop
+        the transaction on the server. If it is already known to be closed, ConnectionLostError is raised instead.
+        Inputs:
+            connection (pymysql.connections.Connection object) - connection to check
+            lastUsed (float) - time.monotonic() value of the last time the connection was used
+        Outputs:
+            connection (pymysql.connections.Connection object) - live connection (may be a new one)
+        '''
+
+        if time.monotonic() - lastUsed < self.pingInterval:
+            return connection
+
+        if self.hasOpenWork(connection):
+            if getattr(connection, 'open', True) == False:
+                raise ConnectionLostError("ConnectionLostError: connection was closed with a transaction open. The transaction was lost.")
+            return connection
+
+        try:
+            connection.ping(reconnect=True)
+        except Exception:
+            try:
+                connection.close()
+            except Exception:
+                pass
+            connection = self.newConnection()
+
+        return connection
+
+    def acquire(self, timeout=None):
+        '''
+        Take a connection out of the pool, opening a new one if none are idle.
+        Inputs:
+            timeout (float) - optional number of seconds to wait for a free connection
+        Outputs:
+            connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        '''
+
+        if not self.slots.acquire(timeout=timeout):
+            raise PoolTimeoutError("PoolTimeoutError: no connection available after {} seconds".format(timeout))
+
+        try:
+            try:
+                connection, lastUsed = self.idle.get_nowait()
+            except queue.Empty:
+                return self.newConnection()
+
+            return self.checkConnection(connection, lastUsed)
+
+        except:
+            self.slots.release()
+            raise
+
+    def release(self, connection):
+        '''
+        Return a connection to the pool. Any uncommitted work on it is rolled back.
+        Inputs:
+            connection (pymysql.connections.Connection object) - connection taken with acquire()
+        Outputs:
+            none
+        '''
+
+        try:
+            connection.rollback()
+            if self.closed:
+                connection.close()
+            else:
+                self.idle.put((connection, time.monotonic()))
+        except Exception:
+            #connection is broken, don't put it back
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+        self.slots.release()
+
+    @contextlib.contextmanager
+    def connection(self, timeout=None):
+        '''
+        Borrow a connection for a with block. It goes back to the pool when the block ends.
+        ex: with session.connection() as conn:
+                getParameterDicts(stationID, conn)
+        Inputs:
+            timeout (float) - optional number of seconds to wait for a free connection
+        '''
+
+        connection = self.acquire(timeout=timeout)
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def threadConnection(self):
+        '''
+        Return the connection pinned to the calling thread, taking one from the pool the first time. The thread waits at most
+        acquireTimeout seconds for a free connection. Pooled connections only come back when their thread calls releaseThread(),
+        so a thread past poolSize fails with PoolTimeoutError instead of blocking forever on threads that never release.
+        Outputs:
+            connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        '''
+
+        connection = getattr(self.local, 'connection', None)
+        if connection == None:
+            try:
+                connection = self.acquire(timeout=self.acquireTimeout)
+            except PoolTimeoutError:
+                raise PoolTimeoutError("PoolTimeoutError: all {} pooled connections are pinned to other threads after {} seconds. Worker threads must call releaseThread() when they are done.".format(self.poolSize, self.acquireTimeout))
+        else:
+            connection = self.checkConnection(connection, self.local.lastUsed)
+
+        self.local.connection = connection
+        self.local.lastUsed = time.monotonic()
+        return connection
+
+    def releaseThread(self):
+        '''
+        Return the connection pinned to the calling thread (if any) to the pool. Call this when a worker thread is done.
+        '''
+
+        connection = getattr(self.local, 'connection', None)
+        if connection != None:
+            if self.hasOpenWork(connection):
+                raise ConnectionLostError("ConnectionLostError: the thread's connection has a transaction open. Releasing it would lose the transaction.")
+            self.local.connection = None
+            self.release(connection)
+
+    def cursor(self, *args, **kwargs):
+        return self.threadConnection().cursor(*args, **kwargs)
+
+    def commit(self):
+        self.threadConnection().commit()
+
+    def rollback(self):
+        self.threadConnection().rollback()
+
+    def ping(self, reconnect=True):
+        connection = self.threadConnection()
+
+        #reconnecting would silently drop the open transaction
+        if self.hasOpenWork(connection):
+            try:
+                connection.ping(reconnect=False)
+            except Exception:
+                raise ConnectionLostError("ConnectionLostError: connection was closed with a transaction open. The transaction was lost.")
+            return
+
+        connection.ping(reconnect=reconnect)
+
+    def close(self):
+        '''
+        Close every idle connection in the pool. Connections still borrowed are closed when they are released.
+        '''
+
+        self.closed = True
+        self.releaseThread()
+        while True:
+            try:
+                connection, lastUsed = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+
+class UnitOfWork:
+    '''
+    Context manager that runs every write on a connection as one transaction. While it is open the write path (Column,
+    idColumn, fkColumn, and Table insert/update functions) doesn't commit. When the with block ends everything is committed
+    once, or rolled back if anything failed, including DB errors that are normally only printed. Units of work can be nested;
+    only the outermost one commits.
+    ex: with UnitOfWork(connection):
+            site.site.insertTable2db()
+            site.station.insertTable2db()
+    '''
+
+    def __init__(self, connection):
+        '''
+        Initialization function for this object.
+        Inputs:
+            connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        Outputs:
+            (none)
+        '''
+
+        self.connection = connection
+        self.key = None
+
+    def __enter__(self):
+        #resolved once, so the unit of work stays on this thread's connection even if a DBSession was passed
+        self.key = connectionKey(self.connection)
+        open_units_of_work[self.key] = open_units_of_work.get(self.key, 0) + 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        key = self.key
+        open_units_of_work[key] = open_units_of_work[key] - 1
+
+        #nested unit of work. The outer one decides
+        if open_units_of_work[key] > 0:
+            return False
+
+        #the key is only removed once the transaction is finished, so a DBSession doesn't ping or reconnect the connection
+        #in the middle of the commit
+        try:
+            if exc_type == None:
+                self.connection.commit()
+            else:
+                print("Rolling back transaction:", exc_value)
+                self.connection.rollback()
+                #station indexes may have been rebuilt from rows that are now gone
+                invalidateStationIndexes()
+        finally:
+            del open_units_of_work[key]
+
+        return False
+
+
+def indexKey(value):
+    '''
+    Normalize a key value for KeyIndex. MySQL's default collations (eg utf8mb4_general_ci, latin1_swedish_ci) ignore case and
+    trailing spaces when comparing strings, so 'Site1 ' and 'site1' are the same key in the DB and have to be in the index too.
+    Inputs:
+        value (string or int) - key value
+    Outputs:
+        key (string) - the value as a case folded string without trailing spaces
+    '''
+
+    return str(value).rstrip(' ').casefold()
+
+
+class KeyIndex:
+    '''
+    In-memory index of the key values (site.id, station.id, camera.id, gcp.id, geometry.seq, foreign key columns, ...) in the
+    DB. While it is open on a connection, check_id(), check_seq(), check_linked_key(), check_duplicate_id() and
+    Column.check_foreign_key() look values up in its sets instead of querying once per value, and the write path adds every key
+    it writes so later rows in the same batch can link to them. Each table/column is loaded with one query the first time it
+    is needed. With verify, the keys added during the batch are checked against the DB once when the index is closed. Put it
+    inside a UnitOfWork so a failed check rolls the batch back.
+    Keys are compared the way MySQL's default case-insensitive, PAD SPACE collations compare them: case is ignored and
+    trailing spaces are dropped (see indexKey()). Accents are not folded, so a column with an accent-insensitive collation can
+    still hold keys the index treats as different.
+    ex: with UnitOfWork(connection), KeyIndex(connection, verify=True):
+            site.addSite2db()
+    '''
+
+    def __init__(self, connection, verify=False):
+        '''
+        Initialization function for this object.
+        Inputs:
+            connection (pymysql.connections.Connection object) - object representing the connection to the DB
+            verify (boolean) - optional flag for checking the added keys against the DB when the index is closed
+        Outputs:
+            (none)
+        '''
+
+        self.connection = connection
+        self.verify = verify
+
+        #sets of key values as indexKey() strings, keyed by (table, column). added only holds the keys written while the index is open
+        self.keys = {}
+        self.added = {}
+        self.previous = None
+        self.key = None
+
+    def __enter__(self):
+        self.key = connectionKey(self.connection)
+        self.previous = open_key_indexes.get(self.key)
+        open_key_indexes[self.key] = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        key = self.key
+        if self.previous != None:
+            open_key_indexes[key] = self.previous
+        else:
+            del open_key_indexes[key]
+
+        if (exc_type == None) and (self.verify == True):
+            self.verifyKeys()
+
+        return False
+
+    def load(self, table, column):
+        '''
+        Load every value of a key column into memory, unless it has already been loaded.
+        Inputs:
+            table (string) - name of the table
+            column (string) - name of the key column
+        Outputs:
+            keys (set) - set of the column's values as indexKey() strings
+        '''
+
+        if (table, column) not in self.keys:
+            query = "SELECT DISTINCT {} FROM {}".format(column, table)
+            print(query)
+            self.keys[(table, column)] = set([indexKey(row[column]) for row in fetch_rows(self.connection, query)])
+
+        return self.keys[(table, column)]
+
+    def contains(self, table, column, value):
+        '''
+        Check if a value is in a key column.
+        Inputs:
+            table (string) - name of the table
+            column (string) - name of the key column
+            value (string or int) - value to look for
+        Outputs:
+            True/False - True if the value is in the column
+        '''
+
+        return indexKey(value) in self.load(table, column)
+
+    def isin(self, table, column, values):
+        '''
+        Check a whole list of values against a key column at once.
+        Inputs:
+            table (string) - name of the table
+            column (string) - name of the key column
+            values (list) - values to look for
+        Outputs:
+            found (numpy ndarray) - boolean array, True where the value is in the column
+        '''
+
+        keys = self.load(table, column)
+        values = np.array([indexKey(value) for value in values], dtype=object)
+        return np.isin(values, np.array(list(keys), dtype=object))
+
+    def add(self, table, column, values):
+        '''
+        Add newly written values to a key column. Columns that haven't been loaded aren't loaded for this (they pick up the new
+        values from the DB when they are), but the values are still recorded for verifyKeys().
+        Inputs:
+            table (string) - name of the table
+            column (string) - name of the key column
+            values (list) - values that were written
+        Outputs:
+            none
+        '''
+
+        values = [indexKey(value) for value in values if value is not None]
+        if (table, column) in self.keys:
+            self.keys[(table, column)].update(values)
+        self.added.setdefault((table, column), set()).update(values)
+
+    def remove(self, table, column, values):
+        '''
+        Remove values that are no longer in a key column, eg the old id of a renamed row.
+        Inputs:
+            table (string) - name of the table
+            column (string) - name of the key column
+            values (list) - values that were removed
+        Outputs:
+            none
+        '''
+
+        values = [indexKey(value) for value in values if value is not None]
+        if (table, column) in self.keys:
+            self.keys[(table, column)].difference_update(values)
+        if (table, column) in self.added:
+            self.added[(table, column)].difference_update(values)
+
+    def verifyKeys(self):
+        '''
+        Check that every key added during the batch is in the DB, with one IN (...) query per chunk of keys.
+        Inputs:
+            none
+        Outputs:
+            none
+        '''
+
+        for (table, column), values in self.added.items():
+            result = get_rows_in(table, column, list(values), self.connection)
+            missing = values - set([indexKey(value) for value in result[column].tolist()])
+            if len(missing) > 0:
+                raise KeyIndexError("KeyIndexError: {} key(s) written to '{}.{}' not found in the DB: {}".format(len(missing), table, column, sorted(missing)))
+
+
+class Site:
+    '''
+    This class represents a CoastCam site. This object's attributes will store Table objects.
+    table_dict attribute holds the names of all the tables associated with this site.
+    '''
+
+    def __init__(self, name, database, connection):
+        '''
+        Initialization function for this object.
+        Inputs:
+            name (string) - name of the site
+            database (string) - name of the database this site is associated with
+            connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        outputs:
+            (none)
+        '''
+        
+        self.name = name
+        self.database = database
+        self.connection = connection
+
+    def showTables(self):
+        '''
+        Print all the tables and their fields connected to this site
+        Inputs:
+            (none)
+        Outputs:
+            (none)
+        '''
+
+        print('SITE:', self.name, '\n------------------------------------------')
+        for table in self.__dict__:
+            #don't print unless it's a Table object
+            if isinstance(self.__dict__[table], Table):
+                print('\n')
+                self.__dict__[table].showFields()
+
+    def addSite2db(self, batchSize=default_batch_size, rowMode=False, verifyKeys=False):
+        '''
+        Add this site and all it's associated tables to a DB. Every table is written in one transaction (see UnitOfWork), in
+        dependency order with batched statements, so the site is either added completely or not at all. Foreign keys and ids
+        are validated in memory with a KeyIndex.
+        Inputs:
+            batchSize (int) - Optional number of rows per batched statement
+            rowMode (boolean) - Optional flag for writing every row with a single INSERT. See Table.insertRows2db()
+            verifyKeys (boolean) - Optional flag for checking every key written against the DB once before committing
+        Outputs:
+            (none)
+        '''
+
+        #tables need to be added in specific order. Populate list accordingly
+        table_list = [None] * 9 
+        for table in self.__dict__:
+            if isinstance(self.__dict__[table], Table):
+
+                if self.__dict__[table].table_name == 'site':
+                    table_list[0] = self.__dict__[table]
+
+                elif self.__dict__[table].table_name == 'cameramodel':
+                    table_list[1] = self.__dict__[table]
+
+                elif self.__dict__[table].table_name == 'lensmodel':
+                    table_list[2] = self.__dict__[table]
+
+                elif self.__dict__[table].table_name == 'ip':
+                    table_list[3] = self.__dict__[table]
+
+                elif self.__dict__[table].table_name == 'station':
+                    table_list[4] = self.__dict__[table]
+
+                elif self.__dict__[table].table_name == 'gcp':
+                    table_list[5] = self.__dict__[table]
+
+                elif self.__dict__[table].table_name == 'camera':
+                    table_list[6] = self.__dict__[table]
+
+                elif self.__dict__[table].table_name == 'geometry':
+                    table_list[7] = self.__dict__[table]
+
+                elif self.__dict__[table].table_name == 'usedgcp':
+                    table_list[8] = self.__dict__[table]
+
+        with UnitOfWork(self.connection), KeyIndex(self.connection, verify=verifyKeys):
+            for table in table_list:
+                #sites don't need every table
+                if table != None:
+                    table.insertTable2db(batchSize=batchSize, rowMode=rowMode)
+
+    
+class Table:
+    '''
+    This class represents a table in the CoastCamDB. The attributes of this class represent the columns in the table.
+    This Table object can be added to a Site object as an attribute
+    '''
+
+    def __init__(self, table_name, database, connection, site=None):
+        '''
+        Initialization function for this object.
+        Inputs:
+            field_name (string) - name of the Table
+            database (string) - name of the database this Table is in
+            connection (pymysql.connections.Connection object) - object representing the connection to the DB
+            site (Site object) - site that this object corresponds to.
+        Outputs:
+            (none)
+        '''
+
+        self.table_name = table_name
+        self.database = database
+        self.site = site
+        self.connection = connection
+        self.inserted_seqs = [] #seq of every row written by insertTable2db(), in the order of the queued values
+
+
+    def showFields(self):
+        '''
+        Print the field name and value for each field in the table
+        Inputs:
+            (none)
+        Outputs:
+            (none)
+        '''
+
+        print('TABLE:', self.table_name, '\n---------------------')
+        for column in self.__dict__:
+            #don't print unless it's a Column object
+            if isinstance(self.__dict__[column], Column) or isinstance(self.__dict__[column], idColumn) or isinstance(self.__dict__[column], fkColumn):
+                self.__dict__[column].showColumn()
+
+    def getTableSeqs(self):
+        '''
+        Query the database and get all the entries in the seq column in this table
+        '''
+
+        query = "SELECT seq FROM {}".format(self.table_name)
+        print(query)
+
+        rows = fetch_rows(self.connection, query)
+        seq_list = []
+        for row in rows:
+            seq_list.append(row['seq'])
+
+        return seq_list
+
+
+    def insertMultipleFK(self, returnSeqListFlag=False, batchSize=None):
+        '''
+        Insert multiple foreign key values into the database at the same time. Used for the special case tables camera and usedgcp
+        Inputs:
+            returnSeqListFlag (boolean) - Optional argument specifying whether or not the function will return a seq_list. This
+                                          seq_list is a list of seq values from the database associated with each new foreign key
+                                          inserted into the database
+            batchSize (int) - Optional number of rows written per commit. If not given, every row is committed on its own.
+        Outputs:
+            seq_list (list) - optional output argument that is a list of seq values from the database
+        '''
 
         if (self.table_name != 'camera') and (self.table_name != 'usedgcp'):
             print("table not eligible to insert multiple foreign key values")
             return
 
         fk_columns = []
-        multi_fk_dict = {} #store fk columns and list of values
+        multi_fk_dict = {} #store fk columns and list of values
+        for column in self.__dict__:
+            
+            #get list of fkColumn objects
+            if isinstance(self.__dict__[column], fkColumn):
+                fk_columns.append(self.__dict__[column])
+                multi_fk_dict[self.__dict__[column].column_name] = self.__dict__[column].value_list
+
+        #error checking
+        try:
+            if (self.table_name == 'camera') and (len(fk_columns) != 4):
+                raise FKError("FKError: Incorrect number of foreign key columns attributed to this table")
+            elif (self.table_name == 'usedgcp') and (len(fk_columns) != 2):
+                raise FKError("FKError: Incorrect number of foreign key columns attributed to this table")
+            
+            for i in range(0, len(fk_columns)):
+                if len(fk_columns[i - 1].value_list) != len(fk_columns[i].value_list):
+                    raise FKError("FKError: foreign key column object value lists have unequal lengths")
+
+                #check value of each foreign key
+                for j in range(0, len(fk_columns[i].value_list)):
+                    linked_table = fk_columns[i].get_linked_table(fk_columns[i].column_name)
+                    
+                    #special case: check that geometrySequence matches a seq value in geometry table. If not, set geometrySequence to most recently inserted seq value in geometry.
+                    #this is because seq auto increments for each new insertion in geometry
+                    if fk_columns[i].column_name == 'geometrySequence':
+
+                        if not keyExists(self.connection, 'geometry', 'seq', fk_columns[i].value_list[j]):
+                            
+                            #check if geometry is empty
+                            query = "SELECT 1 FROM geometry LIMIT 1"
+                            if exists(self.connection, query):
+                                #if not empty, reassign geometrySequence to be most recently inserted seq value in the table
+                                seq = self.latestGeometrySeq()
+                            else:
+                                #if empty create placeholder value of 0 in geometry. The server assigns it the next seq
+                                query = buildStatement('insert', 'geometry', ['seq'])
+                                seq = executeInsert(self.connection, query, [0])
+                                addKeys(self.connection, 'geometry', 'seq', [seq])
+
+                            print('geometrySequence reassigned to most recently inserted seq value in geometry')
+                            fk_columns[i].value_list[j] = seq
+                            print('new seq', fk_columns[i].value_list[j])
+                            
+                    else:
+                        check_linked_key(fk_columns[i].value_list[j], fk_columns[i].column_name, linked_table, fk_columns[i].connection)
+                    
+        except Exception as e:
+            sys.exit(e.message)
+
+        #insert all foreign keys. Columns are bound by name so each value lands in its own column
+        if self.table_name == 'camera':
+            insert_columns = ['stationID', 'modelID', 'lensmodelID', 'li_IP']
+        if self.table_name == 'usedgcp':
+            insert_columns = ['gcpID', 'geometrySequence']
+        query = buildStatement('insert', self.table_name, insert_columns)
+        arg_list = [[value2db(multi_fk_dict[column][j]) for column in insert_columns] for j in range(0, len(fk_columns[0].value_list))]
+
+        cursor = self.connection.cursor()
+        if (self.table_name == 'usedgcp') and (batchSize != None):
+            #no ids to fill in later, so the rows go in as multi-row inserts and the seqs come back with them
+            print("{} ({} rows)".format(query, len(arg_list)))
+            seq_list = executeInsertBatch(self.connection, self.table_name, insert_columns, arg_list, batchSize=batchSize, cursor=cursor)
+        else:
+            seq_list = []
+            for j, args in enumerate(arg_list):
+
+                #the real id is added later by insertNewID(), so the row gets a placeholder id until then
+                if self.table_name != 'usedgcp':
+                    seq = insertWithPlaceholderID(self.table_name, insert_columns, args, self.connection, cursor=cursor, commit=(batchSize == None))
+                else:
+                    print(query)
+                    seq = executeInsert(self.connection, query, args, cursor=cursor, commit=(batchSize == None))
+                seq_list.append(seq)
+
+                commitBatch(self.connection, j + 1, batchSize)
+
+            if batchSize != None:
+                commitWrite(self.connection)
+        cursor.close()
+
+        addKeys(self.connection, self.table_name, 'seq', seq_list)
+        for i, column in enumerate(insert_columns):
+            addKeys(self.connection, self.table_name, column, [args[i] for args, seq in zip(arg_list, seq_list) if seq != None])
+
+        #clear value_lists
+        for column in fk_columns:
+            column.value_list = []
+
+        if returnSeqListFlag == True:
+            return seq_list
+        
+
+    def insertTable2db(self, batchSize=None, transaction=False, rowMode=False, onDuplicate=False):
+        '''
+        Insert all columns in this table to the database. By default every value is written and committed on its own. With a
+        batchSize the queued values of every column are written in batches, and with transaction the whole table is one
+        transaction (see UnitOfWork) that is committed once at the end, or rolled back if anything fails.
+        Inputs:
+            batchSize (int) - Optional number of rows per batched statement, eg default_batch_size. If None (default), every
+                              value is written on its own.
+            transaction (boolean) - Optional flag for writing the table in one transaction (default is False). If False, every
+                                    batch (or value, with no batchSize) is committed as it is written.
+            rowMode (boolean) - Optional flag for assembling every row from the queued column values and writing it with one
+                                INSERT, instead of inserting the foreign keys and id first and then updating one column at a time.
+                                See insertRows2db()
+            onDuplicate (boolean) - Optional, used with rowMode. Update rows whose id already exists instead of skipping them.
+        Outputs:
+            none
+        '''
+
+        if transaction == True:
+            with UnitOfWork(self.connection):
+                self.insertTable2db(batchSize=batchSize, transaction=False, rowMode=rowMode, onDuplicate=onDuplicate)
+            return
+
+        if rowMode == True:
+            self.insertRows2db(batchSize=batchSize, onDuplicate=onDuplicate)
+            return
+        
+        fk_columns = []
+        id_column = None
+        other_columns = []
+        for column in self.__dict__:
+
+            if isinstance(self.__dict__[column], fkColumn):
+                fk_columns.append(self.__dict__[column])
+
+            elif isinstance(self.__dict__[column], idColumn):
+                id_column = self.__dict__[column]
+
+            elif isinstance(self.__dict__[column], Column):
+                other_columns.append(self.__dict__[column])
+
+        #vvv ADD FOREIGN KEY(S) TO TABLE vvv#
+        fk_args = []
+        returnSeqListFlag = False
+        seq_list = []
+        if len(fk_columns) > 1:
+            print('mulitple fk')
+
+            returnSeqListFlag = True
+
+            #check value list for all fk columns have the same length
+            try:
+                for i in range(0, len(fk_columns)):
+                    if len(fk_columns[i - 1].value_list) != len(fk_columns[i].value_list):
+                        raise FKError("FKError: foreign key column object value lists have unequal lengths")
+
+            except Exception as e:
+                sys.exit(e.message)
+                
+            for i in range(0, len(fk_columns[0].value_list)):
+
+                fk_dict = {}
+                fk_args.append(fk_dict)
+                
+                for column in fk_columns:
+
+                    fk_args[i][column.column_name] = column.value_list[i]
+
+##            if (self.table_name == 'usedgcp') or (self.table_name == 'geometry'):
+##                returnSeqListFlag = True
+
+            seq_list = self.insertMultipleFK(returnSeqListFlag=returnSeqListFlag, batchSize=batchSize)
+            
+        elif len(fk_columns) == 1:
+            print('1 fk')
+
+            returnSeqListFlag = True
+
+            for i in range(0, len(fk_columns[0].value_list)):
+
+                fk_args.append({fk_columns[0].column_name : fk_columns[0].value_list[i]})
+
+##            if (self.table_name == 'usedgcp') or (self.table_name == 'geometry'):
+##                returnSeqListFlag = True
+
+            seq_list = fk_columns[0].insert2db(returnSeqListFlag=returnSeqListFlag, batchSize=batchSize)
+            
+        else:
+            print('no fk')
+            pass
+
+        print('SEQLIST', seq_list)
+        self.inserted_seqs = list(seq_list)
+
+        #vvv ADD ID TO TABLE vvv#
+        if id_column != None:
+            print('has id column')
+            id_list = id_column.value_list
+            id_column.insert2db(fk_args=fk_args, seq_list=seq_list, batchSize=batchSize)
+
+        else:
+            print('no id column')
+            pass
+
+        #vvv ADD ALL OTHER COLUMNS vvv#
+        if (self.table_name == 'geometry') or (self.table_name == 'usedgcp'):
+            for i in range(0, len(other_columns)):
+                other_columns[i].update2db(seq_list=seq_list, batchSize=batchSize)
+        else:
+            for i in range(0, len(other_columns)):
+                other_columns[i].update2db(id_list=id_list, batchSize=batchSize)
+                
+    def geometrySeqs(self):
+        '''
+        Return the seqs of the geometry rows written for this table's site (see insertTable2db()). Empty if the table has no
+        site, the site has no geometry table, or the geometry table hasn't been written yet.
+        Inputs:
+            none
+        Outputs:
+            geometry_seqs (list) - seq values of the site's geometry rows, in the order they were queued
+        '''
+
+        if self.site == None:
+            return []
+
+        for table in self.site.__dict__.values():
+            if isinstance(table, Table) and (table.table_name == 'geometry'):
+                return [seq for seq in table.inserted_seqs if seq != None]
+
+        return []
+
+    def latestGeometrySeq(self):
+        '''
+        Return the seq of the most recently inserted geometry row. That is the last geometry row written for this table's site
+        (read back from its insert, so a row written by someone else in the meantime isn't picked up) if there is one, otherwise
+        the largest seq in the geometry table.
+        Inputs:
+            none
+        Outputs:
+            seq (int) - seq of the most recent geometry row. None if geometry is empty.
+        '''
+
+        geometry_seqs = self.geometrySeqs()
+        if len(geometry_seqs) > 0:
+            return geometry_seqs[-1]
+
+        return fetch_scalar(self.connection, "SELECT MAX(seq) FROM geometry")
+
+    def mapGeometrySequence(self, column):
+        '''
+        Reassign queued geometrySequence values that don't match a seq in the geometry table to the most recently inserted geometry
+        row (see latestGeometrySeq()), the same as insertMultipleFK(). Values that already match a geometry row are kept as they are.
+        Nothing changes if geometry is empty.
+        Inputs:
+            column (fkColumn object) - the geometrySequence column. Its value_list is changed in place.
+        Outputs:
+            reassigned (int) - number of values that were reassigned
+        '''
+
+        found = findKeys(self.connection, 'geometry', 'seq', column.value_list)
+        if found.all():
+            return 0
+
+        seq = self.latestGeometrySeq()
+        if seq == None:
+            return 0
+
+        #in place, other code holds a reference to the value list
+        for i in range(0, len(column.value_list)):
+            if not found[i]:
+                column.value_list[i] = seq
+
+        print('geometrySequence reassigned to most recently inserted seq value in geometry', seq)
+
+        return int((~found).sum())
+
+    def insertRows2db(self, batchSize=default_batch_size, onDuplicate=False):
+        '''
+        Insert all queued column values in this table as whole rows. Row i is made of the i-th value of every column that has
+        queued values, and the rows are written with one multi-row INSERT per batch. Foreign keys are checked against their
+        linked tables and ids against this table with one IN (...) query per column instead of one lookup per value. Rows with
+        an id that already exists are skipped, or update the existing row with onDuplicate. geometrySequence values of a new
+        site that match no geometry row are reassigned to the most recent geometry row first (see mapGeometrySequence()).
+        Inputs:
+            batchSize (int) - Optional number of rows per statement. Pass None to write every row on its own.
+            onDuplicate (boolean) - Optional flag for updating rows whose id already exists (INSERT ... ON DUPLICATE KEY UPDATE)
+        Outputs:
+            seq_list (list) - seq of every queued row, in the same order as the queued values. None for rows that were skipped
+                              or whose batch failed.
+        '''
+
+        #fk columns first, then id, then everything else, so the column order matches the step-by-step insert
+        fk_columns = []
+        id_column = None
+        other_columns = []
         for column in self.__dict__:
-            
-            #get list of fkColumn objects
+
             if isinstance(self.__dict__[column], fkColumn):
                 fk_columns.append(self.__dict__[column])
-                multi_fk_dict[self.__dict__[column].column_name] = self.__dict__[column].value_list
 
-        #error checking
+            elif isinstance(self.__dict__[column], idColumn):
+                id_column = self.__dict__[column]
+
+            elif isinstance(self.__dict__[column], Column):
+                other_columns.append(self.__dict__[column])
+
+        columns = fk_columns + ([id_column] if id_column != None else []) + other_columns
+        columns = [column for column in columns if len(column.value_list) > 0]
+
         try:
-            if (self.table_name == 'camera') and (len(fk_columns) != 4):
-                raise FKError("FKError: Incorrect number of foreign key columns attributed to this table")
-            elif (self.table_name == 'usedgcp') and (len(fk_columns) != 2):
-                raise FKError("FKError: Incorrect number of foreign key columns attributed to this table")
-            
-            for i in range(0, len(fk_columns)):
-                if len(fk_columns[i - 1].value_list) != len(fk_columns[i].value_list):
-                    raise FKError("FKError: foreign key column object value lists have unequal lengths")
+            if len(columns) == 0:
+                raise EmptyValueError(message="EmptyValueError: Empty value lists for every column in table '{}'".format(self.table_name))
 
-                #check value of each foreign key
-                for j in range(0, len(fk_columns[i].value_list)):
-                    linked_table = fk_columns[i].get_linked_table(fk_columns[i].column_name)
-                    
-                    #special case: check that geometrySequence matches a seq value in geometry table. If not, set geometrySequence to most recently inserted seq value in geometry.
-                    #this is because seq auto increments for each new insertion in geometry
-                    if fk_columns[i].column_name == 'geometrySequence':
+            numRows = len(columns[0].value_list)
+            for column in columns:
+                if len(column.value_list) != numRows:
+                    raise ListLengthError("ListLengthError: column '{}' has {} values but table '{}' has {} rows queued".format(column.column_name, len(column.value_list), self.table_name, numRows))
+
+            #every fk value has to exist in its linked table
+            for column in fk_columns:
+                if len(column.value_list) == 0:
+                    continue
+
+                if column.column_name == 'geometrySequence':
+                    self.mapGeometrySequence(column)
+
+                linked_column = 'seq' if column.linked_table == 'geometry' else 'id'
+                found = findKeys(self.connection, column.linked_table, linked_column, column.value_list)
+
+                for value, isFound in zip(column.value_list, found):
+                    if not isFound:
+                        if linked_column == 'seq':
+                            raise NoSeqError("NoSeqError: No 'seq' {} found in table '{}'".format(value, column.linked_table))
+                        raise NoMatchIDError("NoMatchIDError: No id '{}' found in table '{}'".format(value, column.linked_table))
 
-                        query = "SELECT seq FROM geometry WHERE seq = {}".format(fk_columns[i].value_list[j])
-                        result = pd.read_sql(query, con=self.connection)
-                        if result.size == 0:
-                            
-                            #check if geometry is empty
-                            query = "SELECT seq FROM geometry"
-                            result = pd.read_sql(query, con=self.connection)
-                            if result.size == 0:
-                                #if empty create placeholder value of 0 in geometry
-                                query = "INSERT INTO geometry (seq) VALUES (0)"
-
-                                cursor = self.connection.cursor()
-                                try:
-                                    cursor.execute(query)
-                                    self.connection.commit()
-                                except mysql.connector.Error as err:
-                                    print(err.msg)
-                            
-                            print('geometrySequence reassigned to most recently inserted seq value in geometry')
-                            
-                            #if not empty, reassign geometrySequence to be most recently inserted seq value in the table
-                            seq_query = "SELECT MAX(seq) FROM {}".format(linked_table)
-                            result = pd.read_sql(seq_query, con=self.connection)
-                            seq = result.get('MAX(seq)')[0]
-                            fk_columns[i].value_list[j] = seq
-                            print('new seq', fk_columns[i].value_list[j])
-                            
-                    else:
-                        check_linked_key(fk_columns[i].value_list[j], fk_columns[i].column_name, linked_table, fk_columns[i].connection)
-                    
         except Exception as e:
             sys.exit(e.message)
 
-        #insert all foreign keys
-        seq_list = []
-        for j in range(0, len(fk_columns[0].value_list)):
+        rows = [[value2db(column.value_list[i]) for column in columns] for i in range(0, numRows)]
+        column_names = [column.column_name for column in columns]
+
+        #positions of the queued rows that are written
+        written = list(range(0, numRows))
+
+        #skip rows with an id that is already in the table, the same as idColumn.insertNewID()
+        if (id_column != None) and (id_column in columns) and (onDuplicate == False):
+            found = findKeys(self.connection, self.table_name, 'id', id_column.value_list)
+            if found.any():
+                print("Duplicate id value(s) {}. Row(s) not inserted.".format([ID for ID, isFound in zip(id_column.value_list, found) if isFound]))
+                written = [i for i in written if not found[i]]
+
+        if batchSize == None:
+            batchSize = 1
+
+        cursor = self.connection.cursor()
+        print("INSERT INTO {} ({}) ({} rows)".format(self.table_name, ', '.join(column_names), len(written)))
+        written_seqs = executeInsertBatch(self.connection, self.table_name, column_names, [rows[i] for i in written], batchSize=batchSize, cursor=cursor, onDuplicate=onDuplicate)
+        cursor.close()
+
+        #skipped rows keep a None so every seq stays lined up with its queued row
+        seq_list = [None] * numRows
+        for i, seq in zip(written, written_seqs):
+            seq_list[i] = seq
+
+        #only key columns (id and foreign keys) go into the KeyIndex
+        addKeys(self.connection, self.table_name, 'seq', seq_list)
+        for j, column in enumerate(columns):
+            if isinstance(column, (idColumn, fkColumn)):
+                addKeys(self.connection, self.table_name, column.column_name, [row[j] for row, seq in zip(rows, seq_list) if seq != None])
+
+        #clear value_lists
+        for column in columns:
+            column.value_list = []
+
+        self.inserted_seqs = list(seq_list)
+
+        return seq_list
+
+    def disp_db_table(self):
+        '''
+        Query the database and display all rows for the associated table
+        '''
+        
+        query = "SELECT * FROM {}".format(self.table_name)
+        print(query)
+
+        result = pd.read_sql(query, con=self.connection)
+        df = pd.DataFrame(result)
+        with pd.option_context('display.max_rows', None, 'display.max_columns', None):  # more options can be specified also
+            print(df)
+
+    def tableFromDB(self, id_seq):
+        '''
+        Retrieve all columns in a row in a table given a unique id/seq. Return as a dictionary object.
+        Inputs:
+            id_seq (string or int) - id (string) or seq (int) value used to specify which row of the column to get the value from.
+        Outputs:
+            value_dict (dict) - dictonary of values retrieved from the row in the table. The key is column name, the value is the column
+                                value.
+        '''
+
+        column_list = []
+        for column in self.__dict__:
+            if isinstance(self.__dict__[column], Column):
+                column_list.append(self.__dict__[column])
+
+        value_dict = {}
+        for column in column_list:
+            value = column.valueFromDB(id_seq)
+            value_dict[column.column_name] = value
+
+        return value_dict
+        
+
+class Column:
+    '''
+    This class represents a column in the CoastCamDB. This Column can be added to a Table object as an attribute.
+    The value_list attribute acts as a queue of values to be added to the column in the DB.
+    '''
+
+    '''
+    Foreign key (fk) dictionary. Necessary for inserting values into most tables.
+    The key is the name of the table, and the value is a tuple where the 1st element is the table the fk links to
+    and the 2nd element is the fk column. Every fk links to the 'id' column of the upper-level table, except for
+    the fk geometrySequence in the 'usedgcp' table, which links to the 'seq' column in the 'geometry' table. If the
+    table has multiple foreign keys, the value will be a list of tuples with one tuple per fk.
+    '''
+    fk_dict = {'station': ('site', 'siteID'),
+               'camera': [('station', 'stationID'), ('cameramodel', 'modelID'), ('lensmodel', 'lensmodelID'), ('ip', 'li_IP')],
+               'geometry': ('camera', 'cameraID'),
+               'gcp': ('site', 'siteID'),
+               'usedgcp': [('gcp', 'gcpID'), ('geometry', 'geometrySequence')] }
+
+    '''list of all possible foregin key volumns'''
+    fk_column_list = ['siteID', 'stationID', 'modelID', 'lensmodelID', 'li_IP', 'cameraID', 'siteID', 'gcpID', 'geometrySequence']
+
+    def __init__(self, column_name, table, value=None):
+        '''
+        Initialize the Column object. Assign name and Table. Additionally, Append value to the column's value_list (queue).
+        Inputs:
+            column_name (string) - name of the Column
+            value - Value to be inserted in the column in the database. Can be one of a number of possible data types.
+            table (Table) - Table object that this column is associated with. Represents the table the column is in in the DB.
+        '''
+
+        self.column_name = column_name
+        self.table = table
+        self.database = table.database
+
+        self.value_list = []
+        self.value_list.append(value)
+
+        self.connection = table.connection
+
+
+    def showColumn(self):
+        '''
+        Print Column object value
+        '''
+        print('COLUMN "{}" in TABLE "{}" ----- value(s) = {}'.format(self.column_name, self.table.table_name, [value for value in self.value_list]))
+
+
+    def add2queue(self, value):
+        '''
+        Add a value to this Column's value_list (aka queue for data to be entered into DB)
+        Inputs:
+            value - Value to be inserted in the column in the database. Can be one of a number of possible data types.
+        Outputs:
+            none
+        '''
+
+        if self.value_list[0] == None:
+            self.value_list[0] = value
+        else:
+            self.value_list.append(value)
+
+    def check_list_length(self, idseq_list):
+        '''
+        Check to make sure that the length of the list of ids or seqs is the same length as the value list of this Column object.
+        Raise exception if the number of given id/seq values to insert into table isn't the same as the number of values to insert
+        Inputs:
+            idseq_list (list) - list of id or seq values corresponding to multiple values in this object's value list
+        Outputs:
+            none
+        '''
+
+        try:
+            if len(idseq_list) != len(self.value_list):
+                raise ListLengthError("ListLengthError: number of given id/seq values is not the same as the number of values to be inserted into table '{}'\nlength of id/seq list: {}\nlength of values: {}".format(self.table.table_name, len(idseq_list), len(self.value_list)))
+    
+        except Exception as e:
+            sys.exit(e.message)
+
+    def get_foreign_key(self):
+        '''
+        Return the foreign key(s) associated with this column in the database
+        Inputs:
+            none
+        Outputs:
+            foreign_keys (tuple or list of tuples) - returns a tuple of the foreign key to be used in the SQL WHERE clause
+                                                     when updating the column. The first element in the tuple is the table the
+                                                     fk links to, and the second element is the column name of the foreign key.
+                                                     If theere are multiple foregin keys, this method returns a list of tuples.
+        '''
+        try:
+            return self.fk_dict[self.table.table_name]
+        
+        except Exception:
+            print("No foreign keys for table '{}'".format(self.table.table_name))
+            return ''
+            
 
-            hasBlankID = False
+    def get_linked_table(self, fk_column):
+        '''
+        Return the name of a foreign key (fk), return the name of the table that the fk links to.
+        Inputs:
+            fk_column (string) - name of the foreign key column in the this Column object's associated table
+        Outputs:
+            linked_table (string) - name of the table the fk links to
+        '''
+
+        if self.column_name not in self.fk_column_list:
+            print('column does not link to another table')
+            return ''
+
+        if self.table.table_name == 'camera':
+
+            if fk_column == 'stationID':
+
+                linked_table = 'station'
+
+            elif fk_column == 'modelID':
+
+                linked_table = 'cameramodel'
+
+            elif fk_column == 'lensmodelID':
+
+                linked_table = 'lensmodel'
+
+            elif fk_column == 'li_IP':
+
+                linked_table = 'ip'
+
+        elif self.table.table_name == 'usedgcp':
 
-            #can only insert one fk for per row with blank id value, so check for blank id and create placeholder id
-            if self.table_name != 'usedgcp':
-                hasBlankID = fk_columns[0].check_for_blank_id()
+            if fk_column == 'gcpID':
+
+                linked_table = 'gcp'
+
+            elif fk_column == 'geometrySequence':
+
+                linked_table = 'geometry'
+
+        else:
+            linked_table = self.fk_dict[self.table.table_name][0]
+
+        return linked_table
+
+    def check_foreign_key(self, fk_column, fk_value):
+        '''
+        Check that the foreign key is valid and exists in the same table as this column
+        Inputs:
+            fk_column (string) - name of the foregin key column to be checked
+            fk_value (string or int) - id/seq value of the foreign key
+        Outputs:
+            none
+        '''
+
+        #check that foreign key is valid and exists
+        try:
+            if fk_column not in self.fk_column_list:
+                raise FKError("FKError: invalid foreign key '{}'".format(fk_column))
+
+            #NULL return, no seq/id found
+            if not keyExists(self.connection, self.table.table_name, fk_column, fk_value):
+                raise NoIDError("NoSeqError: No foreign_key '{}' with value '{}' found in table '{}'".format(fk_column, fk_value, self.table.table_name))
             
-            if hasBlankID:
+        except Exception as e:
+            sys.exit(e.message)
 
-                placeholder_id = str(random.randint(0, 9999999))
-                isDuplicate = fk_columns[0].check_duplicate_id(placeholder_id)
-                
-                while isDuplicate:
-                    placeholder_id = str(random.randint(0, 9999999))
-                    isDuplicate = fk_columns[0].check_duplicate_id(placeholder_id)
 
-                #insert placeholder so there's no error for having blank id values when inserting fk
-                query = "UPDATE {} SET id = '{}' WHERE id = ''".format(self.table_name, placeholder_id)
+    def fk_from_id(self, ID):
+        '''
+        Given an ID value in a database table, find the corresponding foreign key value (same row).
+        Inputs:
+            ID (string) - id column value
+        Outputs:
+            fk_column (string) - name of the foreign key column in the table
+            fk_value (string) - foreign key value for corresponding id
+        '''
 
-                print(query)
-                cursor = self.connection.cursor()
-                try:
-                    cursor.execute(query)
-                    self.connection.commit()
-                except mysql.connector.Error as err:
-                    print(err.msg) 
-
-            if self.table_name == 'camera':
-                
-                query = "INSERT INTO camera (stationID, li_IP, lensmodelID, modelID) VALUES ('{}', '{}', '{}', '{}')".format(multi_fk_dict['stationID'][j], multi_fk_dict['modelID'][j], multi_fk_dict['lensmodelID'][j], multi_fk_dict['li_IP'][j]) 
+        fk_pair = self.get_foreign_key()
 
-            if self.table_name == 'usedgcp':
+        #for tables that have multiple fk columns, fk_pair is a list of tuples
+        if isinstance(fk_pair, list):
+            #only need 1 fk value  for purposes of inserting values into database
+            fk_column = fk_pair[0][1]
 
-                query = "INSERT INTO usedgcp (gcpID, geometrySequence) VALUES ('{}', {})".format(multi_fk_dict['gcpID'][j], multi_fk_dict['geometrySequence'][j])
+        #table only has 1 foreign key column, fk_pair is a tuple
+        else:
+            print(fk_pair)
+            fk_column = fk_pair[1]
+            
+        check_id(ID, self.table.table_name, self.connection)
+        
+        query = "SELECT {} FROM {} WHERE id = %s".format(fk_column, self.table.table_name)
+        print(query)
 
-            print(query)
+        fk_value = fetch_scalar(self.connection, query, (ID,))
+        return fk_column, fk_value
+    
 
-            cursor = self.connection.cursor()
-            try:
-                cursor.execute(query)
-                self.connection.commit()
-            except mysql.connector.Error as err:
-                print(err.msg)
+    def fk_from_seq(self, seq):
+        '''
+        Given a seq value in a database table, find the corresponding foreign key value (same row).
+        Inputs:
+            seq (int) - seq column value
+        Outputs:
+            fk_column (string) - name of the foreign key column in the table
+            fk_value (int) - foreign key value for corresponding seq
+        '''
 
-            #get the seq of the most recently added database entry. Since seq auto-increments most recent value is the max
-            seq_query = "SELECT MAX(seq) FROM {}".format(self.table_name)
-            result = pd.read_sql(seq_query, con=self.connection)
-            seq = result.get('MAX(seq)')[0]
-            seq_list.append(seq)
+        fk_pair = self.get_foreign_key()
 
-        #clear value_lists
-        for column in fk_columns:
-            column.value_list = []
+        #for tables that have multiple fk columns, fk_pair is a list of tuples
+        if isinstance(fk_pair, list):
+            #only need 1 fk value  for purposes of inserting values into database
+            fk_column = fk_pair[0][1]
 
-        if returnSeqListFlag == True:
-            return seq_list
+        #table only has 1 foreign key column, fk_pair is a tuple
+        else:
+            fk_column = fk_pair[1]
+            
+        check_seq(seq, self.table.table_name, self.connection)
         
+        query = "SELECT {} FROM {} WHERE seq = %s".format(fk_column, self.table.table_name)
+        print(query)
 
-    def insertTable2db(self):
+        fk_value = fetch_scalar(self.connection, query, (seq,))
+        return fk_column, fk_value
+    
+
+    def check_duplicate_id(self, ID):
         '''
-        Insert all columns in this table to the database.
+        check if id already exists in the column's associated table.
+        Inputs:
+            ID (string) - ID to be checked
+        Outputs:
+            isDuplicate (boolean) - true/false variable stating whether or not the id is a duplicate
         '''
-        
-        fk_columns = []
-        id_column = None
-        other_columns = []
-        for column in self.__dict__:
 
-            if isinstance(self.__dict__[column], fkColumn):
-                fk_columns.append(self.__dict__[column])
+        isDuplicate = keyExists(self.connection, self.table.table_name, 'id', ID)
 
-            elif isinstance(self.__dict__[column], idColumn):
-                id_column = self.__dict__[column]
+        return isDuplicate
+    
 
-            elif isinstance(self.__dict__[column], Column):
-                other_columns.append(self.__dict__[column])
+    def check_for_blank_id(self):
+        '''
+        Check if any rows in the column's associated table have a blank id value. Used for inserting new foreign keys.
+        Can only have one blank id per table or else inserting a new fk will fail.
+        Inputs:
+            none
+        Outputs:
+            hasBlankID (boolean) - true or flase result whether id is blank
+        '''
 
-        #vvv ADD FOREIGN KEY(S) TO TABLE vvv#
-        fk_args = []
-        returnSeqListFlag = False
-        seq_list = []
-        if len(fk_columns) > 1:
-            print('mulitple fk')
+        query = "SELECT 1 FROM {} WHERE id = '' LIMIT 1".format(self.table.table_name)
+        
+        hasBlankID = exists(self.connection, query)
 
-            returnSeqListFlag = True
+        return hasBlankID
 
-            #check value list for all fk columns have the same length
-            try:
-                for i in range(0, len(fk_columns)):
-                    if len(fk_columns[i - 1].value_list) != len(fk_columns[i].value_list):
-                        raise FKError("FKError: foreign key column object value lists have unequal lengths")
 
-            except Exception as e:
-                sys.exit(e.message)
-                
-            for i in range(0, len(fk_columns[0].value_list)):
+    def check_blank_value(self, idseq):
+        '''
+        Given an id/seq value, check if the value is blank for this column for the given row.
+        Inputs:
+            idseq (string) - id or seq value used to specify the row
+        Outputs:
+            hasBlankValue (bool) - True or False value describing if there is a blank value for the column in the specified row
+        '''
 
-                fk_dict = {}
-                fk_args.append(fk_dict)
-                
-                for column in fk_columns:
+        hasBlankValue = False
+        
+        if (self.table.table_name == 'geometry') or (self.table.table_name == 'usedgcp'):
+            query = "SELECT {} FROM {} WHERE seq = %s".format(self.column_name, self.table.table_name)
+        else:
+            query = "SELECT {} FROM {} WHERE id = %s".format(self.column_name, self.table.table_name)
 
-                    fk_args[i][column.column_name] = column.value_list[i]
+        rows = fetch_rows(self.connection, query, (idseq,))
+        for row in rows:
+            if row[self.column_name] == '':
+                hasBlankValue = True
+                print('BLANK VALUE')
 
-##            if (self.table_name == 'usedgcp') or (self.table_name == 'geometry'):
-##                returnSeqListFlag = True
+        return hasBlankValue
 
-            seq_list = self.insertMultipleFK(returnSeqListFlag=returnSeqListFlag)
-            
-        elif len(fk_columns) == 1:
-            print('1 fk')
 
-            returnSeqListFlag = True
+    def insert2db(self, fk_args=[], seq_list=[], returnSeqListFlag=False, batchSize=None):
+        '''
+        insert new value into for this column into the database. Depending on the table, specify a foreign key
+        Inserts:
+            fk_args (list) - list of dictionaries used for foreign key arguments. Used when this function calls insertNewID().
+            seq_list (list) - list of seq values of the rows the ids go into. Used when this function calls insertNewID().
+            returnSeqListFlag (boolean) - Optional argument specifying whether or not the function will return a seq_list. This
+                                          seq_list is a list of seq values from the database associated with each new foreign key
+                                          inserted into the database
+            batchSize (int) - Optional number of values written per commit. If not given, every value is committed on its own.
+        Outputs:
+            seq_list (list) - optional output argument that is a list of seq values from the database
+        '''
 
-            for i in range(0, len(fk_columns[0].value_list)):
+        try:
 
-                fk_args.append({fk_columns[0].column_name : fk_columns[0].value_list[i]})
+            if len(self.value_list) == 0:
+                raise EmptyValueError(message="EmptyValueError: Empty value list for column '{}'".format(self.column_name))
+        except Exception as e:
+            sys.exit(e.message)
 
-##            if (self.table_name == 'usedgcp') or (self.table_name == 'geometry'):
-##                returnSeqListFlag = True
 
-            seq_list = fk_columns[0].insert2db(returnSeqListFlag=returnSeqListFlag)
+        #if column is foreign key, insert using the special subclass function for fk instead
+        if isinstance(self, fkColumn):
             
+            seq_list = self.insertNewFK(returnSeqListFlag, batchSize=batchSize)
+            return seq_list
+            
+        #if column is id, use subclass function
+        elif isinstance(self, idColumn):
+
+            self.insertNewID(fk_args, seq_list=seq_list, batchSize=batchSize)
+
         else:
-            print('no fk')
-            pass
 
-        print('SEQLIST', seq_list)
+            fk = self.get_foreign_key()
 
-        #vvv ADD ID TO TABLE vvv#
-        if id_column != None:
-            print('has id column')
-            id_list = id_column.value_list
-            id_column.insert2db(fk_args=fk_args)
+            #one cursor for the whole queue. Statements are parameterized so values are sent as bound parameters
+            cursor = self.connection.cursor()
 
-        else:
-            print('no id column')
-            pass
+            #does not need foreign key
+            if fk == '':
 
-        #vvv ADD ALL OTHER COLUMNS vvv#
-        if (self.table_name == 'geometry') or (self.table_name == 'usedgcp'):
-            for i in range(0, len(other_columns)):
-                other_columns[i].update2db(seq_list=seq_list)
-        else:
-            for i in range(0, len(other_columns)):
-                other_columns[i].update2db(id_list=id_list)
-                
-    def disp_db_table(self):
-        '''
-        Query the database and display all rows for the associated table
-        '''
-        
-        query = "SELECT * FROM {}".format(self.table_name)
-        print(query)
+                query = buildStatement('insert', self.table.table_name, [self.column_name])
 
-        result = pd.read_sql(query, con=self.connection)
-        df = pd.DataFrame(result)
-        with pd.option_context('display.max_rows', None, 'display.max_columns', None):  # more options can be specified also
-            print(df)
+                statements = [(query, [value2db(value)]) for value in self.value_list]
+                flushStatements(self.connection, statements, batchSize=batchSize, cursor=cursor)
 
-    def tableFromDB(self, id_seq):
-        '''
-        Retrieve all columns in a row in a table given a unique id/seq. Return as a dictionary object.
-        Inputs:
-            id_seq (string or int) - id (string) or seq (int) value used to specify which row of the column to get the value from.
-        Outputs:
-            value_dict (dict) - dictonary of values retrieved from the row in the table. The key is column name, the value is the column
-                                value.
-        '''
+            #tables that use seq instead of id            
+            elif (self.table.table_name == 'usedgcp') or (self.table.table_name == 'geometry'):                    
 
-        column_list = []
-        for column in self.__dict__:
-            if isinstance(self.__dict__[column], Column):
-                column_list.append(self.__dict__[column])
+                statements = []
+                for i, value in enumerate(self.value_list):
 
-        value_dict = {}
-        for column in column_list:
-            value = column.valueFromDB(id_seq)
-            value_dict[column.column_name] = value
+                    for dict_key, dict_value in fk_args[i].items():
+                        fk_column = dict_key
+                        fk_value = dict_value
 
-        return value_dict
-        
+                    #don't need to check for blank id. Seq updates automatically with everynew insertion
 
-class Column:
-    '''
-    This class represents a column in the CoastCamDB. This Column can be added to a Table object as an attribute.
-    The value_list attribute acts as a queue of values to be added to the column in the DB.
-    '''
+                    if fk_column == 'geometrySequence':
+                        linked_table = 'geometry'
+                    elif fk_column == 'gcpID':
+                        linked_table = 'gcp'
+                    elif fk_column == 'cameraID':
+                        linked_table = 'camera'
 
-    '''
-    Foreign key (fk) dictionary. Necessary for inserting values into most tables.
-    The key is the name of the table, and the value is a tuple where the 1st element is the table the fk links to
-    and the 2nd element is the fk column. Every fk links to the 'id' column of the upper-level table, except for
-    the fk geometrySequence in the 'usedgcp' table, which links to the 'seq' column in the 'geometry' table. If the
-    table has multiple foreign keys, the value will be a list of tuples with one tuple per fk.
-    '''
-    fk_dict = {'station': ('site', 'siteID'),
-               'camera': [('station', 'stationID'), ('cameramodel', 'modelID'), ('lensmodel', 'lensmodelID'), ('ip', 'li_IP')],
-               'geometry': ('camera', 'cameraID'),
-               'gcp': ('site', 'siteID'),
-               'usedgcp': [('gcp', 'gcpID'), ('geometry', 'geometrySequence')] }
+                    check_linked_key(fk_value, fk_column, linked_table, self.connection)
 
-    '''list of all possible foregin key volumns'''
-    fk_column_list = ['siteID', 'stationID', 'modelID', 'lensmodelID', 'li_IP', 'cameraID', 'siteID', 'gcpID', 'geometrySequence']
+                    query = buildStatement('insert', self.table.table_name, [fk_column, self.column_name])
+                    statements.append((query, [value2db(fk_value), value2db(value)]))
 
-    def __init__(self, column_name, table, value=None):
-        '''
-        Initialize the Column object. Assign name and Table. Additionally, Append value to the column's value_list (queue).
-        Inputs:
-            column_name (string) - name of the Column
-            value - Value to be inserted in the column in the database. Can be one of a number of possible data types.
-            table (Table) - Table object that this column is associated with. Represents the table the column is in in the DB.
-        '''
+                flushStatements(self.connection, statements, batchSize=batchSize, cursor=cursor)
 
-        self.column_name = column_name
-        self.table = table
-        self.database = table.database
+            #tables that use id
+            else:                   
+
+                for i, value in enumerate(self.value_list):
 
-        self.value_list = []
-        self.value_list.append(value)
+                    for dict_key, dict_value in fk_args[i].items():
+                        fk_column = dict_key
+                        fk_value = dict_value
 
-        self.connection = table.connection
+                    #check for blank ID correpsonding to fk arg
+                    query = "SELECT 1 FROM {} WHERE {} = %s AND id = '' LIMIT 1".format(self.table.table_name, fk_column)
+                    hasBlankID = exists(self.connection, query, (fk_value,))
 
+                    #if there's a blank id in the same row as the specified foreign key, update the column in that row insteasd of inserting new row
+                    if hasBlankID:
+                        query = buildStatement('update', self.table.table_name, [self.column_name], [fk_column, 'id'])
+                        args = [value2db(value), value2db(fk_value), '']
+                    else:
+                        query = buildStatement('insert', self.table.table_name, [fk_column, self.column_name])
+                        args = [value2db(fk_value), value2db(value)]
 
-    def showColumn(self):
-        '''
-        Print Column object value
-        '''
-        print('COLUMN "{}" in TABLE "{}" ----- value(s) = {}'.format(self.column_name, self.table.table_name, [value for value in self.value_list]))
+                    print(query)
 
+                    #run one at a time so the next blank id check sees this row. Commit once per batch
+                    executeStatement(self.connection, query, args, cursor=cursor, commit=(batchSize == None))
+                    commitBatch(self.connection, i + 1, batchSize)
 
-    def add2queue(self, value):
-        '''
-        Add a value to this Column's value_list (aka queue for data to be entered into DB)
-        Inputs:
-            value - Value to be inserted in the column in the database. Can be one of a number of possible data types.
-        Outputs:
-            none
-        '''
+                if batchSize != None:
+                    commitWrite(self.connection)
 
-        if self.value_list[0] == None:
-            self.value_list[0] = value
-        else:
-            self.value_list.append(value)
+            cursor.close()
+            
+        #clear list once all values have been inserted into DB
+        self.value_list = []
+        
 
-    def check_list_length(self, idseq_list):
+    def update2db(self, id_list=[], seq_list=[], fk_args=[], returnSeqListFlag=False, batchSize=None):
         '''
-        Check to make sure that the length of the list of ids or seqs is the same length as the value list of this Column object.
-        Raise exception if the number of given id/seq values to insert into table isn't the same as the number of values to insert
-        Inputs:
-            idseq_list (list) - list of id or seq values corresponding to multiple values in this object's value list
+        Update a value in for this column in the database. Specify the row using a value for id or seq
+        Inserts:
+            id_list (list) - list of id (string) values. Used if there are multiple values in self.value_list to be inserted.
+                             The id values are used for specifying specifying the id(s) of the associated row(s) in the DB that the value(s)
+                             will be inserted into. Used with the SQL 'WHERE' clause
+            seq_list  (list) - list of seq (int) values. Used if there are multiple values in self.value_list to be inserted.
+                               The id values are used for specifying specifying the seq(s) of the associated row(s) in the DB that the value(s)
+                               will be inserted into. Used with the SQL 'WHERE' clause. seq column only used with the geometry and
+                               usedgcp tables.
+            fk_args (list) - list of dictionaries used for foreign key arguments. Used when this function calls insertNewID().
+            returnSeqListFlag (boolean) - Optional argument specifying whether or not the function will return a seq_list. This
+                                          seq_list is a list of seq values from the database associated with each new foreign key
+                                          inserted into the database
+            batchSize (int) - Optional number of values written per commit. If given, the queue is sent with executemany() in
+                              batches instead of one statement and commit per value.
         Outputs:
-            none
+            seq_list (list) - optional output argument that is a list of seq values from the database
         '''
 
         try:
-            if len(idseq_list) != len(self.value_list):
-                raise ListLengthError("ListLengthError: number of given id/seq values is not the same as the number of values to be inserted into table '{}'\nlength of id/seq list: {}\nlength of values: {}".format(self.table.table_name, len(idseq_list), len(self.value_list)))
-    
+
+            if len(self.value_list) == 0:
+                raise EmptyValueError(message="EmptyValueError: Empty value list for column '{}'".format(self.column_name))
         except Exception as e:
             sys.exit(e.message)
 
-    def get_foreign_key(self):
-        '''
-        Return the foreign key(s) associated with this column in the database
-        Inputs:
-            none
-        Outputs:
-            foreign_keys (tuple or list of tuples) - returns a tuple of the foreign key to be used in the SQL WHERE clause
-                                                     when updating the column. The first element in the tuple is the table the
-                                                     fk links to, and the second element is the column name of the foreign key.
-                                                     If theere are multiple foregin keys, this method returns a list of tuples.
-        '''
-        try:
-            return self.fk_dict[self.table.table_name]
-        
-        except Exception:
-            print("No foreign keys for table '{}'".format(self.table.table_name))
-            return ''
+
+        #if column is foreign key, insert using the special subclass function for fk instead
+        if isinstance(self, fkColumn):
+            
+            seq_list = self.insertNewFK(returnSeqListFlag, batchSize=batchSize)
+            return seq_list
             
+        #if column is id, use subclass function
+        elif isinstance(self, idColumn):
 
-    def get_linked_table(self, fk_column):
-        '''
-        Return the name of a foreign key (fk), return the name of the table that the fk links to.
-        Inputs:
-            fk_column (string) - name of the foreign key column in the this Column object's associated table
-        Outputs:
-            linked_table (string) - name of the table the fk links to
-        '''
+            self.insertNewID(fk_args, batchSize=batchSize)
 
-        if self.column_name not in self.fk_column_list:
-            print('column does not link to another table')
-            return ''
+        else:
 
-        if self.table.table_name == 'camera':
+            fk = self.get_foreign_key()
 
-            if fk_column == 'stationID':
+            #one cursor for the whole queue. Statements are parameterized so values are sent as bound parameters
+            cursor = self.connection.cursor()
+            statements = []
+            
+            if fk == '':
+                #does not need foreign key
+                self.check_list_length(id_list)
 
-                linked_table = 'station'
+                query = buildStatement('update', self.table.table_name, [self.column_name], ['id'])
 
-            elif fk_column == 'modelID':
+                for i, value in enumerate(self.value_list):
 
-                linked_table = 'cameramodel'
+                    check_id(id_list[i], self.table.table_name, self.connection)
 
-            elif fk_column == 'lensmodelID':
+                    statements.append((query, [value2db(value), id_list[i]]))
 
-                linked_table = 'lensmodel'
+            #tables that use seq instead of id            
+            elif (self.table.table_name == 'usedgcp') or (self.table.table_name == 'geometry'):                    
 
-            elif fk_column == 'li_IP':
+                self.check_list_length(seq_list)
 
-                linked_table = 'ip'
+                for i, value in enumerate(self.value_list):
 
-        elif self.table.table_name == 'usedgcp':
+                    #don't need to check_seq because that is already done in fk_from_seq
+                    fk_column, fk_value = self.fk_from_seq(seq_list[i])
 
-            if fk_column == 'gcpID':
+                    query = buildStatement('update', self.table.table_name, [self.column_name], [fk_column, 'seq'])
+                    statements.append((query, [value2db(value), value2db(fk_value), seq_list[i]]))
 
-                linked_table = 'gcp'
+            #tables that use id
+            else:
 
-            elif fk_column == 'geometrySequence':
+                self.check_list_length(id_list)
 
-                linked_table = 'geometry'
+                for i, value in enumerate(self.value_list):
 
-        else:
-            linked_table = self.fk_dict[self.table.table_name][0]
+                    #don't need to check_seq because that is already done in fk_from_seq
+                    fk_column, fk_value = self.fk_from_id(id_list[i])
 
-        return linked_table
+                    query = buildStatement('update', self.table.table_name, [self.column_name], [fk_column, 'id'])
+                    statements.append((query, [value2db(value), value2db(fk_value), id_list[i]]))
 
-    def check_foreign_key(self, fk_column, fk_value):
+            flushStatements(self.connection, statements, batchSize=batchSize, cursor=cursor)
+            cursor.close()
+  
+
+        #clear list once all values have been inserted into DB
+        self.value_list = []
+
+    def valueFromDB(self, id_seq):
         '''
-        Check that the foreign key is valid and exists in the same table as this column
+        Retrieve the value of the column from the database given a specfified id or seq value.
         Inputs:
-            fk_column (string) - name of the foregin key column to be checked
-            fk_value (string or int) - id/seq value of the foreign key
+            id_seq (string or int) - id (string) or seq (int) value used to specify which row of the column to get the value from.
         Outputs:
-            none
+            value (object) - value of the given column in the same row as the specified id/seq. Value type depends on the value
+                             type in the database. Can be string, int, double.
         '''
 
-        #check that foreign key is valid and exists
-        try:
-            if fk_column not in self.fk_column_list:
-                raise FKError("FKError: invalid foreign key '{}'".format(fk_column))
+        if (self.column_name == 'K') or (self.column_name == 'm') or (self.column_name == 'kc'):
+            if isinstance(id_seq, str):
+                result = db2np(connection=self.connection, table=self.table.table_name, column=self.column_name, ID=id_seq)
 
-            if isinstance(fk_value, str):
-                query = "SELECT {} FROM {} WHERE {} = '{}'".format(fk_column, self.table.table_name, fk_column, fk_value)
-                #ex: select modelID from camera where modelID = 'XXXXX'
+            elif isinstance(id_seq, int):
+                result = db2np(connection=self.connection, table=self.table.table_name, column=self.column_name, seq=id_seq)
 
-            elif isinstance(fk_value, int):
-                query = "SELECT {} FROM {} WHERE {} = {}".format(fk_column, self.table.table_name, fk_column, fk_value)
-                #ex: select geometrySequence from usedgcp where geometrySequence = 1
+        else:
+            if isinstance(id_seq, str):   
+                check_id(id_seq, self.table.table_name, self.connection)
+                query = "SELECT {} FROM {} WHERE id = %s".format(self.column_name, self.table.table_name)
 
-            result = pd.read_sql(query, con=self.connection)
-            
-            #NULL return, no seq/id found
-            if result.size == 0:
-                raise NoIDError("NoSeqError: No foreign_key '{}' with value '{}' found in table '{}'".format(fk_column, fk_value, self.table.table_name))
+            elif isinstance(id_seq, int):
+                check_seq(id_seq, self.table.table_name, self.connection)
+                query = "SELECT {} FROM {} WHERE seq = %s".format(self.column_name, self.table.table_name)
+
+            result = fetch_scalar(self.connection, query, (id_seq,))
             
-        except Exception as e:
-            sys.exit(e.message)
+        return result
+  
 
 
-    def fk_from_id(self, ID):
+class idColumn(Column):
+    '''
+    Defines the class related to the id column in the database. This is a subclass of the Column class. ids are primary keys
+    in the database so they have special properties and usually act as points of reference for inserting data into the database.
+    '''
+
+    def __init__(self, table, value=None):
         '''
-        Given an ID value in a database table, find the corresponding foreign key value (same row).
+        Initialize the Column object. Assign name and Table. Additionally, Append value to the column's value_list (queue).
         Inputs:
-            ID (string) - id column value
-        Outputs:
-            fk_column (string) - name of the foreign key column in the table
-            fk_value (string) - foreign key value for corresponding id
+            column_name (string) - name of the Column
+            value - Value to be inserted in the column in the database. Can be one of a number of possible data types.
+            table (Table) - Table object that this column is associated with. Represents the table the column is in in the DB.
         '''
 
-        fk_pair = self.get_foreign_key()
+        Column.__init__(self, column_name='id', table=table, value=value)
 
-        #for tables that have multiple fk columns, fk_pair is a list of tuples
-        if isinstance(fk_pair, list):
-            #only need 1 fk value  for purposes of inserting values into database
-            fk_column = fk_pair[0][1]
 
-        #table only has 1 foreign key column, fk_pair is a tuple
-        else:
-            print(fk_pair)
-            fk_column = fk_pair[1]
+    def insertNewID(self, fk_args = [], seq_list = [], batchSize=None):
+        '''
+        Insert new id column value(s) into the database. USes foreign keys where necessary.
+        Inputs:
+            fk_args (list) - list of dictionaries used for foreign key arguments. Each dictionary will correspond to an
+                             id being inserted into the table. Only one key/value of an fk column/value pair per id is actually
+                             needed in each dictionary. The key will be the fk column name and the value will be the column value.
+            seq_list (list) - list of seq values used to specify which row to insert the id into. Used for cases where multiple
+                              rows in a table have the same foregin key value. The rows were inserted by insertNewFK() or
+                              insertMultipleFK() with a placeholder id, which is replaced with the real id.
+            batchSize (int) - Optional number of ids written per commit. If not given, every id is committed on its own.
+        Outputs:
+            none
+        '''
+
+        fk = self.get_foreign_key()
             
-        check_id(ID, self.table.table_name, self.connection)
-        
-        query = "SELECT {} FROM {} WHERE id = '{}'".format(fk_column, self.table.table_name, ID)
-        print(query)
+        if fk != '':
+            #needs foreign key
 
-        result = pd.read_sql(query, con=self.connection)
-        fk_value = result.get(fk_column)[0]
-        return fk_column, fk_value
-    
+            try:
+                if len(fk_args) == 0:
+                    raise FKError("FKError: foreign keys required but no foreign keys passed as arguments")
 
-    def fk_from_seq(self, seq):
+                elif len(fk_args) != len(self.value_list):
+                    raise FKError("FKError: Incorrect number of foreign keys for number of values to be inserted")
+
+            except Exception as e:
+                sys.exit(e.message)
+
+        cursor = self.connection.cursor()
+        i = 0
+        for ID in self.value_list:
+
+            isDuplicate = self.check_duplicate_id(ID)
+
+            if isDuplicate:
+                print("Duplicate id value. Value not inserted.")
+
+            else:
+                new_keys = []
+                old_keys = []
+                if len(fk_args) > 0:
+                    fks = fk_args[i]
+
+                    for fk_column in fks:
+                        #check for valid foreign key value. Don't need to check linked table because foreign key in table
+                        #already needs to have same value as id/seq in linked table
+                        value = fks[fk_column]
+                        self.check_foreign_key(fk_column, value)
+
+                    #If function makes it here, foreign keys/values don't throw errors. Only need one fk for query   
+                    #the fk row was already inserted with a placeholder id, so replace the placeholder in that row
+                    if (i < len(seq_list)) and (seq_list[i] != None):
+                        query = buildStatement('update', self.table.table_name, ['id'], [fk_column, 'seq'])
+                        args = [ID, fks[fk_column], seq_list[i]]
+                        old_keys = [('id', placeholder_id_prefix + str(seq_list[i]))]
+                        #ex: "UPDATE camera SET id = %s WHERE stationID = %s AND seq = %s"
+
+                    #check for blank id. If blank ID, replace with blankid (that has same fk_args) instead of insertiung new value
+                    elif self.check_for_blank_id():
+                        query = buildStatement('update', self.table.table_name, ['id'], [fk_column, 'id'])
+                        args = [ID, fks[fk_column], '']
+                        #ex: "UPDATE camera SET id = %s WHERE stationID = %s AND id = %s"
+                    else:
+                        query = buildStatement('insert', self.table.table_name, [fk_column, 'id'])
+                        args = [fks[fk_column], ID]
+                        new_keys = [(fk_column, fks[fk_column])]
+                        #ex: "INSERT INTO camera (stationID, id) VALUES (%s, %s)"
+
+                else:
+                    query = buildStatement('insert', self.table.table_name, ['id'])
+                    args = [ID]
+                    #ex: INSERT INTO site (id) VALUES (%s)
+                    
+                print(query)
+                rowcount = executeStatement(self.connection, query, args, cursor=cursor, commit=(batchSize == None))
+                if rowcount > 0:
+                    for key_column, key_value in old_keys:
+                        removeKeys(self.connection, self.table.table_name, key_column, [key_value])
+                    for key_column, key_value in new_keys + [('id', ID)]:
+                        addKeys(self.connection, self.table.table_name, key_column, [key_value])
+                    
+            i = i + 1
+            commitBatch(self.connection, i, batchSize)
+
+        if batchSize != None:
+            commitWrite(self.connection)
+        cursor.close()
+            
+
+    def updateID(self, old_id):
         '''
-        Given a seq value in a database table, find the corresponding foreign key value (same row).
+        Update exsiting id column value in the database. Uses foregin keys where necessary.
         Inputs:
-            seq (int) - seq column value
+            old_id (string) - old id value to be updated (replaced)
         Outputs:
-            fk_column (string) - name of the foreign key column in the table
-            fk_value (int) - foreign key value for corresponding seq
+            none
         '''
 
-        fk_pair = self.get_foreign_key()
+        i = 0
+        for ID in self.value_list:
 
-        #for tables that have multiple fk columns, fk_pair is a list of tuples
-        if isinstance(fk_pair, list):
-            #only need 1 fk value  for purposes of inserting values into database
-            fk_column = fk_pair[0][1]
+            isDuplicate = self.check_duplicate_id(ID)
 
-        #table only has 1 foreign key column, fk_pair is a tuple
-        else:
-            fk_column = fk_pair[1]
+            if isDuplicate:
+                print("Duplicate id value. Value not updated.")
+
+            else:
+                query = buildStatement('update', self.table.table_name, ['id'], ['id'])
+                #ex: "UPDATE camera SET id = %s WHERE id = %s"
+                    
+                print(query)
+                rowcount = executeStatement(self.connection, query, [ID, old_id])
+                if rowcount > 0:
+                    removeKeys(self.connection, self.table.table_name, 'id', [old_id])
+                    addKeys(self.connection, self.table.table_name, 'id', [ID])
+
+            i = i + 1
             
-        check_seq(seq, self.table.table_name, self.connection)
-        
-        query = "SELECT {} FROM {} WHERE seq = {}".format(fk_column, self.table.table_name, seq)
-        print(query)
 
-        result = pd.read_sql(query, con=self.connection)
-        fk_value = result.get(fk_column)[0]
-        return fk_column, fk_value
-    
 
-    def check_duplicate_id(self, ID):
+class fkColumn(Column):
+    '''
+    Defines the class related to a foreign key (fk) column in the database. Foreign keys are used as contraints when inserting data into
+    the database. The fk will be used as a link to another, higher level, table.
+    '''
+
+    def __init__(self, column_name, table, value=None):
         '''
-        check if id already exists in the column's associated table. Designed to be used with the random placeholder name.
+        Initialize the Column object. Assign name and Table. Additionally, Append value to the column's value_list (queue).
         Inputs:
-            ID (string) - ID to be checked
-        Outputs:
-            isDuplicate (boolean) - true/false variable stating whether or not the id is a duplicate
+            column_name (string) - name of the Column
+            value - Value to be inserted in the column in the database. Can be one of a number of possible data types.
+            table (Table) - Table object that this column is associated with. Represents the table the column is in in the DB.
         '''
 
-        query = "SELECT * FROM {} WHERE id = '{}'".format(self.table.table_name, ID)
-
-        result = pd.read_sql(query, con=self.connection)
-
-        if result.size == 0:
-            isDuplicate = False
-        else:
-            isDuplicate = True
+        Column.__init__(self, column_name=column_name, table=table, value=value)
 
-        return isDuplicate
-    
+        #assign variable saying what table this fk links to
+        linked_table = self.get_linked_table(column_name)
+        self.linked_table = linked_table
 
-    def check_for_blank_id(self):
+    def display_linked_key(self):
         '''
-        Check if any rows in the column's associated table have a blank id value. Used for inserting new foreign keys.
-        Can only have one blank id per table or else inserting a new fk will fail.
+        Display the values for the corresponding id/seq column in this Column's linked table
         Inputs:
             none
         Outputs:
-            hasBlankID (boolean) - true or flase result whether id is blank
+            none
         '''
 
-        query = "SELECT * FROM {} WHERE id = ''".format(self.table.table_name)
-        
-        result = pd.read_sql(query, con=self.connection)
-            
-        if result.size == 0:
-            hasBlankID = False
-        else:
-            hasBlankID = True
+        print("Below are the valid values for {}".format(self.column_name))
 
-        return hasBlankID
+        #special case for geometrySequence foreign key
+        if self.linked_table == 'geometry':
+            query = "SELECT seq FROM geometry"
+        else:
+            query = "SELECT id FROM {}".format(self.linked_table)
 
+        result = get_formatted_result(query, self.connection)
+        result_str = result.to_string(header=False)
+        print(result_str)
 
-    def check_blank_value(self, idseq):
+    def insertNewFK(self, returnSeqListFlag=False, batchSize=None):
         '''
-        Given an id/seq value, check if the value is blank for this column for the given row.
+        Insert new value(s) for this foreign key column into the database.
         Inputs:
-            idseq (string) - id or seq value used to specify the row
+            returnSeqListFlag (boolean) - Optional argument specifying whether or not the function will return a seq_list. This
+                                          seq_list is a list of seq values from the database associated with each new foreign key
+                                          inserted into the database
+            batchSize (int) - Optional number of values written per commit. If not given, every value is committed on its own.
         Outputs:
-            hasBlankValue (bool) - True or False value describing if there is a blank value for the column in the specified row
+            seq_list (list) - optional output argument that is a list of seq values from the database
         '''
 
-        hasBlankValue = False
-        
-        if (self.table.table_name == 'geometry') or (self.table.table_name == 'usedgcp'):
-            query = "SELECT {} FROM {} WHERE seq = {}".format(self.column_name, self.table.table_name, idseq)
+        #special case because geometrySequence is only fk that links to a 'seq' column
+        if self.column_name == 'geometrySequence':
+            insert_table = 'usedgcp'
         else:
-            query = "SELECT {} FROM {} WHERE id = '{}'".format(self.column_name, self.table.table_name, idseq)
+            insert_table = self.table.table_name
+        query = buildStatement('insert', insert_table, [self.column_name])
 
-        result = pd.read_sql(query, con=self.connection)
-        for res in result.get(self.column_name):
-            if res == '':
-                hasBlankValue = True
-                print('BLANK VALUE')
+        hasPlaceholder = (self.table.table_name != 'geometry') and (self.table.table_name != 'usedgcp')
 
-        return hasBlankValue
+        cursor = self.connection.cursor()
+        if (not hasPlaceholder) and (batchSize != None):
+            #no ids to fill in later, so the rows go in as multi-row inserts and the seqs come back with them
+            for value in self.value_list:
+                check_linked_key(value, self.column_name, self.linked_table, self.connection)
 
+            arg_list = [[value2db(value)] for value in self.value_list]
+            print("{} ({} rows)".format(query, len(arg_list)))
+            seq_list = executeInsertBatch(self.connection, insert_table, [self.column_name], arg_list, batchSize=batchSize, cursor=cursor)
+        else:
+            seq_list = []
+            for j, value in enumerate(self.value_list):
 
-    def insert2db(self, fk_args=[], returnSeqListFlag=False):
-        '''
-        insert new value into for this column into the database. Depending on the table, specify a foreign key
-        Inserts:
-            fk_args (list) - list of dictionaries used for foreign key arguments. Used when this function calls insertNewID().
-            returnSeqListFlag (boolean) - Optional argument specifying whether or not the function will return a seq_list. This
-                                          seq_list is a list of seq values from the database associated with each new foreign key
-                                          inserted into the database
-        Outputs:
-            seq_list (list) - optional output argument that is a list of seq values from the database
-        '''
+                check_linked_key(value, self.column_name, self.linked_table, self.connection)
 
-        try:
+                #rows go in one at a time, each with a placeholder id until insertNewID() adds the real one. Commit once per batch
+                if hasPlaceholder:
+                    seq = insertWithPlaceholderID(insert_table, [self.column_name], [value2db(value)], self.connection, cursor=cursor, commit=(batchSize == None))
+                else:
+                    print(query)
+                    seq = executeInsert(self.connection, query, [value2db(value)], cursor=cursor, commit=(batchSize == None))
+                seq_list.append(seq)
 
-            if len(self.value_list) == 0:
-                raise EmptyValueError(message="EmptyValueError: Empty value list for column '{}'".format(self.column_name))
-        except Exception as e:
-            sys.exit(e.message)
+                commitBatch(self.connection, j + 1, batchSize)
 
+            if batchSize != None:
+                commitWrite(self.connection)
+        cursor.close()
 
-        #if column is foreign key, insert using the special subclass function for fk instead
-        if isinstance(self, fkColumn):
-            
-            seq_list = self.insertNewFK(returnSeqListFlag)
+        addKeys(self.connection, insert_table, 'seq', seq_list)
+        addKeys(self.connection, insert_table, self.column_name, [value for value, seq in zip(self.value_list, seq_list) if seq != None])
+
+        if returnSeqListFlag == True:
             return seq_list
-            
-        #if column is id, use subclass function
-        elif isinstance(self, idColumn):
 
-            self.insertNewID(fk_args)
 
-        else:
+class CameraRecord(collections.abc.MutableMapping):
+    '''
+    Dictionary-like view of one camera's extrinsic or intrinsic parameters stored in a row of a Parameter object's structured
+    camera array. Supports the usual dict access (record['x'], record.keys(), dict(record), ...) so code written for the old
+    list-of-dicts Parameter keeps working. Values can be changed but keys can't be added or removed. Missing values read back
+    as None.
+    '''
 
-            fk = self.get_foreign_key()
+    __slots__ = ('array', 'index', 'fields')
 
-            #does not need foreign key
-            if fk == '':
+    def __init__(self, array, index, fields):
+        '''
+        Initialization function for this object.
+        Inputs:
+            array (ndarray) - structured array with dtype camera_dtype
+            index (int) - row of the array (camera) this record shows
+            fields (list) - field names this record shows, eg extrinsic_fields
+        Outputs:
+            (none)
+        '''
 
-                for i, value in enumerate(self.value_list):
-                    
-                    try:
-                        if isinstance(value, str):
-                            
-                            query = "INSERT INTO {} ({}) VALUES ('{}')".format(self.table.table_name, self.column_name, value)
+        self.array = array
+        self.index = index
+        self.fields = fields
 
-                        elif isinstance(value, int) or isinstance(value, float):
-                            query = "INSERT INTO {} ({}) VALUES ({})".format(self.table.table_name, self.column_name, value)
+    def __getitem__(self, key):
+        if key not in self.fields:
+            raise KeyError(key)
 
-                        else:
-                            raise TypeError
+        value = self.array[key][self.index]
 
-                    except TypeError:
-                        print('TypeError: invalid type for column value')
+        #missing values are stored as -1 for integer fields and NaN for float fields
+        if key in camera_int_fields:
+            value = int(value)
+            if value == -1:
+                return None
+            return value
 
-                    print(query)
+        value = float(value)
+        if value != value:
+            return None
+        return value
 
-                    try:
-                        cursor = self.connection.cursor()
-                        cursor.execute(query)
-                        self.connection.commit()
-                    except mysql.connector.Error as err:
-                        print(err.msg)
+    def __setitem__(self, key, value):
+        if key not in self.fields:
+            raise KeyError(key)
 
-            #tables that use seq instead of id            
-            elif (self.table.table_name == 'usedgcp') or (self.table.table_name == 'geometry'):                    
+        self.array[key][self.index] = record2array_value(key, value)
 
-                for i, value in enumerate(self.value_list):
+    def __delitem__(self, key):
+        raise TypeError("TypeError: camera parameter fields can't be deleted")
 
-                    for dict_key, dict_value in fk_args[i].items():
-                        fk_column = dict_key
-                        fk_value = dict_value
+    def __iter__(self):
+        return iter(self.fields)
 
-                    #don't need to check for blank id. Seq updates automatically with everynew insertion
+    def __len__(self):
+        return len(self.fields)
 
-                    if fk_column == 'geometrySequence':
-                        linked_table = 'geometry'
-                    elif fk_column == 'gcpID':
-                        linked_table = 'gcp'
-                    elif fk_column == 'cameraID':
-                        linked_table = 'camera'
+    def __repr__(self):
+        return repr(dict(self))
 
-                    check_linked_key(fk_value, fk_column, linked_table, self.connection)
-                    
-                    try:
-                        if isinstance(value, str):
-                            query = "INSERT INTO {} ({}, {}) VALUES ('{}', '{}')".format(self.table.table_name, fk_column, self.column_name, fk_value, value)
+    def copy(self):
+        '''
+        Return the values of this record as a plain dictionary.
+        '''
 
-                        elif isinstance(value, int) or isinstance(value, float):
-                            query = "INSERT INTO {} ({}, {}) VALUES ('{}', {})".format(self.table.table_name, fk_column, self.column_name, fk_value, value)
+        return dict(self)
 
-                        elif isinstance(value, np.ndarray):
-                            blob = np2text(value)
-                            query = query = "INSERT INTO {} ({}, {}) VALUES ('{}', '{}')".format(self.table.table_name, fk_column, self.column_name, fk_value, blob)
-                        
-                        else:
-                            raise TypeError
 
-                    except TypeError:
-                        print('TypeError: invalid type for column value')
+class CameraRecordList(collections.abc.Sequence):
+    '''
+    List-like view of the extrinsics or intrinsics of every camera in a Parameter object. Indexing returns a CameraRecord, so
+    params.extrinsics[0]['x'] works the same as it did with a list of dictionaries.
+    '''
 
-                    print(query)
+    __slots__ = ('array', 'fields')
 
-                    try:
-                        cursor = self.connection.cursor()
-                        cursor.execute(query)
-                        self.connection.commit()
-                    except mysql.connector.Error as err:
-                        print(err.msg)
+    def __init__(self, array, fields):
+        '''
+        Initialization function for this object.
+        Inputs:
+            array (ndarray) - structured array with dtype camera_dtype, one row per camera
+            fields (list) - field names each record shows, eg extrinsic_fields
+        Outputs:
+            (none)
+        '''
 
-            #tables that use id
-            else:                   
+        self.array = array
+        self.fields = fields
 
-                for i, value in enumerate(self.value_list):
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(0, len(self))[i]]
 
-                    for dict_key, dict_value in fk_args[i].items():
-                        fk_column = dict_key
-                        fk_value = dict_value
+        if i < 0:
+            i = i + len(self)
+        if (i < 0) or (i >= len(self)):
+            raise IndexError("IndexError: camera index out of range")
 
-                    #check for blank ID correpsonding to fk arg
-                    query = "SELECT id FROM {} WHERE {} = '{}'".format(self.table.table_name, fk_column, fk_value)
-                    result = pd.read_sql(query, con=self.connection)
-                    hasBlankID = False
-                    for ID in result.get('id'):
-                        if ID == '':
-                            hasBlankID = True
-                            break
+        return CameraRecord(self.array, i, self.fields)
 
-                    
-                    try:
-                        #if there's a blank id in the same row as the specified foreign key, update the column in that row insteasd of inserting new row
-                        if hasBlankID:
-                            if isinstance(value, str):
-                                query = "UPDATE {} SET {} = '{}' WHERE {} = '{}' AND id = ''".format(self.table.table_name, self.column_name, value, fk_column, fk_value)
-                            elif isinstance(value, int) or isinstance(value, float):
-                                query = "UPDATE {} SET {} = {} WHERE {} = '{}' AND id = ''".format(self.table.table_name, self.column_name, value, fk_column, fk_value)
-                            elif isinstance(value, np.ndarray):
-                                blob = np2text(value)
-                                query = query = "UPDATE {} SET {} = '{}' WHERE {} = '{}' AND id = ''".format(self.table.table_name, self.column_name, blob, fk_column, fk_value)
-                            else:
-                                raise TypeError
-                        else:
-                            if isinstance(value, str):
-                                query = "INSERT INTO {} ({}, {}) VALUES ('{}', '{}')".format(self.table.table_name, fk_column, self.column_name, fk_value, value)
+    def __len__(self):
+        return len(self.array)
 
-                            elif isinstance(value, int) or isinstance(value, float):
-                                query = "INSERT INTO {} ({}, {}) VALUES ('{}', {})".format(self.table.table_name, fk_column, self.column_name, fk_value, value)
+    def __eq__(self, other):
+        if isinstance(other, (list, tuple, CameraRecordList)):
+            return (len(self) == len(other)) and all(self[i] == other[i] for i in range(0, len(self)))
+        return NotImplemented
 
-                            elif isinstance(value, np.ndarray):
-                                blob = np2text(value)
-                                query = "INSERT INTO {} ({}, {') VALUES ('{}', '{}')".format(self.table.table_name, fk_column, self.column_name, fk_value, blob)
-                            
-                            else:
-                                raise TypeError
+    def __repr__(self):
+        return repr([dict(record) for record in self])
 
-                    except TypeError:
-                        print('TypeError: invalid type for column value')
 
-                    print(query)
+class Parameter:
+    '''
+    Class designed to hold parameters used for image rectification: extrinsics, intrinsics, metadata, and local_origin.
+    Also hold datetime information for local time
+    The extrinsics and intrinsics of every camera are kept in one structured numpy array (self.cameras, dtype camera_dtype)
+    rather than a dictionary per camera. self.extrinsics and self.intrinsics are list-like views of that array, so
+    params.extrinsics[0]['x'] still works. Only the fields in extrinsic_fields and intrinsic_fields can be stored; any other
+    key raises CameraFieldError instead of being dropped.
+    '''
 
-                    try:
-                        cursor = self.connection.cursor()
-                        cursor.execute(query)
-                        self.connection.commit()
-                    except mysql.connector.Error as err:
-                        print(err.msg)
-            
-        #clear list once all values have been inserted into DB
-        self.value_list = []
+    def __init__(self, extrinsics=None, intrinsics=None, metadata=None, local_origin=None, date_time_obj=None, date_time_str=None, tzone=None):
+        
+        self.cameras = dicts2cameraArray(extrinsics, intrinsics) #structured array, one row per camera
+        self.extrinsics = None
+        self.intrinsics = None
+        if extrinsics != None:
+            self.extrinsics = CameraRecordList(self.cameras, extrinsic_fields)
+        if intrinsics != None:
+            self.intrinsics = CameraRecordList(self.cameras, intrinsic_fields)
+        self.metadata = metadata #list
+        self.local_origin = local_origin #dict
+        
+        self.date_time_obj = date_time_obj
+        self.date_time_str = date_time_str
+        self.tzone = tzone
         
+        if extrinsics != None:
+            self.num_cameras = len(extrinsics)
+
+        if intrinsics != None:
+            self.num_cameras = len(intrinsics)
+
+        if metadata != None:
+            self.num_cameras = len(metadata)
 
-    def update2db(self, id_list=[], seq_list=[], fk_args=[], returnSeqListFlag=False):
+    def withTime(self, date_time_obj=None, date_time_str=None, tzone=None):
         '''
-        Update a value in for this column in the database. Specify the row using a value for id or seq
-        Inserts:
-            id_list (list) - list of id (string) values. Used if there are multiple values in self.value_list to be inserted.
-                             The id values are used for specifying specifying the id(s) of the associated row(s) in the DB that the value(s)
-                             will be inserted into. Used with the SQL 'WHERE' clause
-            seq_list  (list) - list of seq (int) values. Used if there are multiple values in self.value_list to be inserted.
-                               The id values are used for specifying specifying the seq(s) of the associated row(s) in the DB that the value(s)
-                               will be inserted into. Used with the SQL 'WHERE' clause. seq column only used with the geometry and
-                               usedgcp tables.
-            fk_args (list) - list of dictionaries used for foreign key arguments. Used when this function calls insertNewID().
-            returnSeqListFlag (boolean) - Optional argument specifying whether or not the function will return a seq_list. This
-                                          seq_list is a list of seq values from the database associated with each new foreign key
-                                          inserted into the database
+        Return a copy of this object with new datetime attributes. The camera array, metadata, local origin and any matrix
+        stacks already computed are copied too, so changing the copy never changes this object (or the cache it came from).
+        Inputs:
+            date_time_obj (datetime) - datetime object in the local user's timezone
+            date_time_str (string) - datetime string in the local user's timezone
+            tzone (dateutil.tz) - dateutil timezone object
         Outputs:
-            seq_list (list) - optional output argument that is a list of seq values from the database
+            params (Parameter object) - copy of this object with the datetime attributes replaced
         '''
 
-        try:
+        params = copy.copy(self)
+        params.cameras = self.cameras.copy()
+        if self.extrinsics != None:
+            params.extrinsics = CameraRecordList(params.cameras, extrinsic_fields)
+        if self.intrinsics != None:
+            params.intrinsics = CameraRecordList(params.cameras, intrinsic_fields)
+        params.metadata = copy.deepcopy(self.metadata)
+        params.local_origin = copy.deepcopy(self.local_origin)
 
-            if len(self.value_list) == 0:
-                raise EmptyValueError(message="EmptyValueError: Empty value list for column '{}'".format(self.column_name))
-        except Exception as e:
-            sys.exit(e.message)
+        for name in self.matrix_names:
+            if name in self.__dict__:
+                params.__dict__[name] = self.__dict__[name].copy()
 
+        params.date_time_obj = date_time_obj
+        params.date_time_str = date_time_str
+        params.tzone = tzone
 
-        #if column is foreign key, insert using the special subclass function for fk instead
-        if isinstance(self, fkColumn):
-            
-            seq_list = self.insertNewFK(returnSeqListFlag)
-            return seq_list
-            
-        #if column is id, use subclass function
-        elif isinstance(self, idColumn):
+        return params
 
-            self.insertNewID(fk_args)
+    #vvv MATRICES FOR RECTIFICATION vvv#
+    #each stack has one entry per camera along the first axis and is only computed the first time it's used. Angles are
+    #radians, the same convention as the CoastCam rectification code. Call clearMatrices() after changing camera values.
+    matrix_names = ['K', 'distortion', 'R', 'camera_centers', 'P', 'local_origin_transform', 'local_origin_inverse']
 
-        else:
+    @functools.cached_property
+    def K(self):
+        '''
+        N x 3 x 3 camera matrices [[fx, 0, c0U], [0, -fy, c0V], [0, 0, 1]].
+        '''
 
-            fk = self.get_foreign_key()
-            
-            if fk == '':
-                #does not need foreign key
-                self.check_list_length(id_list)
+        K = np.zeros((len(self.cameras), 3, 3))
+        K[:, 0, 0] = self.cameras['fx']
+        K[:, 0, 2] = self.cameras['c0U']
+        K[:, 1, 1] = -self.cameras['fy']
+        K[:, 1, 2] = self.cameras['c0V']
+        K[:, 2, 2] = 1
 
-                for i, value in enumerate(self.value_list):
+        return K
 
-                    check_id(id_list[i], self.table.table_name, self.connection)
-                    
-                    try:
-                        if isinstance(value, str):
-                            query = "UPDATE {} SET {} = '{}' WHERE id = '{}'".format(self.table.table_name, self.column_name, value, id_list[i])
+    @functools.cached_property
+    def distortion(self):
+        '''
+        N x 5 distortion coefficients [d1, d2, d3, t1, t2]: three radial then two tangential.
+        '''
 
-                        elif isinstance(value, int) or isinstance(value, float):
-                            query = "UPDATE {} SET {} = {} WHERE id = '{}'".format(self.table.table_name, self.column_name, value, id_list[i])
+        return np.stack([self.cameras[field] for field in ['d1', 'd2', 'd3', 't1', 't2']], axis=1)
+
+    @functools.cached_property
+    def R(self):
+        '''
+        N x 3 x 3 rotation matrices built from azimuth (a), tilt (t), and roll (r).
+        '''
+
+        return angles2R(self.cameras['a'], self.cameras['t'], self.cameras['r'])
+
+    @functools.cached_property
+    def camera_centers(self):
+        '''
+        N x 3 camera positions [x, y, z].
+        '''
+
+        return np.stack([self.cameras['x'], self.cameras['y'], self.cameras['z']], axis=1)
+
+    @functools.cached_property
+    def P(self):
+        '''
+        N x 3 x 4 projection matrices P = K R [I | -C], normalized so P[:, 2, 3] is 1. A world point X maps to the
+        (undistorted) pixel P @ [X, 1] divided by its last element.
+        '''
+
+        IC = np.zeros((len(self.cameras), 3, 4))
+        IC[:, :, 0:3] = np.eye(3)
+        IC[:, :, 3] = -self.camera_centers
+
+        P = self.K @ self.R @ IC
+        P = P / P[:, 2:3, 3:4]
+
+        return P
+
+    @functools.cached_property
+    def local_origin_transform(self):
+        '''
+        3 x 3 homogeneous transform from world [x, y, 1] to the local grid: shift to the local origin, then rotate by angd
+        (degrees). Use local_origin_inverse for local to world.
+        '''
 
-                        else:
-                            raise TypeError
+        xo = float(self.local_origin['x'])
+        yo = float(self.local_origin['y'])
+        angle = np.deg2rad(float(self.local_origin['angd']))
 
-                    except TypeError:
-                        print('TypeError: invalid type for column value')
+        cos = np.cos(angle)
+        sin = np.sin(angle)
+        transform = np.array([[cos, sin, -(cos * xo + sin * yo)],
+                              [-sin, cos, sin * xo - cos * yo],
+                              [0, 0, 1]])
 
-                    print(query)
+        return transform
 
-                    try:
-                        cursor = self.connection.cursor()
-                        cursor.execute(query)
-                        self.connection.commit()
-                    except mysql.connector.Error as err:
-                        print(err.msg)
+    @functools.cached_property
+    def local_origin_inverse(self):
+        '''
+        3 x 3 homogeneous transform from the local grid [x, y, 1] back to world coordinates.
+        '''
 
-            #tables that use seq instead of id            
-            elif (self.table.table_name == 'usedgcp') or (self.table.table_name == 'geometry'):                    
+        return np.linalg.inv(self.local_origin_transform)
 
-                self.check_list_length(seq_list)
+    def clearMatrices(self):
+        '''
+        Drop the cached matrix stacks so they are rebuilt from the current camera values the next time they are used.
+        '''
 
-                for i, value in enumerate(self.value_list):
+        for name in self.matrix_names:
+            self.__dict__.pop(name, None)
 
-                    #don't need to check_seq because that is already done in fk_from_seq
-                    fk_column, fk_value = self.fk_from_seq(seq_list[i])
-                    
-                    try:
-                        if isinstance(value, str):
-                            query = "UPDATE {} SET {} = '{}' WHERE {} = '{}' and seq = {}".format(self.table.table_name, self.column_name, value, fk_column, fk_value, seq_list[i])
 
-                        elif isinstance(value, int) or isinstance(value, float):
-                            query = "UPDATE {} SET {} = {} WHERE {} = '{}' and seq  = {}".format(self.table.table_name, self.column_name, value, fk_column, fk_value, seq_list[i])
+class ParameterCache:
+    '''
+    In-process LRU cache of Parameter objects used by filename2param(). Entries are keyed by (stationID, epoch_start, epoch_end)
+    where the epoch is a stretch of time over which the cameras active at the station don't change (see CameraIntervalIndex).
+    Any unix time inside an epoch is served by the same cached Parameter. Entries can be dropped explicitly with invalidate()
+    or automatically after ttl seconds.
+    '''
 
-                        elif isinstance(value, np.ndarray):
-                            blob = np2text(value)
-                            query = query = "UPDATE {} SET {} = '{}' WHERE {} = '{}' and seq = {}".format(self.table.table_name, self.column_name, blob, fk_column, fk_value, seq_list[i])
-                        
-                        else:
-                            raise TypeError
+    def __init__(self, maxsize=256, ttl=None):
+        '''
+        Initialization function for this object.
+        Inputs:
+            maxsize (int) - maximum number of Parameter objects to keep. Least recently used entries are dropped first.
+            ttl (float) - optional number of seconds an entry stays valid. None means entries never expire.
+        Outputs:
+            (none)
+        '''
 
-                    except TypeError:
-                        print('TypeError: invalid type for column value')
+        self.maxsize = maxsize
+        self.ttl = ttl
 
-                    print(query)
+        #(stationID, epoch_start, epoch_end) -> (Parameter, time added). Most recently used entries are at the end.
+        self.entries = collections.OrderedDict()
 
-                    try:
-                        cursor = self.connection.cursor()
-                        cursor.execute(query)
-                        self.connection.commit()
-                    except mysql.connector.Error as err:
-                        print(err.msg)
+        #the module-level cache is shared by every thread (sites2csv, DBSession workers), so every access holds the lock
+        self.lock = threading.Lock()
 
-            #tables that use id
-            else:
+    def __len__(self):
+        with self.lock:
+            return len(self.entries)
 
-                self.check_list_length(id_list)
+    def get(self, stationID, unix_time):
+        '''
+        Return the cached Parameter for a station whose epoch contains the given unix time.
+        Inputs:
+            stationID (string) - "id" field of the station
+            unix_time (int) - unix time of the image
+        Outputs:
+            params (Parameter object) - cached parameters. None if there is no valid entry.
+        '''
 
-                for i, value in enumerate(self.value_list):
+        with self.lock:
+            for key in list(self.entries.keys()):
+                if key[0] != stationID:
+                    continue
 
-                    #don't need to check_seq because that is already done in fk_from_seq
-                    fk_column, fk_value = self.fk_from_id(id_list[i])
-                    
-                    try:
-                        if isinstance(value, str):
-                            query = "UPDATE {} SET {} = '{}' WHERE {} = '{}' and id = '{}'".format(self.table.table_name, self.column_name, value, fk_column, fk_value, id_list[i])
+                epoch_start = key[1]
+                epoch_end = key[2]
+                if ((epoch_start == None) or (epoch_start <= unix_time)) and ((epoch_end == None) or (unix_time <= epoch_end)):
 
-                        elif isinstance(value, int) or isinstance(value, float):
-                            query = "UPDATE {} SET {} = {} WHERE {} = '{}' and id = '{}'".format(self.table.table_name, self.column_name, value, fk_column, fk_value, id_list[i])
+                    params, added = self.entries[key]
+                    if (self.ttl != None) and (time.monotonic() - added > self.ttl):
+                        del self.entries[key]
+                        return None
 
-                        elif isinstance(value, np.ndarray):
-                            blob = np2text(value)
-                            query = query = "UPDATE {} SET {} = '{}' WHERE {} = '{}' and id = '{}'".format(self.table.table_name, self.column_name, blob, fk_column, fk_value, id_list[i])
-                        
-                        else:
-                            raise TypeError
+                    self.entries.move_to_end(key)
+                    return params
 
-                    except TypeError:
-                        print('TypeError: invalid type for column value')
+        return None
 
-                    print(query)
+    def put(self, stationID, epoch_start, epoch_end, params):
+        '''
+        Store a Parameter for a station epoch, dropping the least recently used entries if the cache is full.
+        Inputs:
+            stationID (string) - "id" field of the station
+            epoch_start (int) - first unix time the parameters are valid for. None if there is no lower bound.
+            epoch_end (int) - last unix time the parameters are valid for. None if there is no upper bound.
+            params (Parameter object) - parameters to store
+        Outputs:
+            none
+        '''
 
-                    try:
-                        cursor = self.connection.cursor()
-                        cursor.execute(query)
-                        self.connection.commit()
-                    except mysql.connector.Error as err:
-                        print(err.msg)
-  
+        key = (stationID, epoch_start, epoch_end)
+        with self.lock:
+            self.entries[key] = (params, time.monotonic())
+            self.entries.move_to_end(key)
 
-        #clear list once all values have been inserted into DB
-        self.value_list = []
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
 
-    def valueFromDB(self, id_seq):
+    def invalidate(self, stationID=None):
         '''
-        Retrieve the value of the column from the database given a specfified id or seq value.
+        Drop cached entries. Call this after changing camera, geometry, ip, station, or site values in the database.
         Inputs:
-            id_seq (string or int) - id (string) or seq (int) value used to specify which row of the column to get the value from.
+            stationID (string) - optional station id. If given, only this station's entries are dropped. Otherwise the whole
+                                 cache is cleared.
         Outputs:
-            value (object) - value of the given column in the same row as the specified id/seq. Value type depends on the value
-                             type in the database. Can be string, int, double.
+            none
         '''
 
-        if (self.column_name == 'K') or (self.column_name == 'm') or (self.column_name == 'kc'):
-            if isinstance(id_seq, str):
-                result = db2np(connection=self.connection, table=self.table.table_name, column=self.column_name, ID=id_seq)
-
-            elif isinstance(id_seq, int):
-                result = db2np(connection=self.connection, table=self.table.table_name, column=self.column_name, seq=id_seq)
+        with self.lock:
+            if stationID == None:
+                self.entries.clear()
+                return
 
-        else:
-            if isinstance(id_seq, str):   
-                check_id(id_seq, self.table.table_name, self.connection)
-                query = "SELECT {} FROM {} WHERE id = '{}'".format(self.column_name, self.table.table_name, id_seq)
+            for key in list(self.entries.keys()):
+                if key[0] == stationID:
+                    del self.entries[key]
 
-            elif isinstance(id_seq, int):
-                check_seq(id_seq, self.table.table_name, self.connection)
-                query = "SELECT {} FROM {} WHERE seq = {}".format(self.column_name, self.table.table_name, id_seq)
 
-            result = pd.read_sql(query, con=self.connection)
-            result = result.get(self.column_name)[0]
-            
-        return result
-  
+#module-level cache used by filename2param() when no cache is passed in
+parameter_cache = ParameterCache()
 
 
-class idColumn(Column):
+class CameraIntervalIndex:
     '''
-    Defines the class related to the id column in the database. This is a subclass of the Column class. ids are primary keys
-    in the database so they have special properties and usually act as points of reference for inserting data into the database.
+    Sorted-breakpoint index over the camera timeIN/timeOUT values of one station. The timeline is split at every time a camera
+    turns on (timeIN) or off (the second after timeOUT), and neighbouring pieces with the same active cameras are merged into
+    one calibration epoch. "Which cameras were active at t" and "which epoch contains t" are then a binary search, and a list of
+    times can be split at epoch boundaries so each calibration is loaded once.
+    ex: index = CameraIntervalIndex(getStationRows(stationID, connection))
+        rows = index.activeAt(unix_time)
     '''
 
-    def __init__(self, table, value=None):
+    def __init__(self, rows):
         '''
-        Initialize the Column object. Assign name and Table. Additionally, Append value to the column's value_list (queue).
+        Initialization function for this object.
         Inputs:
-            column_name (string) - name of the Column
-            value - Value to be inserted in the column in the database. Can be one of a number of possible data types.
-            table (Table) - Table object that this column is associated with. Represents the table the column is in in the DB.
+            rows (list) - camera row dictionaries for every camera at the station (see getStationRows()). Each row needs
+                          'timeIN' and 'timeOUT' keys.
+        Outputs:
+            (none)
         '''
 
-        Column.__init__(self, column_name='id', table=table, value=value)
+        self.rows = rows
+
+        #rows with a missing timeIN or timeOUT are never active, the same as the SQL comparison
+        valid = []
+        for i, row in enumerate(rows):
+            timeIN = row['timeIN']
+            timeOUT = row['timeOUT']
+            if (timeIN is None) or (timeOUT is None) or (timeIN != timeIN) or (timeOUT != timeOUT):
+                continue
+            valid.append((i, int(timeIN), int(timeOUT)))
+
+        breakpoints = set()
+        for i, timeIN, timeOUT in valid:
+            breakpoints.add(timeIN)
+            breakpoints.add(timeOUT + 1)
+        breakpoints = sorted(breakpoints)
+
+        #segment k runs from breakpoints[k - 1] up to breakpoints[k] - 1. The first and last segments are unbounded
+        segments = [[] for k in range(0, len(breakpoints) + 1)]
+        for i, timeIN, timeOUT in valid:
+            for k in range(bisect.bisect_right(breakpoints, timeIN), bisect.bisect_right(breakpoints, timeOUT) + 1):
+                segments[k].append(i)
+
+        #merge neighbouring segments that have the same active rows, so each epoch is as long as possible
+        self.starts = []
+        self.active = []
+        for k, segment in enumerate(segments):
+            if (len(self.active) > 0) and (self.active[-1] == segment):
+                continue
+            if k == 0:
+                self.starts.append(None)
+            else:
+                self.starts.append(breakpoints[k - 1])
+            self.active.append(segment)
 
+        #bisect needs the bounded starts only. Epoch 0 always starts unbounded
+        self.bounds = self.starts[1:]
 
-    def insertNewID(self, fk_args = [], seq_list = []):
+    def __len__(self):
+        return len(self.starts)
+
+    def epochIndex(self, unix_time):
         '''
-        Insert new id column value(s) into the database. USes foreign keys where necessary.
+        Return the position of the epoch containing the given unix time.
         Inputs:
-            fk_args (list) - list of dictionaries used for foreign key arguments. Each dictionary will correspond to an
-                             id being inserted into the table. Only one key/value of an fk column/value pair per id is actually
-                             needed in each dictionary. The key will be the fk column name and the value will be the column value.
-            seq_list (list) - list of seq values used to specify which row to insert the id into. Used for cases where multiple
-                              rows in a table have the same foregin key value
+            unix_time (int) - unix time
         Outputs:
-            none
+            k (int) - epoch position, from 0 to len(self) - 1
         '''
 
-        fk = self.get_foreign_key()
-            
-        if fk != '':
-            #needs foreign key
+        return bisect.bisect_right(self.bounds, int(unix_time))
 
-            try:
-                if len(fk_args) == 0:
-                    raise FKError("FKError: foreign keys required but no foreign keys passed as arguments")
+    def epochBounds(self, k):
+        '''
+        Return the first and last unix time of an epoch.
+        Inputs:
+            k (int) - epoch position from epochIndex()
+        Outputs:
+            epoch_start (int) - first unix time in the epoch. None if the epoch has no lower bound
+            epoch_end (int) - last unix time in the epoch. None if the epoch has no upper bound
+        '''
 
-                elif len(fk_args) != len(self.value_list):
-                    raise FKError("FKError: Incorrect number of foreign keys for number of values to be inserted")
+        epoch_start = self.starts[k]
+        if k + 1 < len(self.starts):
+            epoch_end = self.starts[k + 1] - 1
+        else:
+            epoch_end = None
 
-            except Exception as e:
-                sys.exit(e.message)
+        return epoch_start, epoch_end
 
-        i = 0
-        for ID in self.value_list:
+    def epochAt(self, unix_time):
+        '''
+        Return the first and last unix time of the epoch containing the given unix time. See epochBounds().
+        '''
 
-            isDuplicate = self.check_duplicate_id(ID)
+        return self.epochBounds(self.epochIndex(unix_time))
 
-            if isDuplicate:
-                print("Duplicate id value. Value not inserted.")
+    def activeAt(self, unix_time):
+        '''
+        Return the rows that were active at the given unix time, ie timeIN <= unix_time <= timeOUT.
+        Inputs:
+            unix_time (int) - unix time
+        Outputs:
+            rows (list) - active camera row dictionaries, in the same order as the rows given to the index
+        '''
 
-            else:
-                if len(fk_args) > 0:
-                    fks = fk_args[i]
+        return [self.rows[i] for i in self.active[self.epochIndex(unix_time)]]
 
-                    for fk_column in fks:
-                        #check for valid foreign key value. Don't need to check linked table because foreign key in table
-                        #already needs to have same value as id/seq in linked table
-                        value = fks[fk_column]
-                        self.check_foreign_key(fk_column, value)
+    def epochsOverlapping(self, time_start, time_end):
+        '''
+        Return every epoch that overlaps the time range [time_start, time_end].
+        Inputs:
+            time_start (int) - first unix time of the range
+            time_end (int) - last unix time of the range
+        Outputs:
+            epochs (list) - list of (epoch_start, epoch_end, rows) tuples in time order. rows are the camera rows active during
+                            the epoch and can be empty.
+        '''
 
-                    #If function makes it here, foreign keys/values don't throw errors. Only need one fk for query   
-                    #check for blank id. If blank ID, replace with blankid (that has same fk_args) instead of insertiung new value
-                    hasBlankID = self.check_for_blank_id()
-                    if hasBlankID:
-                        query = "UPDATE {} SET id = '{}' WHERE {} = '{}' and id = ''".format(self.table.table_name, ID, fk_column, fks[fk_column])
-                        #ex: "UPDATE camera SET id = '1234567' WHERE stationID = '1234567' and id = ''
-                    else:
-                        query = "INSERT INTO {} ({}, id) VALUES ('{}', '{}')".format(self.table.table_name, fk_column, fks[fk_column], ID)
-                        #ex: "INSERT INTO camera (stationID, id) VALUES ('statID', 'camID')
+        epochs = []
+        for k in range(self.epochIndex(time_start), self.epochIndex(time_end) + 1):
+            epoch_start, epoch_end = self.epochBounds(k)
+            epochs.append((epoch_start, epoch_end, [self.rows[i] for i in self.active[k]]))
 
-                else:
-                    query = "INSERT INTO {} (id) VALUES ('{}')".format(self.table.table_name, ID)
-                    #ex: INSERT INTO site (id) VALUES ('EXXXXXX')
-                    
-                print(query)     
-                cursor = self.connection.cursor()
-                try:
-                    cursor.execute(query)
-                    self.connection.commit()
-                except mysql.connector.Error as err:
-                    print(err.msg)
-                    
-            i = i + 1
-            
+        return epochs
 
-    def updateID(self, old_id):
+    def splitByEpoch(self, items, times):
         '''
-        Update exsiting id column value in the database. Uses foregin keys where necessary.
+        Split a list of items (eg filenames) into groups that fall in the same epoch, so each group can be processed with one
+        set of calibration parameters.
         Inputs:
-            old_id (string) - old id value to be updated (replaced)
+            items (list) - items to split
+            times (list) - unix time of each item
         Outputs:
-            none
+            groups (OrderedDict) - dictionary where the key is the epoch position (see epochIndex()) and the value is the list
+                                   of items in that epoch. Groups are in time order and items keep their input order.
         '''
 
-        i = 0
-        for ID in self.value_list:
+        groups = {}
+        for item, unix_time in zip(items, times):
+            k = self.epochIndex(unix_time)
+            if k not in groups:
+                groups[k] = []
+            groups[k].append(item)
 
-            isDuplicate = self.check_duplicate_id(ID)
+        return collections.OrderedDict(sorted(groups.items()))
 
-            if isDuplicate:
-                print("Duplicate id value. Value not updated.")
 
-            else:
-                query = "UPDATE {} SET id = '{}' WHERE id = '{}'".format(self.table.table_name, ID, old_id)
-                #ex: "UPDATE camera SET id = 'yyyyy' WHERE id = 'xxxxx'"
-                    
-                print(query)     
-                cursor = self.connection.cursor()
-                try:
-                    cursor.execute(query)
-                    self.connection.commit()
-                except mysql.connector.Error as err:
-                    print(err.msg)
+class ShortNameMatcher:
+    '''
+    Aho-Corasick automaton over a set of station short names. Finds every short name that appears anywhere in a string in one
+    pass over the string, no matter how many short names there are. Used as the fallback in StationIndex for filenames that
+    don't follow the Argus format.
+    '''
 
-            i = i + 1
-            
+    def __init__(self, patterns):
+        '''
+        Build the automaton.
+        Inputs:
+            patterns (list) - list of short name strings
+        Outputs:
+            (none)
+        '''
+
+        #state 0 is the root. goto holds the trie edges, fail the failure links, output the patterns ending at each state
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+
+        for pattern in patterns:
+            if pattern == '':
+                continue
+
+            state = 0
+            for char in pattern:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.output[state].append(pattern)
+
+        #breadth first pass to set the failure links
+        queue = collections.deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+
+                fail_state = self.fail[state]
+                while (fail_state != 0) and (char not in self.goto[fail_state]):
+                    fail_state = self.fail[fail_state]
+                self.fail[next_state] = self.goto[fail_state].get(char, 0)
+
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    def findAll(self, text):
+        '''
+        Return every pattern found in the text.
+        Inputs:
+            text (string) - string to search
+        Outputs:
+            matches (list) - list of patterns found in the text, in the order they end in the text
+        '''
 
+        matches = []
+        state = 0
+        for char in text:
+            while (state != 0) and (char not in self.goto[state]):
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            matches.extend(self.output[state])
 
-class fkColumn(Column):
+        return matches
+
+
+class StationIndex:
     '''
-    Defines the class related to a foreign key (fk) column in the database. Foreign keys are used as contraints when inserting data into
-    the database. The fk will be used as a link to another, higher level, table.
+    In-memory index from station short names to station ids, built from the station table. Argus filenames are matched with
+    an exact hash lookup on the station field (see parseFilename()). Filenames that aren't in the Argus format fall back to a
+    ShortNameMatcher that finds any short name inside the filename; if more than one matches, the longest one wins.
+    The index is only rebuilt when the station table changes. Writes to the station table made through this module invalidate
+    every index (see invalidateStationIndexes()). Changes made by other clients are detected by comparing the row count and
+    MAX(seq) of the station table, checked at most once every checkInterval seconds. Another client renaming a station without
+    adding a row isn't detected, so call refresh() after editing short names outside this module.
+    Each connection gets its own index (see stationIndexFor()), since a local mirror can hold different stations than the server.
     '''
 
-    def __init__(self, column_name, table, value=None):
+    def __init__(self, checkInterval=60):
         '''
-        Initialize the Column object. Assign name and Table. Additionally, Append value to the column's value_list (queue).
+        Initialization function for this object.
         Inputs:
-            column_name (string) - name of the Column
-            value - Value to be inserted in the column in the database. Can be one of a number of possible data types.
-            table (Table) - Table object that this column is associated with. Represents the table the column is in in the DB.
+            checkInterval (float) - minimum number of seconds between checks for changes to the station table
+        Outputs:
+            (none)
         '''
 
-        Column.__init__(self, column_name=column_name, table=table, value=value)
+        self.checkInterval = checkInterval
+        self.ids = {}
+        self.matcher = ShortNameMatcher([])
+        self.signature = None
+        self.lastCheck = None
 
-        #assign variable saying what table this fk links to
-        linked_table = self.get_linked_table(column_name)
-        self.linked_table = linked_table
+    def getSignature(self, connection):
+        '''
+        Query a cheap summary of the station table used to detect changes.
+        Inputs:
+            connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        Outputs:
+            signature (tuple) - row count and max seq of the station table
+        '''
 
-    def display_linked_key(self):
+        query = "SELECT COUNT(*) AS numRows, MAX(seq) AS maxSeq FROM station"
+        row = fetch_rows(connection, query)[0]
+
+        signature = (row['numRows'], row['maxSeq'])
+        return signature
+
+    def refresh(self, connection):
         '''
-        Display the values for the corresponding id/seq column in this Column's linked table
+        Rebuild the index from the station table.
         Inputs:
-            none
+            connection (pymysql.connections.Connection object) - object representing the connection to the DB
         Outputs:
             none
         '''
 
-        print("Below are the valid values for {}".format(self.column_name))
+        query = "SELECT id, shortName FROM station"
+        rows = fetch_rows(connection, query)
 
-        #special case for geometrySequence foreign key
-        if self.linked_table == 'geometry':
-            query = "SELECT seq FROM geometry"
-        else:
-            query = "SELECT id FROM {}".format(self.linked_table)
+        ids = {}
+        for ID, name in [(row['id'], row['shortName']) for row in rows]:
+            #keep the first station for a repeated short name, the same one the old table scan returned
+            if (name != None) and (str(name) not in ids):
+                ids[str(name)] = ID
 
-        result = get_formatted_result(query, self.connection)
-        result_str = result.to_string(header=False)
-        print(result_str)
+        self.ids = ids
+        self.matcher = ShortNameMatcher(list(ids.keys()))
+        self.signature = self.getSignature(connection)
+        self.lastCheck = time.monotonic()
 
-    def insertNewFK(self, returnSeqListFlag=False):
+    def ensureCurrent(self, connection):
         '''
-        Insert new value(s) for this foreign key column into the database.
+        Build the index if it hasn't been built yet, or rebuild it if the station table changed since the last check.
         Inputs:
-            returnSeqListFlag (boolean) - Optional argument specifying whether or not the function will return a seq_list. This
-                                          seq_list is a list of seq values from the database associated with each new foreign key
-                                          inserted into the database
+            connection (pymysql.connections.Connection object) - object representing the connection to the DB
         Outputs:
-            seq_list (list) - optional output argument that is a list of seq values from the database
+            none
         '''
 
-        seq_list = []
-        for value in self.value_list:
+        if self.signature == None:
+            self.refresh(connection)
 
-            #can only insert one fk for per row with blank id value, so check for blank id and create placeholder id
-            if (self.table.table_name != 'geometry') and (self.table.table_name != 'usedgcp'):
-                hasBlankID = self.check_for_blank_id()
+        elif time.monotonic() - self.lastCheck >= self.checkInterval:
+            self.lastCheck = time.monotonic()
+            if self.getSignature(connection) != self.signature:
+                self.refresh(connection)
 
-                if hasBlankID:
+    def invalidate(self):
+        '''
+        Mark the index as out of date, so it is rebuilt from the station table the next time it is used.
+        Inputs:
+            none
+        Outputs:
+            none
+        '''
 
-                    placeholder_id = str(random.randint(0, 9999999))
-                    isDuplicate = self.check_duplicate_id(placeholder_id)
-                    
-                    while isDuplicate:
-                        placeholder_id = str(random.randint(0, 9999999))
-                        isDuplicate = self.check_duplicate_id(placeholder_id)
+        self.signature = None
 
-                    #insert placeholder so there's no error for having blank id values when inserting fk
-                    query = "UPDATE {} SET id = '{}' WHERE id = ''".format(self.table.table_name, placeholder_id)
+    def getID(self, short_name):
+        '''
+        Exact lookup of a station id from a short name. Doesn't check the database; call ensureCurrent() first.
+        Inputs:
+            short_name (string) - station short name
+        Outputs:
+            stationID (string) - "id" field of the station. None if the short name isn't in the index.
+        '''
 
-                    print(query)
-                    cursor = self.connection.cursor()
-                    try:
-                        cursor.execute(query)
-                        self.connection.commit()
-                    except mysql.connector.Error as err:
-                        print(err.msg)                    
+        return self.ids.get(short_name)
 
-            check_linked_key(value, self.column_name, self.linked_table, self.connection)
+    def lookup(self, filename, connection):
+        '''
+        Find the station for an image filename.
+        Inputs:
+            filename (string) - image filename or filepath
+            connection (pymysql.connections.Connection object) - object representing the connection to the DB
+        Outputs:
+            short_name (string) - short name of the matching station. None if no station matches.
+            stationID (string) - "id" field of the matching station. None if no station matches.
+        '''
 
-            #special case because geometrySequence is only fk that links to a 'seq' column
-            if self.column_name == 'geometrySequence':
+        self.ensureCurrent(connection)
 
-                query = "INSERT INTO usedgcp (geometrySequence) VALUES ({})".format(value)
+        filename = filename.replace('\\', '/').split('/')[-1]
 
-            else:
-                
-                query = "INSERT INTO {} ({}) VALUES ('{}')".format(self.table.table_name, self.column_name, value)
+        #Argus format: the station is always the 7th element of the filename
+        filename_elements = filename.split('.')
+        if (len(filename_elements) == 10) and (filename_elements[6] in self.ids):
+            return filename_elements[6], self.ids[filename_elements[6]]
 
-            print(query)
+        matches = self.matcher.findAll(filename)
+        if len(matches) == 0:
+            return None, None
 
-            cursor = self.connection.cursor()
-            try:
-                cursor.execute(query)
-                self.connection.commit()
-            except mysql.connector.Error as err:
-                print(type(err))
-                print(err.msg)
+        short_name = max(matches, key=len)
+        return short_name, self.ids[short_name]
 
-            #get the seq of the most recently added database entry. Since seq auto-increments most recent value is the max
-            seq_query = "SELECT MAX(seq) FROM {}".format(self.table.table_name)
-            result = pd.read_sql(seq_query, con=self.connection)
-            seq = result.get('MAX(seq)')[0]
-            seq_list.append(seq)
 
-        if returnSeqListFlag == True:
-            return seq_list
+def stationIndexFor(connection):
+    '''
+    Get the StationIndex used by filename2param() and filenames2params() for a connection, creating it the first time. Every
+    thread of a DBSession shares the session's index.
+    Inputs:
+        connection (pymysql.connections.Connection object) - object representing the connection to the DB. Can also
+                                                             be a DBSession or a connection to a local mirror from openMirror()
+    Outputs:
+        index (StationIndex) - the connection's station index
+    '''
 
+    entry = station_indexes.get(id(connection))
+    if entry == None:
+        entry = (connection, StationIndex())
+        station_indexes[id(connection)] = entry
 
-class Parameter:
+    return entry[1]
+
+
+def invalidateStationIndexes():
     '''
-    Class designed to hold parameters used for image rectification: extrinsics, intrinsics, metadata, and local_origin.
-    Also hold datetime information for local time
+    Mark the StationIndex of every connection as out of date. Called by the write path for every write to the station table,
+    so a station added, renamed or removed through this module is seen by the next filename lookup on any connection.
+    Inputs:
+        none
+    Outputs:
+        none
     '''
 
-    def __init__(self, extrinsics=None, intrinsics=None, metadata=None, local_origin=None, date_time_obj=None, date_time_str=None, tzone=None):
-        
-        self.extrinsics = extrinsics #list
-        self.intrinsics = intrinsics #list
-        self.metadata = metadata #list
-        self.local_origin = local_origin #dict
-        
-        self.date_time_obj = date_time_obj
-        self.date_time_str = date_time_str
-        self.tzone = tzone
-        
-        if extrinsics != None:
-            self.num_cameras = len(extrinsics)
-
-        if intrinsics != None:
-            self.num_cameras = len(intrinsics)
+    for connection, index in list(station_indexes.values()):
+        index.invalidate()
 
-        if metadata != None:
-            self.num_cameras = len(metadata)
 
-        
 ##### testing funcs #####
 if __name__ == "__main__":
     filepath = "C:/Users/eswanson/OneDrive - DOI/Documents/Python/db_access.csv"
@@ -0,0 +1,154 @@
+'''
+Shared fixtures for the tests. The modules live at the top of the repo rather than in a package, so the repo root is put on
+sys.path first. Tests that need a database use a small SQLite file laid out like the CoastCamDB tables, the same way a local
+mirror from createMirror() is.
+'''
+
+import os
+import sys
+import sqlite3
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from coastcamDBfuncs import np2blob, np2text
+
+
+#K and kc of the cameras in the station database
+K1 = np.array([[1500.0, 0.0, 1224.0], [0.0, 1500.0, 1024.0], [0.0, 0.0, 1.0]])
+kc1 = np.array([-0.2, 0.05, 0.0, 0.001, -0.002])
+K2 = np.array([[1800.0, 0.0, 1000.0], [0.0, 1790.0, 750.0], [0.0, 0.0, 1.0]])
+kc2 = np.array([-0.1, 0.0, 0.0, 0.0, 0.0])
+
+
+def buildStationDB(path):
+    '''
+    Write a SQLite database with one site, two stations and three cameras.
+    examplexx has camera c1 active from 1000 to 1999 (two geometry rows, K stored as a blob) and camera c2 active from 1500 to
+    2999 (K stored as text). examplexxlong has camera c3 with NULL K and kc and no time range.
+    '''
+
+    connection = sqlite3.connect(path)
+    connection.executescript('''
+        CREATE TABLE site (seq INTEGER PRIMARY KEY, id TEXT, UTMEasting REAL, UTMNorthing REAL, degFromN REAL);
+        CREATE TABLE station (seq INTEGER PRIMARY KEY, id TEXT, siteID TEXT, name TEXT, shortName TEXT);
+        CREATE TABLE ip (seq INTEGER PRIMARY KEY, id TEXT, width INTEGER, height INTEGER);
+        CREATE TABLE camera (seq INTEGER PRIMARY KEY, id TEXT, stationID TEXT, cameraSN TEXT, cameraNumber INTEGER,
+                             timeIN INTEGER, timeOUT INTEGER, x REAL, y REAL, z REAL, K BLOB, kc BLOB, li_IP TEXT);
+        CREATE TABLE geometry (seq INTEGER PRIMARY KEY, cameraID TEXT, azimuth REAL, tilt REAL, roll REAL);
+    ''')
+    connection.execute("INSERT INTO site VALUES (1, 'site1', 400000.0, 3700000.0, 30.0)")
+    connection.execute("INSERT INTO station VALUES (1, 'st1', 'site1', 'Example station', 'examplexx')")
+    connection.execute("INSERT INTO station VALUES (2, 'st2', 'site1', 'Long example station', 'examplexxlong')")
+    connection.execute("INSERT INTO ip VALUES (1, 'ip1', 2448, 2048)")
+    connection.executemany("INSERT INTO camera VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", [
+        (1, 'c1', 'st1', 'SN1', 1, 1000, 1999, 10.0, 20.0, 30.0, np2blob(K1), np2text(kc1), 'ip1'),
+        (2, 'c2', 'st1', 'SN2', 2, 1500, 2999, 11.0, 21.0, 31.0, np2text(K2), np2text(kc2), 'ip1'),
+        (3, 'c3', 'st2', 'SN3', 1, None, None, 12.0, 22.0, 32.0, None, None, 'ip1'),
+    ])
+    connection.executemany("INSERT INTO geometry VALUES (?, ?, ?, ?, ?)", [
+        (1, 'c1', 0.1, 1.2, 0.01),
+        (2, 'c1', 0.9, 1.9, 0.09),
+        (3, 'c2', 0.2, 1.3, 0.02),
+    ])
+    connection.commit()
+    connection.close()
+
+
+@pytest.fixture
+def station_db_path(tmp_path):
+    path = str(tmp_path / 'coastcamdb.sqlite')
+    buildStationDB(path)
+    return path
+
+
+@pytest.fixture
+def station_db(station_db_path):
+    connection = sqlite3.connect(station_db_path)
+    yield connection
+    connection.close()
+
+
+@pytest.fixture
+def site_db(station_db):
+    #the station database plus the rest of the site hierarchy, and a second site that must not leak into the snapshot
+    station_db.executescript('''
+        ALTER TABLE camera ADD COLUMN modelID TEXT;
+        ALTER TABLE camera ADD COLUMN lensmodelID TEXT;
+        UPDATE camera SET modelID = 'model1', lensmodelID = 'lens1';
+        CREATE TABLE cameramodel (seq INTEGER PRIMARY KEY, id TEXT);
+        CREATE TABLE lensmodel (seq INTEGER PRIMARY KEY, id TEXT);
+        CREATE TABLE gcp (seq INTEGER PRIMARY KEY, id TEXT, siteID TEXT);
+        CREATE TABLE usedgcp (seq INTEGER PRIMARY KEY, gcpID TEXT, geometrySequence INTEGER);
+        INSERT INTO cameramodel VALUES (1, 'model1'), (2, 'model2');
+        INSERT INTO lensmodel VALUES (1, 'lens1');
+        INSERT INTO gcp VALUES (1, 'gcp1', 'site1'), (2, 'gcp2', 'site2');
+        INSERT INTO usedgcp VALUES (1, 'gcp1', 1), (2, 'gcp1', 3), (3, 'gcp2', 1);
+        INSERT INTO site VALUES (2, 'site2', 0, 0, 0);
+        INSERT INTO station VALUES (3, 'st3', 'site2', 'Other station', 'other');
+        INSERT INTO camera (seq, id, stationID, modelID, lensmodelID, li_IP) VALUES (4, 'c4', 'st3', 'model2', 'lens1', 'ip1');
+    ''')
+    return station_db
+
+
+class RecordingCursor:
+    '''
+    Cursor that records the statements sent to it instead of running them. INSERTs get consecutive seqs starting at 1, the same
+    as an AUTO_INCREMENT column with @@auto_increment_increment = 1.
+    '''
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.lastrowid = None
+        self.result = []
+
+    def execute(self, query, args=None):
+        self.connection.executed.append((query, args))
+        if query.startswith('INSERT'):
+            rows = query.count('), (') + 1
+            self.lastrowid = self.connection.next_seq
+            self.connection.next_seq = self.connection.next_seq + rows
+        elif 'auto_increment_increment' in query:
+            self.result = [(self.connection.increment,)]
+        elif query.startswith('SELECT id, seq'):
+            self.result = [(ID, self.connection.seqs[ID]) for ID in args if ID in self.connection.seqs]
+        return 1
+
+    def executemany(self, query, arg_list):
+        self.connection.batches.append((query, list(arg_list)))
+        return len(arg_list)
+
+    def fetchone(self):
+        return self.result[0] if len(self.result) > 0 else None
+
+    def fetchall(self):
+        return self.result
+
+    def close(self):
+        pass
+
+
+class RecordingConnection:
+    '''
+    Connection that hands out RecordingCursors, for testing the write path without a MySQL server.
+    '''
+
+    def __init__(self, increment=1, seqs=None):
+        self.increment = increment
+        self.seqs = seqs if seqs != None else {}
+        self.next_seq = 1
+        self.executed = []
+        self.batches = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self, *args):
+        return RecordingCursor(self)
+
+    def commit(self):
+        self.commits = self.commits + 1
+
+    def rollback(self):
+        self.rollbacks = self.rollbacks + 1
@@ -0,0 +1,133 @@
+import struct
+
+import numpy as np
+import pytest
+
+import coastcamDBfuncs
+from coastcamDBfuncs import np2blob, blob2np, np2text, text2np, decodeArray, np2db, value2db, array_blob_magic
+
+
+@pytest.mark.parametrize('array', [
+    np.array([[1500.123456789, 0.0, 1224.5], [0.0, 1499.987654321, 1024.25], [0.0, 0.0, 1.0]]),
+    np.array([-0.2, 0.05, 1e-300, 0.001, -0.002]),
+    np.arange(11, dtype=np.int32),
+    np.array([]),
+])
+def test_blob_round_trip_is_exact(array):
+    decoded = blob2np(np2blob(array))
+
+    assert decoded.dtype == np.float64
+    assert decoded.shape == array.shape
+    assert np.array_equal(decoded, array.astype(np.float64))
+
+
+def test_blob_header_and_alignment():
+    blob = np2blob(np.zeros((3, 3)))
+
+    assert blob[0:4] == array_blob_magic
+    assert struct.unpack_from('<BB2s', blob, 4) == (1, 2, b'f8')
+    assert struct.unpack_from('<2I', blob, 8) == (3, 3)
+    #8 byte header, 8 bytes of shape, then the values
+    assert len(blob) == 16 + 9 * 8
+
+
+def test_blob2np_is_read_only_view():
+    blob = np2blob(np.ones(5))
+    array = blob2np(blob)
+
+    assert not array.flags.writeable
+    with pytest.raises(ValueError):
+        array[0] = 2.0
+
+
+def test_blob2np_rejects_other_bytes():
+    with pytest.raises(ValueError):
+        blob2np(b'[1. 2. 3.]')
+
+
+def test_text_round_trip():
+    K = np.array([[1500.0, 0.0, 1224.0], [0.0, 1500.0, 1024.0], [0.0, 0.0, 1.0]])
+    kc = np.array([-0.2, 0.05, 0.0, 0.001, -0.002])
+
+    assert np.allclose(text2np(np2text(K)), K)
+    assert np.allclose(text2np(np2text(kc)), kc)
+
+
+def test_decodeArray_detects_format():
+    array = np.array([[1.0, 2.0], [3.0, 4.0]])
+
+    assert np.array_equal(decodeArray(np2blob(array)), array)
+    assert np.array_equal(decodeArray(bytearray(np2blob(array))), array)
+    assert np.array_equal(decodeArray(memoryview(np2blob(array))), array)
+    assert np.allclose(decodeArray(np2text(array)), array)
+    #TEXT values read out of a column converted to BLOB
+    assert np.allclose(decodeArray(np2text(array).encode('utf-8')), array)
+
+
+@pytest.mark.parametrize('value', [None, float('nan'), '', b''])
+def test_decodeArray_null_values(value):
+    assert decodeArray(value) is None
+
+
+def test_np2db_follows_storage_format(monkeypatch):
+    array = np.array([1.0, 2.0])
+
+    assert isinstance(np2db(array), str)
+
+    monkeypatch.setattr(coastcamDBfuncs, 'array_storage_format', 'binary')
+    assert np2db(array) == np2blob(array)
+    assert value2db(array) == np2blob(array)
+    assert value2db(np.float64(1.5)) == 1.5 and type(value2db(np.float64(1.5))) is float
+
+
+def test_blob2np_checks_version_and_dtype():
+    blob = bytearray(np2blob(np.ones(3)))
+    blob[4] = 2
+    with pytest.raises(ValueError):
+        blob2np(bytes(blob))
+
+    blob = bytearray(np2blob(np.ones(3)))
+    blob[6:8] = b'f4'
+    with pytest.raises(ValueError):
+        blob2np(bytes(blob))
+
+
+class PlaceholderConnection:
+    '''
+    Wraps a SQLite connection so the MySQL %s placeholders written by migrateArrays2blob() can run on it.
+    '''
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def cursor(self):
+        return self
+
+    def execute(self, query, args=()):
+        self.result = self.connection.execute(query.replace('%s', '?'), args)
+
+    def executemany(self, query, arg_list):
+        self.connection.executemany(query.replace('%s', '?'), arg_list)
+
+    def fetchall(self):
+        return self.result.fetchall()
+
+    def commit(self):
+        self.connection.commit()
+
+
+def test_migrate_wrapped_m(station_db):
+    #geometry m at real scale is line-wrapped by np2text()
+    m = np.array([-412.47, 210.29, -33.12, 152000.3, -39.4, -157.8, 512.2, 723830.0, -0.0412, -0.0921, 0.00087])
+    assert ',' in np2text(m)
+    station_db.execute("ALTER TABLE geometry ADD COLUMN m TEXT")
+    station_db.execute("UPDATE geometry SET m = ? WHERE seq = 1", (np2text(m),))
+    station_db.execute("UPDATE geometry SET m = ? WHERE seq = 2", (np2blob(m),))
+
+    converted = coastcamDBfuncs.migrateArrays2blob(PlaceholderConnection(station_db), columns=[('geometry', 'm', 'seq')],
+                                                   alterColumns=False)
+
+    assert converted == {'geometry.m': 1}
+    blob = station_db.execute("SELECT m FROM geometry WHERE seq = 1").fetchone()[0]
+    assert np.allclose(blob2np(blob), m, rtol=1e-3)
+    assert station_db.execute("SELECT m FROM geometry WHERE seq = 3").fetchone()[0] == None
@@ -0,0 +1,87 @@
+import collections
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from coastcamDBfuncs import frame2arrow, writeArrow, site2parquet, np2blob, np2text
+
+pa = pytest.importorskip('pyarrow')
+import pyarrow.parquet
+import pyarrow.feather
+
+
+def cameraFrame():
+    K = np.arange(9, dtype=float).reshape(3, 3)
+    kc = np.array([0.1, 0.2, 0.3, 0.4, 0.5])
+    return pd.DataFrame({'id': ['c1', 'c2', 'c3'], 'K': [np2blob(K), np2text(K), None], 'kc': [np2text(kc), None, np2blob(kc)], 'x': [1.0, 2.0, 3.0]}), K, kc
+
+
+def test_frame2arrow_decodes_array_columns():
+    df, K, kc = cameraFrame()
+    arrow_table = frame2arrow(df)
+
+    assert arrow_table.column_names == ['id', 'K', 'kc', 'x']
+    assert arrow_table.schema.field('K').type == pa.list_(pa.list_(pa.float64(), 3), 3)
+    assert arrow_table.schema.field('kc').type == pa.list_(pa.float64(), 5)
+
+    K_column = arrow_table.column('K').to_pylist()
+    assert np.array_equal(np.array(K_column[0]), K)
+    assert np.allclose(np.array(K_column[1]), K)
+    assert K_column[2] is None
+    assert arrow_table.column('kc').to_pylist()[1] is None
+
+
+def test_all_null_array_column_keeps_its_shape():
+    df = pd.DataFrame({'id': ['c1'], 'K': [None]})
+    arrow_table = frame2arrow(df)
+
+    assert arrow_table.schema.field('K').type == pa.list_(pa.list_(pa.float64(), 3), 3)
+    assert arrow_table.column('K').to_pylist() == [None]
+
+
+@pytest.mark.parametrize('fileFormat', ['parquet', 'feather'])
+def test_writeArrow_round_trip(tmp_path, fileFormat):
+    df, K, kc = cameraFrame()
+    full_path = writeArrow(df, str(tmp_path / 'camera'), fileFormat)
+
+    assert full_path.endswith('.' + fileFormat)
+    if fileFormat == 'parquet':
+        arrow_table = pyarrow.parquet.read_table(full_path)
+    else:
+        arrow_table = pyarrow.feather.read_table(full_path)
+    assert arrow_table.column('x').to_pylist() == [1.0, 2.0, 3.0]
+    assert np.allclose(np.array(arrow_table.column('kc').to_pylist()[0]), kc)
+
+
+def test_writeArrow_unknown_format(tmp_path):
+    df, K, kc = cameraFrame()
+
+    with pytest.raises(ValueError):
+        writeArrow(df, str(tmp_path / 'camera'), 'xlsx')
+
+
+def test_site2parquet_one_file_per_table(tmp_path):
+    df, K, kc = cameraFrame()
+    snapshot = collections.OrderedDict([('site', pd.DataFrame({'id': ['site1']})), ('station', pd.DataFrame({'id': []})), ('camera', df)])
+
+    path_list = site2parquet('site1', str(tmp_path), None, snapshot=snapshot)
+
+    assert path_list == [str(tmp_path) + '/sites/site1/tables/site.parquet', str(tmp_path) + '/sites/site1/tables/camera.parquet']
+    assert pyarrow.parquet.read_table(path_list[1]).num_rows == 3
+
+
+def test_geometry_export_with_wrapped_m(tmp_path):
+    #real-scale m is line-wrapped by np2text()
+    m = np.array([-412.47, 210.29, -33.12, 152000.3, -39.4, -157.8, 512.2, 723830.0, -0.0412, -0.0921, 0.00087])
+    geometry = pd.DataFrame({'seq': [1, 2, 3], 'cameraID': ['c1', 'c1', 'c2'], 'm': [np2text(m), None, np2blob(m)]})
+    snapshot = collections.OrderedDict([('geometry', geometry)])
+
+    path_list = site2parquet('site1', str(tmp_path), None, snapshot=snapshot)
+
+    arrow_table = pyarrow.parquet.read_table(path_list[0])
+    assert arrow_table.schema.field('m').type == pa.list_(pa.float64(), 11)
+    m_column = arrow_table.column('m').to_pylist()
+    assert np.allclose(m_column[0], m, rtol=1e-4)
+    assert m_column[1] is None
+    assert np.array_equal(m_column[2], m)
@@ -0,0 +1,44 @@
+from coastcamDBfuncs import flushStatements, executeBatch, commitBatch
+from conftest import RecordingConnection
+
+
+def test_executeBatch_splits_and_commits_per_batch():
+    connection = RecordingConnection()
+    arg_list = [(i,) for i in range(0, 5)]
+
+    rowcount = executeBatch(connection, "UPDATE camera SET x = %s", arg_list, batchSize=2)
+
+    assert rowcount == 5
+    assert [len(batch) for query, batch in connection.batches] == [2, 2, 1]
+    assert connection.commits == 3
+
+
+def test_flushStatements_groups_consecutive_queries():
+    connection = RecordingConnection()
+    statements = [("A", (1,)), ("A", (2,)), ("B", (3,)), ("A", (4,))]
+
+    rowcount = flushStatements(connection, statements, batchSize=10)
+
+    assert rowcount == 4
+    assert connection.batches == [("A", [(1,), (2,)]), ("B", [(3,)]), ("A", [(4,)])]
+
+
+def test_flushStatements_without_batch_size_runs_one_at_a_time():
+    connection = RecordingConnection()
+    statements = [("A", (1,)), ("A", (2,))]
+
+    flushStatements(connection, statements)
+
+    assert connection.executed == statements
+    assert connection.batches == []
+    assert connection.commits == 2
+
+
+def test_commitBatch():
+    connection = RecordingConnection()
+    for count in range(1, 8):
+        commitBatch(connection, count, 3)
+    commitBatch(connection, 3, None)
+
+    assert connection.commits == 2
+
@@ -0,0 +1,25 @@
+import pytest
+
+from coastcamDBfuncs import buildStatement, statement_cache
+
+
+def test_insert_statement():
+    assert buildStatement('insert', 'camera', ['stationID', 'id']) == "INSERT INTO camera (stationID, id) VALUES (%s, %s)"
+
+
+def test_update_statement():
+    assert buildStatement('update', 'camera', ['x'], ['id']) == "UPDATE camera SET x = %s WHERE id = %s"
+    assert buildStatement('update', 'camera', ['x', 'y'], ['id', 'seq']) == "UPDATE camera SET x = %s, y = %s WHERE id = %s AND seq = %s"
+    assert buildStatement('update', 'camera', ['x']) == "UPDATE camera SET x = %s"
+
+
+def test_statements_are_cached_by_shape():
+    query = buildStatement('insert', 'gcp', ['id', 'x'])
+
+    assert statement_cache[('insert', 'gcp', ('id', 'x'), ())] == query
+    assert buildStatement('insert', 'gcp', ['id', 'x']) is query
+
+
+def test_unknown_kind():
+    with pytest.raises(ValueError):
+        buildStatement('delete', 'camera', ['id'])
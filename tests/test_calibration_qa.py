@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from coastcamDBfuncs import Parameter, np2text
+from coastcamDB_projection_funcs import world2image, loadGCPObservations, reprojectObservations, calibrationQA
+from conftest import K1, kc1
+
+
+def observationFrame(gcp, m=None):
+    #every observation is seen by one camera with the K/kc of c1 in the station database
+    rows = []
+    for x, y, z in gcp:
+        rows.append({'gcpX': x, 'gcpY': y, 'gcpZ': z, 'K': np2text(K1), 'kc': np2text(kc1), 'm': m, 'azimuth': 0.3, 'tilt': 1.2,
+                     'roll': 0.02, 'cameraX': 10.0, 'cameraY': 20.0, 'cameraZ': 30.0})
+    return pd.DataFrame(rows)
+
+
+def test_angles_match_world2image():
+    extrinsics = [{'x': 10.0, 'y': 20.0, 'z': 30.0, 'a': 0.3, 't': 1.2, 'r': 0.02}]
+    intrinsics = [{'NU': 2448, 'NV': 2048, 'fx': K1[0][0], 'fy': K1[1][1], 'c0U': K1[0][2], 'c0V': K1[1][2], 'd1': kc1[0],
+                   'd2': kc1[1], 'd3': kc1[2], 't1': kc1[3], 't2': kc1[4]}]
+    params = Parameter(extrinsics=extrinsics, intrinsics=intrinsics)
+    gcp = np.array([[30.0, 90.0, 0.0], [40.0, 95.0, 1.0], [25.0, 80.0, -0.5]])
+
+    U_model, V_model = reprojectObservations(observationFrame(gcp))
+    U, V, valid = world2image(params, gcp)
+
+    assert np.allclose(U_model, U[0])
+    assert np.allclose(V_model, V[0])
+
+
+#DLT coefficients at the scale of real solutions. np2text() wraps these onto two lines
+m = np.array([-412.47, 210.29, -33.12, 152000.3, -39.4, -157.8, 512.2, 723830.0, -0.0412, -0.0921, 0.00087])
+
+
+def dltModel(gcp):
+    gcp = np.asarray(gcp, dtype=float)
+    denominator = m[8] * gcp[:, 0] + m[9] * gcp[:, 1] + m[10] * gcp[:, 2] + 1
+    U = (m[0] * gcp[:, 0] + m[1] * gcp[:, 1] + m[2] * gcp[:, 2] + m[3]) / denominator
+    V = (m[4] * gcp[:, 0] + m[5] * gcp[:, 1] + m[6] * gcp[:, 2] + m[7]) / denominator
+    return U, V
+
+
+def test_dlt():
+    text = np2text(m)
+    assert ',' in text
+    gcp = [[20.0, 100.0, 0.0], [30.0, 95.0, 0.0], [15.0, 85.0, 1.0]]
+
+    U_model, V_model = reprojectObservations(observationFrame(gcp, m=text), method='dlt')
+    U, V = dltModel(gcp)
+
+    #np2text() keeps 4 significant digits
+    assert np.allclose(U_model, U, rtol=1e-3)
+    assert np.allclose(V_model, V, rtol=1e-3)
+
+    with pytest.raises(ValueError):
+        reprojectObservations(observationFrame(gcp), method='other')
+
+
+@pytest.fixture
+def qa_db(station_db):
+    #four solutions for camera c1, each seeing the same three gcps
+    station_db.executescript('''
+        ALTER TABLE geometry ADD COLUMN m TEXT;
+        INSERT INTO geometry (seq, cameraID, azimuth, tilt, roll) VALUES (4, 'c1', 0.1, 1.2, 0.01), (5, 'c1', 0.1, 1.2, 0.01);
+        UPDATE geometry SET azimuth = 0.1, tilt = 1.2, roll = 0.01 WHERE cameraID = 'c1';
+        CREATE TABLE gcp (seq INTEGER PRIMARY KEY, id TEXT, siteID TEXT, x REAL, y REAL, z REAL);
+        CREATE TABLE usedgcp (seq INTEGER PRIMARY KEY, gcpID TEXT, geometrySequence INTEGER, U REAL, V REAL);
+        INSERT INTO gcp VALUES (1, 'g1', 'site1', 20.0, 100.0, 0.0), (2, 'g2', 'site1', 30.0, 95.0, 0.0), (3, 'g3', 'site1', 15.0, 85.0, 1.0);
+    ''')
+    seq = 1
+    for geometrySequence in [1, 2, 4, 5]:
+        for gcpID in ['g1', 'g2', 'g3']:
+            station_db.execute("INSERT INTO usedgcp VALUES (?, ?, ?, 0, 0)", (seq, gcpID, geometrySequence))
+            seq = seq + 1
+
+    #observed pixels are the model plus a known offset per solution
+    observations = loadGCPObservations(station_db)
+    U_model, V_model = reprojectObservations(observations)
+    offsets = {1: 0.1, 2: 0.2, 4: 0.15, 5: 20.0}
+    for usedgcpSequence, geometrySequence, U, V in zip(observations['usedgcpSequence'], observations['geometrySequence'], U_model, V_model):
+        station_db.execute("UPDATE usedgcp SET U = ?, V = ? WHERE seq = ?", (U + offsets[geometrySequence], V, usedgcpSequence))
+
+    return station_db
+
+
+def test_loadGCPObservations_filters(qa_db):
+    assert len(loadGCPObservations(qa_db)) == 12
+    assert len(loadGCPObservations(qa_db, siteID='site1', cameraID='c1', time_start=1500, time_end=1600)) == 12
+    assert len(loadGCPObservations(qa_db, time_start=2000)) == 0
+
+
+def test_calibrationQA_flags_the_outlier(qa_db):
+    points, solutions = calibrationQA(qa_db, cameraID='c1')
+
+    assert len(points) == 12
+    assert np.allclose(points['dV'], 0.0)
+    assert solutions['geometrySequence'].tolist() == [1, 2, 4, 5]
+    assert solutions['numPoints'].tolist() == [3, 3, 3, 3]
+    assert np.allclose(solutions['rmsU'], [0.1, 0.2, 0.15, 20.0])
+    assert solutions['outlier'].tolist() == [False, False, False, True]
+
+
+def test_calibrationQA_dlt_with_stored_m(qa_db):
+    qa_db.execute("UPDATE geometry SET m = ?", (np2text(m),))
+
+    points, solutions = calibrationQA(qa_db, cameraID='c1', method='dlt')
+    U, V = dltModel(points.merge(loadGCPObservations(qa_db), on='usedgcpSequence')[['gcpX', 'gcpY', 'gcpZ']].to_numpy())
+
+    assert len(solutions) == 4
+    assert np.allclose(points['U_model'], U, rtol=1e-3)
+    assert np.allclose(points['V_model'], V, rtol=1e-3)
+
+
+def test_calibrationQA_no_observations(qa_db):
+    points, solutions = calibrationQA(qa_db, cameraID='c2')
+
+    assert len(points) == 0
+    assert len(solutions) == 0
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from coastcamDBfuncs import Parameter, CameraFieldError, dicts2cameraArray, record2array_value, camera_dtype
+
+
+extrinsics = [{'x': 1.0, 'y': 2.0, 'z': 3.0, 'a': 0.1, 't': 1.2, 'r': None},
+              {'x': 4.0, 'y': 5.0, 'z': 6.0, 'a': 0.2, 't': 1.3, 'r': 0.0}]
+intrinsics = [{'NU': 2448, 'NV': None, 'fx': 1500.0, 'fy': 1500.0, 'c0U': 1224.0, 'c0V': 1024.0, 'd1': -0.2, 'd2': 0.05, 'd3': 0.0, 't1': 0.0, 't2': 0.0},
+              {'NU': 1000, 'NV': 750, 'fx': None, 'fy': 1800.0, 'c0U': 500.0, 'c0V': 375.0, 'd1': 0.0, 'd2': 0.0, 'd3': 0.0, 't1': 0.0, 't2': 0.0}]
+
+
+def test_record2array_value_missing():
+    assert record2array_value('NU', None) == -1
+    assert np.isnan(record2array_value('x', None))
+    assert np.isnan(record2array_value('x', float('nan')))
+    assert record2array_value('x', 2.5) == 2.5
+
+
+def test_dicts2cameraArray():
+    array = dicts2cameraArray(extrinsics, intrinsics)
+
+    assert array.dtype == camera_dtype
+    assert array['x'].tolist() == [1.0, 4.0]
+    assert array['NV'].tolist() == [-1, 750]
+    assert np.isnan(array['r'][0])
+    assert len(dicts2cameraArray()) == 0
+
+
+def test_records_read_like_the_old_dicts():
+    params = Parameter(extrinsics=extrinsics, intrinsics=intrinsics)
+
+    assert params.num_cameras == 2
+    assert params.extrinsics == extrinsics
+    assert params.intrinsics == intrinsics
+    assert dict(params.extrinsics[-1]) == extrinsics[1]
+    assert params.intrinsics[0]['NV'] is None
+    assert list(params.extrinsics[0].keys()) == ['x', 'y', 'z', 'a', 't', 'r']
+    assert [record['x'] for record in params.extrinsics[0:2]] == [1.0, 4.0]
+
+
+def test_records_write_through_to_the_array():
+    params = Parameter(extrinsics=extrinsics, intrinsics=intrinsics)
+
+    params.extrinsics[1]['x'] = 10.0
+    params.intrinsics[1]['fx'] = 1790.0
+    params.intrinsics[0]['NU'] = None
+
+    assert params.cameras['x'][1] == 10.0
+    assert params.cameras['fx'][1] == 1790.0
+    assert params.cameras['NU'][0] == -1
+
+
+def test_records_have_fixed_keys():
+    params = Parameter(extrinsics=extrinsics)
+
+    with pytest.raises(KeyError):
+        params.extrinsics[0]['fx']
+    with pytest.raises(KeyError):
+        params.extrinsics[0]['new'] = 1.0
+    with pytest.raises(TypeError):
+        del params.extrinsics[0]['x']
+    with pytest.raises(IndexError):
+        params.extrinsics[2]
+    assert params.intrinsics is None
+
+
+def test_unknown_keys_are_rejected():
+    with pytest.raises(CameraFieldError) as error:
+        Parameter(extrinsics=[dict(extrinsics[0], cameraID='c1')])
+    assert "'cameraID'" in error.value.message
+
+    #an extrinsic key in the intrinsics is unknown there too
+    with pytest.raises(CameraFieldError):
+        dicts2cameraArray(intrinsics=[intrinsics[0], dict(intrinsics[1], x=1.0)])
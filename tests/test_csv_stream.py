@@ -0,0 +1,81 @@
+import builtins
+import csv
+import decimal
+import gzip
+import sqlite3
+
+import numpy as np
+import pytest
+
+import coastcamDBfuncs
+
+from coastcamDBfuncs import csvValue, query2csvStream, table2csvStream, column2csvStream, np2blob, np2text
+
+
+def readCSV(path):
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8', newline='') as csv_file:
+        return list(csv.reader(csv_file))
+
+
+def test_csvValue():
+    array = np.array([1.0, 2.0])
+
+    assert csvValue(None) == ''
+    assert csvValue(np2blob(array)) == np2text(array)
+    assert csvValue(b'[1. 2.]') == '[1. 2.]'
+    assert csvValue(decimal.Decimal('2.5')) == 2.5
+    assert csvValue(7) == 7
+
+
+def test_query2csvStream_in_chunks(station_db, tmp_path):
+    full_path, row_count = query2csvStream("SELECT id, K FROM camera WHERE stationID = %s ORDER BY seq", str(tmp_path / 'cameras.csv'), station_db, chunkSize=1, args=('st1',))
+
+    rows = readCSV(full_path)
+    assert row_count == 2
+    assert rows[0] == ['id', 'K']
+    assert [row[0] for row in rows[1:]] == ['c1', 'c2']
+    #the blob K of c1 is written as text
+    assert rows[1][1].startswith('[[')
+
+
+def test_table2csvStream_compressed(station_db, tmp_path):
+    full_path = table2csvStream('geometry', str(tmp_path) + '/', station_db, chunkSize=2, compress=True)
+
+    assert full_path == str(tmp_path) + '/tables/geometry.csv.gz'
+    rows = readCSV(full_path)
+    assert rows[0] == ['seq', 'cameraID', 'azimuth', 'tilt', 'roll']
+    assert len(rows) == 4
+
+
+def test_column2csvStream_null_cells(station_db, tmp_path):
+    full_path = column2csvStream('timeIN', 'camera', str(tmp_path) + '/', station_db)
+
+    assert readCSV(full_path) == [['timeIN'], ['1000'], ['1500'], ['']]
+
+
+class BrokenConnection:
+
+    def cursor(self, *args):
+        raise sqlite3.OperationalError('server has gone away')
+
+
+def test_query2csvStream_closes_the_file_on_failure(station_db, tmp_path, monkeypatch):
+    opened = []
+
+    def recordingOpen(*args, **kwargs):
+        opened.append(builtins.open(*args, **kwargs))
+        return opened[-1]
+
+    monkeypatch.setattr(coastcamDBfuncs, 'open', recordingOpen, raising=False)
+
+    with pytest.raises(sqlite3.OperationalError):
+        query2csvStream("SELECT nothing FROM camera", str(tmp_path / 'failed.csv'), station_db)
+    assert len(opened) == 1
+    assert opened[0].closed
+
+    #no cursor, so the file isn't opened at all
+    with pytest.raises(sqlite3.OperationalError):
+        query2csvStream("SELECT id FROM camera", str(tmp_path / 'no_cursor.csv'), BrokenConnection())
+    assert len(opened) == 1
+    assert not (tmp_path / 'no_cursor.csv').exists()
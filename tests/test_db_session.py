@@ -0,0 +1,158 @@
+import threading
+
+import pytest
+
+import coastcamDBfuncs
+from coastcamDBfuncs import DBSession, UnitOfWork, PoolTimeoutError, ConnectionLostError
+
+
+class FakeConnection:
+    '''
+    Stands in for a pymysql connection so the pool can be tested without a server.
+    '''
+
+    def __init__(self):
+        self.open = True
+        self.pings = 0
+        self.commits = 0
+        self.rollbacks = 0
+
+    def ping(self, reconnect=True):
+        self.pings = self.pings + 1
+        if not self.open:
+            raise Exception('connection is closed')
+
+    def commit(self):
+        self.commits = self.commits + 1
+
+    def rollback(self):
+        self.rollbacks = self.rollbacks + 1
+
+    def close(self):
+        self.open = False
+
+
+class FakeSession(DBSession):
+
+    def newConnection(self):
+        return FakeConnection()
+
+
+def test_released_connection_is_reused_and_rolled_back():
+    session = FakeSession(poolSize=2)
+
+    with session.connection() as first:
+        pass
+    with session.connection() as second:
+        pass
+
+    assert second is first
+    assert first.rollbacks == 2
+
+
+def test_pool_timeout():
+    session = FakeSession(poolSize=1)
+    connection = session.acquire()
+
+    with pytest.raises(PoolTimeoutError):
+        session.acquire(timeout=0.01)
+
+    session.release(connection)
+    assert session.acquire(timeout=0.01) is connection
+
+
+def test_each_thread_gets_its_own_connection():
+    session = FakeSession(poolSize=2)
+    main = session.threadConnection()
+    assert session.threadConnection() is main
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(session.threadConnection()))
+    thread.start()
+    thread.join()
+
+    assert other[0] is not main
+
+
+def test_idle_connection_is_pinged_and_replaced_if_dead():
+    session = FakeSession(pingInterval=0)
+    connection = FakeConnection()
+
+    assert session.checkConnection(connection, 0) is connection
+    assert connection.pings == 1
+
+    connection.close()
+    replacement = session.checkConnection(connection, 0)
+    assert replacement is not connection
+    assert replacement.open
+
+
+def test_connection_in_unit_of_work_is_never_reconnected():
+    session = FakeSession(pingInterval=0)
+    connection = FakeConnection()
+
+    with UnitOfWork(connection):
+        assert session.checkConnection(connection, 0) is connection
+        assert connection.pings == 0
+
+        connection.close()
+        with pytest.raises(ConnectionLostError):
+            session.checkConnection(connection, 0)
+
+    assert coastcamDBfuncs.open_units_of_work == {}
+
+
+def test_unit_of_work_commits_before_the_connection_is_checked():
+    #with pingInterval=0 every use of the thread's connection would ping it once the unit of work was closed
+    session = FakeSession(pingInterval=0)
+
+    with UnitOfWork(session):
+        connection = session.threadConnection()
+        session.ping()
+
+    assert connection.commits == 1
+    assert connection.pings == 1
+    assert coastcamDBfuncs.open_units_of_work == {}
+
+
+def test_dropped_connection_in_unit_of_work_is_not_reconnected():
+    session = FakeSession(pingInterval=0)
+
+    with pytest.raises(ConnectionLostError):
+        with UnitOfWork(session):
+            connection = session.threadConnection()
+            with pytest.raises(ConnectionLostError):
+                session.releaseThread()
+            connection.close()
+
+    #the commit at the end of the block found the connection closed
+    assert session.threadConnection() is not connection
+    assert connection.commits == 0
+    assert coastcamDBfuncs.open_units_of_work == {}
+
+
+def test_thread_past_pool_size_times_out():
+    session = FakeSession(poolSize=1, acquireTimeout=0.01)
+    session.threadConnection()
+
+    errors = []
+
+    def worker():
+        try:
+            session.threadConnection()
+        except PoolTimeoutError as e:
+            errors.append(e.message)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join(timeout=5)
+
+    assert not thread.is_alive()
+    assert 'releaseThread()' in errors[0]
+
+    #free again once the main thread releases its connection
+    session.releaseThread()
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join(timeout=5)
+    assert len(errors) == 1
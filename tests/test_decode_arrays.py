@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from coastcamDBfuncs import np2blob, np2text, decodeArray, decodeArrays, db2np_many
+from conftest import K1, K2
+
+
+def test_decodeArrays_mixed_formats_and_missing():
+    a = np.array([[1.0, 2.0], [3.0, 4.0]])
+    b = np.array([[5.0, 6.0], [7.0, 8.0]])
+
+    array = decodeArrays([np2text(a), None, np2blob(b), float('nan'), np2text(b).encode('utf-8')])
+
+    assert array.shape == (5, 2, 2)
+    assert np.allclose(array[0], a)
+    assert np.isnan(array[1]).all()
+    assert np.array_equal(array[2], b)
+    assert np.isnan(array[3]).all()
+    assert np.allclose(array[4], b)
+
+
+def test_decodeArrays_all_missing():
+    array = decodeArrays([None, ''])
+
+    assert array.shape == (2,)
+    assert np.isnan(array).all()
+
+
+def test_decodeArrays_shape_mismatch():
+    with pytest.raises(ValueError):
+        decodeArrays([np2text(np.zeros(5)), np2text(np.zeros(3))])
+
+
+def test_db2np_many_keeps_requested_order(station_db):
+    id_list, array = db2np_many(station_db, 'camera', 'K', ids=['c2', 'missing', 'c1', 'c3'])
+
+    assert id_list == ['c2', 'missing', 'c1', 'c3']
+    assert array.shape == (4, 3, 3)
+    assert np.allclose(array[0], K2)
+    assert np.isnan(array[1]).all()
+    assert np.array_equal(array[2], K1)
+    assert np.isnan(array[3]).all()
+
+
+def test_db2np_many_every_row(station_db):
+    id_list, array = db2np_many(station_db, 'camera', 'kc')
+
+    assert id_list == ['c1', 'c2', 'c3']
+    assert array.shape == (3, 5)
+    assert db2np_many(station_db, 'camera', 'kc', ids=[])[0] == []
+
+
+#geometry m at real scale. np2text() wraps it onto two lines, leaving a comma in the middle of the text
+m = np.array([210.29, -412.5, 33.1, 152000.3, -0.0394, -0.1578, 512.2, 7238.3, 0.00012, -0.0003, 1e-05])
+
+
+def test_wrapped_m_decodes():
+    text = np2text(m)
+    assert ',' in text
+
+    assert np.allclose(decodeArray(text), m, rtol=1e-4)
+    array = decodeArrays([text, None, np2blob(m), text.encode('utf-8')])
+    assert array.shape == (4, 11)
+    assert np.allclose(array[0], m, rtol=1e-4)
+    assert np.isnan(array[1]).all()
+    assert np.array_equal(array[2], m)
+
+
+def test_db2np_many_wrapped_m(station_db):
+    station_db.execute("ALTER TABLE geometry ADD COLUMN m TEXT")
+    station_db.execute("UPDATE geometry SET m = ? WHERE seq IN (1, 3)", (np2text(m),))
+
+    id_list, array = db2np_many(station_db, 'geometry', 'm')
+
+    assert id_list == [1, 2, 3]
+    assert array.shape == (3, 11)
+    assert np.allclose(array[2], m, rtol=1e-4)
+    assert np.isnan(array[1]).all()
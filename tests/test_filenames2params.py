@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+import coastcamDBfuncs
+from coastcamDBfuncs import ParameterCache, filenames2params, parseFilename
+
+
+@pytest.fixture(autouse=True)
+def fresh_station_index(monkeypatch):
+    monkeypatch.setattr(coastcamDBfuncs, 'station_indexes', {})
+
+
+def argusName(unix_time, station='examplexx', camera='c1'):
+    return '{}.Thu.Jan.01_00_00_00.GMT.1970.{}.{}.snap.jpg'.format(unix_time, station, camera)
+
+
+def test_parseFilename_components():
+    components = parseFilename('some/dir\\' + argusName(1200), noLocal=True)
+
+    assert components == {'time': '1200', 'when': 'Thu.Jan.01_00_00_00.GMT.1970', 'station': 'examplexx', 'camera': 'c1', 'type': 'snap', 'format': 'jpg'}
+    assert parseFilename('not_an_argus_name.jpg') is None
+
+
+def test_files_in_one_epoch_share_the_calibration(station_db):
+    filenames = [argusName(1100), argusName(1200), argusName(1600)]
+    params_dict = filenames2params(filenames, station_db)
+
+    assert list(params_dict.keys()) == filenames
+    assert params_dict[filenames[0]].num_cameras == 1
+    assert params_dict[filenames[2]].num_cameras == 2
+
+    #each file gets its own copy with its own time
+    assert params_dict[filenames[0]] is not params_dict[filenames[1]]
+    assert params_dict[filenames[0]].date_time_str == '1970-01-01 00:18:20'
+    assert params_dict[filenames[1]].date_time_str == '1970-01-01 00:20:00'
+
+
+def test_unmatched_files_map_to_none(station_db):
+    filenames = ['bad_name.jpg', argusName(1200, station='nowhere'), argusName(5000)]
+    params_dict = filenames2params(filenames, station_db)
+
+    assert params_dict == {filename: None for filename in filenames}
+
+
+def test_directory_of_files(station_db, tmp_path):
+    image_dir = tmp_path / 'images'
+    image_dir.mkdir()
+    for unix_time in [1200, 2500]:
+        (image_dir / argusName(unix_time)).write_bytes(b'')
+
+    params_dict = filenames2params(str(image_dir), station_db)
+
+    assert sorted(os.path.basename(filename) for filename in params_dict) == [argusName(1200), argusName(2500)]
+    assert all(params is not None for params in params_dict.values())
+
+
+def test_cache_is_filled_and_reused(station_db):
+    cache = ParameterCache()
+    filenames2params([argusName(1200), argusName(2500)], station_db, useCache=True, cache=cache)
+    assert len(cache) == 2
+
+    params_dict = filenames2params([argusName(1300)], station_db, useCache=True, cache=cache)
+    assert params_dict[argusName(1300)].num_cameras == 1
+    assert len(cache) == 2
@@ -0,0 +1,91 @@
+import pytest
+
+from coastcamDBfuncs import executeInsertBatch, Site, Table, Column
+from conftest import RecordingConnection
+
+
+def test_seqs_follow_lastrowid_across_batches():
+    connection = RecordingConnection()
+    connection.next_seq = 10
+
+    seq_list = executeInsertBatch(connection, 'gcp', ['id', 'x'], [('g1', 1), ('g2', 2), ('g3', 3)], batchSize=2)
+
+    assert seq_list == [10, 11, 12]
+    inserts = [query for query, args in connection.executed if query.startswith('INSERT')]
+    assert inserts == ["INSERT INTO gcp (id, x) VALUES (%s, %s), (%s, %s)", "INSERT INTO gcp (id, x) VALUES (%s, %s)"]
+
+
+def test_auto_increment_increment_must_be_one():
+    connection = RecordingConnection(increment=2)
+
+    with pytest.raises(SystemExit):
+        executeInsertBatch(connection, 'gcp', ['id'], [('g1',)])
+    assert not any(query.startswith('INSERT') for query, args in connection.executed)
+
+
+def test_on_duplicate_reads_seqs_by_id():
+    #lastrowid isn't used, so the increment doesn't matter
+    connection = RecordingConnection(increment=2, seqs={'g1': 7, 'g3': 2})
+
+    seq_list = executeInsertBatch(connection, 'gcp', ['id', 'x'], [('g1', 1), ('g2', 2), ('g3', 3)], onDuplicate=True)
+
+    assert seq_list == [7, None, 2]
+    assert connection.executed[0][0].endswith("ON DUPLICATE KEY UPDATE id = VALUES(id), x = VALUES(x)")
+
+
+def test_on_duplicate_without_id_gives_no_seqs():
+    connection = RecordingConnection()
+
+    assert executeInsertBatch(connection, 'usedgcp', ['gcpID', 'U'], [('g1', 1.0), ('g2', 2.0)], onDuplicate=True) == [None, None]
+
+
+def siteWithGeometry(connection, inserted_seqs):
+    site = Site('site1', 'coastcamdb', connection)
+    site.geometry = Table('geometry', 'coastcamdb', connection, site=site)
+    site.geometry.inserted_seqs = inserted_seqs
+    site.usedgcp = Table('usedgcp', 'coastcamdb', connection, site=site)
+    return site
+
+
+def test_existing_geometrySequence_values_are_kept(station_db):
+    #geometry holds seqs 1, 2 and 3
+    site = siteWithGeometry(station_db, [2, None, 3])
+    column = Column('geometrySequence', site.usedgcp, 1)
+    column.add2queue('3')
+
+    assert site.usedgcp.mapGeometrySequence(column) == 0
+    assert column.value_list == [1, '3']
+
+
+def test_unknown_geometrySequence_goes_to_the_latest_site_geometry_row(station_db):
+    site = siteWithGeometry(station_db, [2, None, 3])
+    column = Column('geometrySequence', site.usedgcp, 1)
+    column.add2queue(7)
+    column.add2queue(None)
+    value_list = column.value_list
+
+    assert site.usedgcp.geometrySeqs() == [2, 3]
+    assert site.usedgcp.latestGeometrySeq() == 3
+    assert site.usedgcp.mapGeometrySequence(column) == 2
+    assert column.value_list == [1, 3, 3]
+    assert column.value_list is value_list
+
+
+def test_unknown_geometrySequence_without_site_rows_goes_to_max_seq(station_db):
+    station_db.execute("INSERT INTO geometry (seq, cameraID) VALUES (12, 'c1')")
+    table = Table('usedgcp', 'coastcamdb', station_db)
+    column = Column('geometrySequence', table, 99)
+
+    assert table.geometrySeqs() == []
+    assert table.mapGeometrySequence(column) == 1
+    assert column.value_list == [12]
+
+
+def test_empty_geometry_table_changes_nothing(station_db):
+    station_db.execute("DELETE FROM geometry")
+    table = Table('usedgcp', 'coastcamdb', station_db)
+    column = Column('geometrySequence', table, 3)
+
+    assert table.latestGeometrySeq() == None
+    assert table.mapGeometrySequence(column) == 0
+    assert column.value_list == [3]
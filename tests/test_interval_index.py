@@ -0,0 +1,63 @@
+from coastcamDBfuncs import CameraIntervalIndex, calibrationEpoch, isActive
+
+
+rows = [
+    {'id': 'a', 'timeIN': 100, 'timeOUT': 199},
+    {'id': 'b', 'timeIN': 150, 'timeOUT': 299},
+    #same range as b, so no extra breakpoints
+    {'id': 'c', 'timeIN': 150, 'timeOUT': 299},
+    {'id': 'd', 'timeIN': None, 'timeOUT': 500},
+    {'id': 'e', 'timeIN': 400, 'timeOUT': float('nan')},
+]
+
+
+def ids(rows):
+    return [row['id'] for row in rows]
+
+
+def test_epochs_are_merged_at_breakpoints():
+    index = CameraIntervalIndex(rows)
+
+    #(-inf, 99], [100, 149], [150, 199], [200, 299], [300, inf)
+    assert len(index) == 5
+    assert [index.epochBounds(k) for k in range(0, len(index))] == [(None, 99), (100, 149), (150, 199), (200, 299), (300, None)]
+
+
+def test_activeAt_matches_isActive():
+    index = CameraIntervalIndex(rows)
+
+    for unix_time in range(50, 350, 7):
+        assert ids(index.activeAt(unix_time)) == ids([row for row in rows if isActive(row, unix_time)])
+
+    assert ids(index.activeAt(199)) == ['a', 'b', 'c']
+    assert ids(index.activeAt(200)) == ['b', 'c']
+
+
+def test_epochAt_and_calibrationEpoch():
+    index = CameraIntervalIndex(rows)
+
+    assert index.epochAt(160) == (150, 199)
+    assert index.epochAt(10 ** 9) == (300, None)
+    assert calibrationEpoch(rows, 0) == (None, 99)
+
+
+def test_epochsOverlapping():
+    epochs = CameraIntervalIndex(rows).epochsOverlapping(120, 250)
+
+    assert [(start, end) for start, end, active in epochs] == [(100, 149), (150, 199), (200, 299)]
+    assert [ids(active) for start, end, active in epochs] == [['a'], ['a', 'b', 'c'], ['b', 'c']]
+
+
+def test_splitByEpoch_keeps_input_order():
+    index = CameraIntervalIndex(rows)
+    groups = index.splitByEpoch(['f1', 'f2', 'f3', 'f4', 'f5'], [210, 120, 205, 130, 5])
+
+    assert list(groups.items()) == [(0, ['f5']), (1, ['f2', 'f4']), (3, ['f1', 'f3'])]
+
+
+def test_no_valid_rows():
+    index = CameraIntervalIndex([{'timeIN': None, 'timeOUT': None}])
+
+    assert len(index) == 1
+    assert index.epochAt(123) == (None, None)
+    assert index.activeAt(123) == []
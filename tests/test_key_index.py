@@ -0,0 +1,89 @@
+import pytest
+
+import coastcamDBfuncs
+from coastcamDBfuncs import KeyIndex, KeyIndexError, indexKey, Table, idColumn, keyExists, findKeys, addKeys, removeKeys, activeKeyIndex
+from conftest import RecordingConnection
+
+
+def test_lookups_without_an_index_query_the_db(station_db):
+    assert activeKeyIndex(station_db) is None
+    assert keyExists(station_db, 'camera', 'id', 'c2')
+    assert not keyExists(station_db, 'camera', 'id', 'c9')
+    assert findKeys(station_db, 'geometry', 'seq', ['3', 9, 1]).tolist() == [True, False, True]
+
+
+def test_index_loads_each_column_once(station_db):
+    with KeyIndex(station_db) as keyIndex:
+        assert activeKeyIndex(station_db) is keyIndex
+        assert keyExists(station_db, 'camera', 'id', 'c1')
+        assert findKeys(station_db, 'geometry', 'seq', [3, '9']).tolist() == [True, False]
+        assert set(keyIndex.keys.keys()) == {('camera', 'id'), ('geometry', 'seq')}
+
+        #rows written behind the index's back aren't seen until the next load
+        station_db.execute("INSERT INTO camera (seq, id) VALUES (9, 'c9')")
+        assert not keyExists(station_db, 'camera', 'id', 'c9')
+
+    assert activeKeyIndex(station_db) is None
+    assert keyExists(station_db, 'camera', 'id', 'c9')
+
+
+def test_add_and_remove(station_db):
+    with KeyIndex(station_db) as keyIndex:
+        addKeys(station_db, 'camera', 'id', ['c9', None])
+        #not loaded yet, so only recorded for verifyKeys()
+        assert ('camera', 'id') not in keyIndex.keys
+        assert keyIndex.added[('camera', 'id')] == {'c9'}
+
+        assert keyExists(station_db, 'camera', 'id', 'c1')
+        addKeys(station_db, 'camera', 'id', ['c10'])
+        removeKeys(station_db, 'camera', 'id', ['c1', 'c9'])
+
+        assert keyIndex.isin('camera', 'id', ['c1', 'c2', 'c10']).tolist() == [False, True, True]
+        assert keyIndex.added[('camera', 'id')] == {'c10'}
+
+
+def test_nested_index_restores_the_outer_one(station_db):
+    with KeyIndex(station_db) as outer:
+        with KeyIndex(station_db) as inner:
+            assert activeKeyIndex(station_db) is inner
+        assert activeKeyIndex(station_db) is outer
+
+    assert coastcamDBfuncs.open_key_indexes == {}
+
+
+def test_verify_checks_added_keys_against_the_db(station_db):
+    with KeyIndex(station_db, verify=True):
+        addKeys(station_db, 'camera', 'id', ['c1', 'c2'])
+
+    with pytest.raises(KeyIndexError):
+        with KeyIndex(station_db, verify=True):
+            addKeys(station_db, 'camera', 'id', ['c1', 'never_written'])
+
+
+def test_updateID_renames_the_key():
+    connection = RecordingConnection()
+    table = Table('camera', 'coastcamdb', connection)
+    table.id = idColumn(table, 'new_id')
+
+    with KeyIndex(connection) as keyIndex:
+        keyIndex.keys[('camera', 'id')] = {'old_id', 'other'}
+        table.id.updateID('old_id')
+
+    assert connection.executed[-1] == ("UPDATE camera SET id = %s WHERE id = %s", ['new_id', 'old_id'])
+    assert keyIndex.keys[('camera', 'id')] == {'new_id', 'other'}
+    assert keyIndex.added[('camera', 'id')] == {'new_id'}
+
+
+def test_keys_compare_like_the_default_collation(station_db):
+    #MySQL's default collations ignore case and trailing spaces
+    assert indexKey('Site1  ') == indexKey('site1') == 'site1'
+    assert indexKey(12) == '12'
+
+    with KeyIndex(station_db, verify=True) as keyIndex:
+        assert keyExists(station_db, 'camera', 'id', 'C1 ')
+        assert keyIndex.isin('station', 'shortName', ['ExampleXX', 'examplexx ', 'example']).tolist() == [True, True, False]
+
+        addKeys(station_db, 'camera', 'id', ['C9'])
+        assert keyExists(station_db, 'camera', 'id', 'c9')
+        removeKeys(station_db, 'camera', 'id', ['c9 '])
+        assert not keyExists(station_db, 'camera', 'id', 'C9')
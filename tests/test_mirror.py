@@ -0,0 +1,66 @@
+import os
+import sqlite3
+
+import pytest
+
+from coastcamDBfuncs import adaptQuery, createMirror, openMirror, getParameterDicts, fetch_rows, fetch_scalar
+
+
+class SQLiteServer:
+    '''
+    Wraps a SQLite connection so createMirror() can read from it the way it reads from the MySQL server. The cursor class
+    argument (SSCursor) is ignored.
+    '''
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def cursor(self, *args):
+        return self.connection.cursor()
+
+
+mirrored_tables = ['site', 'station', 'ip', 'camera', 'geometry']
+
+
+def test_adaptQuery(station_db):
+    assert adaptQuery("SELECT 1 FROM site WHERE id = %s", station_db) == "SELECT 1 FROM site WHERE id = ?"
+    assert adaptQuery("SELECT 1 FROM site WHERE id = %s", object()) == "SELECT 1 FROM site WHERE id = %s"
+
+
+def test_createMirror_copies_tables(station_db, tmp_path):
+    mirror_path = str(tmp_path / 'mirror.sqlite')
+
+    row_counts = createMirror(SQLiteServer(station_db), mirror_path, tables=mirrored_tables, chunkSize=2)
+
+    assert row_counts == {'site': 1, 'station': 2, 'ip': 1, 'camera': 3, 'geometry': 3}
+    assert not os.path.exists(mirror_path + '.tmp')
+
+    mirror = openMirror(mirror_path)
+    indexes = [row['name'] for row in fetch_rows(mirror, "SELECT name FROM sqlite_master WHERE type = 'index'")]
+    assert 'idx_camera_stationID' in indexes
+    assert 'idx_camera_timeIN' in indexes
+    assert int(fetch_scalar(mirror, "SELECT value FROM mirrorinfo WHERE name = %s", ('created',))) > 0
+    mirror.close()
+
+
+def test_mirror_gives_the_same_parameters(station_db, tmp_path):
+    mirror_path = str(tmp_path / 'mirror.sqlite')
+    createMirror(SQLiteServer(station_db), mirror_path, tables=mirrored_tables)
+    mirror = openMirror(mirror_path)
+
+    assert getParameterDicts('st1', mirror) == getParameterDicts('st1', station_db)
+    assert getParameterDicts('st1', mirror, useUnix=True, unix_time=2500) == getParameterDicts('st1', station_db, useUnix=True, unix_time=2500)
+    mirror.close()
+
+
+def test_mirror_is_read_only(station_db_path):
+    mirror = openMirror(station_db_path)
+
+    with pytest.raises(sqlite3.OperationalError):
+        mirror.execute("DELETE FROM camera")
+    mirror.close()
+
+
+def test_openMirror_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        openMirror(str(tmp_path / 'missing.sqlite'))
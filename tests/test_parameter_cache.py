@@ -0,0 +1,125 @@
+import time
+
+import numpy as np
+
+import coastcamDBfuncs
+from coastcamDBfuncs import Parameter, ParameterCache, getCachedParameter, filename2param
+
+
+def makeParameter():
+    extrinsics = [{'x': 1.0, 'y': 2.0, 'z': 3.0, 'a': 0.1, 't': 1.2, 'r': 0.0}]
+    intrinsics = [{'NU': 100, 'NV': 80, 'fx': 50.0, 'fy': 50.0, 'c0U': 50.0, 'c0V': 40.0, 'd1': 0.0, 'd2': 0.0, 'd3': 0.0, 't1': 0.0, 't2': 0.0}]
+    metadata = [{'name': 'station', 'camera_number': 1}]
+    local_origin = {'x': 0.0, 'y': 0.0, 'angd': 0.0}
+    return Parameter(extrinsics=extrinsics, intrinsics=intrinsics, metadata=metadata, local_origin=local_origin)
+
+
+def test_get_inside_and_outside_epoch():
+    cache = ParameterCache()
+    params = makeParameter()
+    cache.put('st1', 1000, 1999, params)
+
+    assert cache.get('st1', 1000) is params
+    assert cache.get('st1', 1999) is params
+    assert cache.get('st1', 2000) is None
+    assert cache.get('st2', 1500) is None
+
+
+def test_unbounded_epochs():
+    cache = ParameterCache()
+    params = makeParameter()
+    cache.put('st1', None, 999, params)
+    cache.put('st1', 3000, None, params)
+
+    assert cache.get('st1', -5) is params
+    assert cache.get('st1', 10 ** 10) is params
+    assert cache.get('st1', 2000) is None
+
+
+def test_least_recently_used_entry_is_dropped():
+    cache = ParameterCache(maxsize=2)
+    cache.put('a', 0, 9, makeParameter())
+    cache.put('b', 0, 9, makeParameter())
+
+    #touch 'a' so 'b' is the oldest
+    cache.get('a', 5)
+    cache.put('c', 0, 9, makeParameter())
+
+    assert len(cache) == 2
+    assert cache.get('b', 5) is None
+    assert cache.get('a', 5) is not None
+    assert cache.get('c', 5) is not None
+
+
+def test_ttl_expires_entries():
+    cache = ParameterCache(ttl=0.01)
+    cache.put('st1', 0, 9, makeParameter())
+    time.sleep(0.02)
+
+    assert cache.get('st1', 5) is None
+    assert len(cache) == 0
+
+
+def test_invalidate_one_station_or_all():
+    cache = ParameterCache()
+    cache.put('st1', 0, 9, makeParameter())
+    cache.put('st2', 0, 9, makeParameter())
+
+    cache.invalidate('st1')
+    assert cache.get('st1', 5) is None
+    assert cache.get('st2', 5) is not None
+
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_withTime_copy_is_independent():
+    params = makeParameter()
+    P = params.P
+
+    copy = params.withTime(date_time_str='2020-01-01 00:00:00')
+    copy.extrinsics[0]['x'] = 99.0
+    copy.metadata[0]['name'] = 'changed'
+    copy.local_origin['x'] = 5.0
+    copy.P[0, 0, 0] = 0.0
+
+    assert copy.date_time_str == '2020-01-01 00:00:00'
+    assert params.date_time_str is None
+    assert params.extrinsics[0]['x'] == 1.0
+    assert params.metadata[0]['name'] == 'station'
+    assert params.local_origin['x'] == 0.0
+    assert params.P is P
+    assert P[0, 0, 0] != 0.0
+
+
+def test_getCachedParameter_loads_each_epoch_once(station_db):
+    cache = ParameterCache()
+
+    params = getCachedParameter('st1', 1200, station_db, cache)
+    assert params.num_cameras == 1
+    assert len(cache) == 1
+
+    #same epoch (1000 to 1499) comes from the cache
+    assert getCachedParameter('st1', 1499, station_db, cache) is params
+
+    #both cameras are active from 1500
+    other = getCachedParameter('st1', 1600, station_db, cache)
+    assert other is not params
+    assert other.num_cameras == 2
+    assert len(cache) == 2
+
+    assert getCachedParameter('st1', 5000, station_db, cache) is None
+
+
+def test_filename2param_with_cache_returns_copies(station_db, monkeypatch):
+    monkeypatch.setattr(coastcamDBfuncs, 'station_indexes', {})
+    cache = ParameterCache()
+    filename = '1200.Thu.Jan.01_00_20_00.GMT.1970.examplexx.c1.snap.jpg'
+
+    first = filename2param(filename, station_db, useCache=True, cache=cache)
+    second = filename2param(filename, station_db, useCache=True, cache=cache)
+
+    assert first is not second
+    assert first.date_time_str == '1970-01-01 00:20:00'
+    assert np.array_equal(first.cameras, second.cameras)
+    assert len(cache) == 1
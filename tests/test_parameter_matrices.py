@@ -0,0 +1,61 @@
+import numpy as np
+
+from coastcamDBfuncs import Parameter, angles2R
+
+
+def makeParameter():
+    extrinsics = [{'x': 10.0, 'y': 20.0, 'z': 30.0, 'a': 0.3, 't': 1.2, 'r': 0.05},
+                  {'x': -5.0, 'y': 4.0, 'z': 12.0, 'a': 2.1, 't': 1.4, 'r': -0.02}]
+    intrinsics = [{'NU': 2448, 'NV': 2048, 'fx': 1500.0, 'fy': 1510.0, 'c0U': 1224.0, 'c0V': 1024.0, 'd1': -0.2, 'd2': 0.05, 'd3': 0.01, 't1': 0.001, 't2': -0.002},
+                  {'NU': 1000, 'NV': 750, 'fx': 1800.0, 'fy': 1790.0, 'c0U': 500.0, 'c0V': 375.0, 'd1': 0.0, 'd2': 0.0, 'd3': 0.0, 't1': 0.0, 't2': 0.0}]
+    local_origin = {'x': 5.0, 'y': -3.0, 'angd': 30.0}
+    return Parameter(extrinsics=extrinsics, intrinsics=intrinsics, local_origin=local_origin)
+
+
+def test_angles2R_is_a_rotation():
+    R = angles2R(np.array([0.3, 2.1]), np.array([1.2, 1.4]), np.array([0.05, -0.02]))
+
+    assert R.shape == (2, 3, 3)
+    for matrix in R:
+        assert np.allclose(matrix @ matrix.T, np.eye(3))
+        assert np.isclose(abs(np.linalg.det(matrix)), 1.0)
+    assert np.allclose(angles2R(0.3, 1.2, 0.05), R[0])
+
+
+def test_K_and_distortion_stacks():
+    params = makeParameter()
+
+    assert params.K.shape == (2, 3, 3)
+    assert np.array_equal(params.K[0], [[1500.0, 0.0, 1224.0], [0.0, -1510.0, 1024.0], [0.0, 0.0, 1.0]])
+    assert np.array_equal(params.distortion[0], [-0.2, 0.05, 0.01, 0.001, -0.002])
+
+
+def test_P_maps_camera_center_to_zero():
+    params = makeParameter()
+
+    assert np.allclose(params.P[:, 2, 3], 1.0)
+    for P, center in zip(params.P, params.camera_centers):
+        assert np.allclose(P @ np.append(center, 1.0), 0.0, atol=1e-9)
+
+
+def test_local_origin_round_trip():
+    params = makeParameter()
+    point = np.array([12.0, 7.0, 1.0])
+
+    local = params.local_origin_transform @ point
+    assert np.allclose(params.local_origin_transform @ np.array([5.0, -3.0, 1.0]), [0.0, 0.0, 1.0])
+    assert np.isclose(np.hypot(local[0], local[1]), np.hypot(7.0, 10.0))
+    assert np.allclose(params.local_origin_inverse @ local, point)
+
+
+def test_matrices_are_cached_until_cleared():
+    params = makeParameter()
+    P = params.P
+    assert params.P is P
+
+    params.extrinsics[0]['x'] = 0.0
+    assert params.P is P
+
+    params.clearMatrices()
+    assert params.P is not P
+    assert np.allclose(params.P[0] @ np.array([0.0, 20.0, 30.0, 1.0]), 0.0, atol=1e-9)
@@ -0,0 +1,27 @@
+from coastcamDBfuncs import insertWithPlaceholderID, KeyIndex, placeholder_id_prefix
+from conftest import RecordingConnection
+
+
+def test_row_is_inserted_with_a_temporary_id_then_renamed_by_seq():
+    connection = RecordingConnection()
+    connection.next_seq = 41
+
+    seq = insertWithPlaceholderID('camera', ['stationID', 'modelID'], ['st1', 'model1'], connection)
+
+    assert seq == 41
+    insert, update = connection.executed
+    assert insert == ("INSERT INTO camera (stationID, modelID, id) VALUES (%s, %s, CONCAT(%s, UUID_SHORT()))", ['st1', 'model1', placeholder_id_prefix])
+    assert update == ("UPDATE camera SET id = CONCAT(%s, seq) WHERE seq = %s", [placeholder_id_prefix, 41])
+    assert connection.commits == 1
+
+
+def test_placeholder_id_is_added_to_the_key_index():
+    connection = RecordingConnection()
+
+    with KeyIndex(connection) as keyIndex:
+        first = insertWithPlaceholderID('camera', ['stationID'], ['st1'], connection, commit=False)
+        second = insertWithPlaceholderID('camera', ['stationID'], ['st1'], connection, commit=False)
+
+    assert (first, second) == (1, 2)
+    assert keyIndex.added[('camera', 'id')] == {placeholder_id_prefix + '1', placeholder_id_prefix + '2'}
+    assert connection.commits == 0
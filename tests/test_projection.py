@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from coastcamDBfuncs import Parameter
+from coastcamDB_projection_funcs import distortNormalized, undistortNormalized, maxDistortionRadius2, world2image, image2world
+
+
+def makeParameter():
+    extrinsics = [{'x': 10.0, 'y': 20.0, 'z': 30.0, 'a': 0.3, 't': 1.2, 'r': 0.02},
+                  {'x': 10.0, 'y': 20.0, 'z': 30.0, 'a': 0.9, 't': 1.1, 'r': -0.01}]
+    intrinsics = [{'NU': 2448, 'NV': 2048, 'fx': 1500.0, 'fy': 1510.0, 'c0U': 1224.0, 'c0V': 1024.0, 'd1': -0.2, 'd2': 0.05, 'd3': 0.0, 't1': 0.001, 't2': -0.002},
+                  {'NU': None, 'NV': None, 'fx': 1800.0, 'fy': 1790.0, 'c0U': 500.0, 'c0V': 375.0, 'd1': 0.0, 'd2': 0.0, 'd3': 0.0, 't1': 0.0, 't2': 0.0}]
+    local_origin = {'x': 5.0, 'y': -3.0, 'angd': 30.0}
+    return Parameter(extrinsics=extrinsics, intrinsics=intrinsics, local_origin=local_origin)
+
+
+def groundPoints(params, camera=0):
+    #points on z = 0 around where the camera's viewing direction hits the ground
+    direction = params.R[camera][2]
+    center = params.camera_centers[camera]
+    hit = center - direction * center[2] / direction[2]
+    x, y = np.meshgrid(np.linspace(-15, 15, 7), np.linspace(-15, 15, 7))
+    return np.column_stack([hit[0] + x.ravel(), hit[1] + y.ravel(), np.zeros(x.size)])
+
+
+def test_undistort_inverts_distort():
+    coefficients = np.array([-0.2, 0.05, 0.0, 0.001, -0.002])
+    x, y = np.meshgrid(np.linspace(-0.6, 0.6, 9), np.linspace(-0.5, 0.5, 9))
+
+    xd, yd = distortNormalized(x, y, coefficients)
+    xu, yu = undistortNormalized(xd, yd, coefficients)
+
+    assert np.allclose(xu, x, atol=1e-10)
+    assert np.allclose(yu, y, atol=1e-10)
+
+
+def test_maxDistortionRadius2():
+    r2max = maxDistortionRadius2(np.array([[-0.2, 0.0, 0.0, 0.0, 0.0], [0.0, 0.0, 0.0, 0.0, 0.0], [0.1, 0.0, 0.0, 0.0, 0.0]]))
+
+    assert r2max[0] == pytest.approx(1 / 0.6)
+    assert np.isinf(r2max[1])
+    assert np.isinf(r2max[2])
+
+
+def test_world_image_round_trip():
+    params = makeParameter()
+    xyz = groundPoints(params)
+
+    U, V, valid = world2image(params, xyz, cameras=[0])
+    assert valid.all()
+
+    xyz_back = image2world(params, 0, U[0], V[0], z=0.0)
+    assert np.allclose(xyz_back, xyz, atol=1e-6)
+
+
+def test_round_trip_without_distortion_and_in_local_coordinates():
+    params = makeParameter()
+    xyz = groundPoints(params, camera=1)
+    local = params.local_origin_transform @ np.vstack([xyz[:, 0], xyz[:, 1], np.ones(len(xyz))])
+    local_xyz = np.column_stack([local[0], local[1], xyz[:, 2]])
+
+    U, V, valid = world2image(params, local_xyz, cameras=[1], distort=False, useLocal=True)
+    xyz_back = image2world(params, 1, U[0], V[0], undistort=False, useLocal=True)
+
+    assert np.allclose(xyz_back, local_xyz, atol=1e-6)
+
+
+def test_chunk_size_does_not_change_the_result():
+    params = makeParameter()
+    xyz = groundPoints(params)
+
+    U, V, valid = world2image(params, xyz)
+    U_chunked, V_chunked, valid_chunked = world2image(params, xyz, chunkSize=5)
+
+    assert U.shape == (2, len(xyz))
+    assert np.array_equal(U, U_chunked)
+    assert np.array_equal(valid, valid_chunked)
+    assert np.allclose(image2world(params, 0, U[0], V[0], chunkSize=4), xyz, atol=1e-6)
+
+
+def test_points_behind_or_outside_are_not_valid():
+    params = makeParameter()
+    center = params.camera_centers[0]
+    behind = center - 50 * params.R[0][2]
+    far_left = groundPoints(params)[0] + 500 * params.R[0][0]
+
+    U, V, valid = world2image(params, np.array([behind, far_left]), cameras=[0])
+
+    assert not valid[0].any()
@@ -0,0 +1,43 @@
+import decimal
+
+import pytest
+
+from coastcamDBfuncs import fetch_rows, fetch_scalar, exists, coerceRow, check_id, check_seq, id_seq_match, NoMatchIDError
+
+
+def test_coerceRow_converts_decimals():
+    row = coerceRow((decimal.Decimal('1.5'), 2, 'a', None))
+
+    assert row == [1.5, 2, 'a', None]
+    assert type(row[0]) is float
+
+
+def test_fetch_rows_returns_dicts(station_db):
+    rows = fetch_rows(station_db, "SELECT id, shortName FROM station WHERE siteID = %s ORDER BY seq", ('site1',))
+
+    assert rows == [{'id': 'st1', 'shortName': 'examplexx'}, {'id': 'st2', 'shortName': 'examplexxlong'}]
+    assert fetch_rows(station_db, "SELECT id FROM station WHERE id = %s", ('missing',)) == []
+
+
+def test_fetch_scalar(station_db):
+    assert fetch_scalar(station_db, "SELECT MAX(seq) FROM camera") == 3
+    assert fetch_scalar(station_db, "SELECT id FROM camera WHERE seq = %s", (2,)) == 'c2'
+    assert fetch_scalar(station_db, "SELECT id FROM camera WHERE seq = %s", (99,)) is None
+
+
+def test_exists(station_db):
+    assert exists(station_db, "SELECT 1 FROM site WHERE id = %s LIMIT 1", ('site1',))
+    assert not exists(station_db, "SELECT 1 FROM site WHERE id = %s LIMIT 1", ('site2',))
+
+
+def test_key_checks(station_db):
+    assert check_id('c1', 'camera', station_db) is None
+    assert isinstance(check_id('missing', 'camera', station_db), NoMatchIDError)
+
+    assert check_seq(1, 'geometry', station_db) is None
+    with pytest.raises(SystemExit):
+        check_seq(99, 'geometry', station_db)
+
+    assert id_seq_match('c2', 2, 'camera', station_db) is None
+    with pytest.raises(SystemExit):
+        id_seq_match('c1', 2, 'camera', station_db)
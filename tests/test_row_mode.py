@@ -0,0 +1,76 @@
+import pytest
+
+from coastcamDBfuncs import Site, Table, Column, idColumn, fkColumn, KeyIndex
+from conftest import RecordingConnection
+
+
+def gcpTable(connection, ids, siteIDs, xs):
+    table = Table('gcp', 'coastcamdb', connection)
+    table.siteID = fkColumn('siteID', table, siteIDs[0])
+    table.id = idColumn(table, ids[0])
+    table.x = Column('x', table, xs[0])
+    for ID, siteID, x in zip(ids[1:], siteIDs[1:], xs[1:]):
+        table.siteID.add2queue(siteID)
+        table.id.add2queue(ID)
+        table.x.add2queue(x)
+    return table
+
+
+def openKeyIndex(connection):
+    #keys preloaded so no SELECT DISTINCT is needed
+    keyIndex = KeyIndex(connection)
+    keyIndex.keys[('site', 'id')] = {'site1'}
+    keyIndex.keys[('gcp', 'id')] = {'g2'}
+    keyIndex.keys[('gcp', 'seq')] = set()
+    keyIndex.keys[('gcp', 'siteID')] = {'site1'}
+    return keyIndex
+
+
+def test_rows_are_written_with_multi_row_inserts():
+    connection = RecordingConnection()
+    table = gcpTable(connection, ['g1', 'g3', 'g4'], ['site1'] * 3, [1.0, 3.0, 4.0])
+
+    with openKeyIndex(connection) as keyIndex:
+        seq_list = table.insertRows2db(batchSize=2)
+
+    assert seq_list == [1, 2, 3]
+    assert table.inserted_seqs == seq_list
+    inserts = [(query, args) for query, args in connection.executed if query.startswith('INSERT')]
+    assert inserts[0] == ("INSERT INTO gcp (siteID, id, x) VALUES (%s, %s, %s), (%s, %s, %s)", ['site1', 'g1', 1.0, 'site1', 'g3', 3.0])
+    assert len(inserts) == 2
+    assert table.id.value_list == []
+    assert keyIndex.keys[('gcp', 'id')] == {'g1', 'g2', 'g3', 'g4'}
+    assert keyIndex.keys[('gcp', 'seq')] == {'1', '2', '3'}
+
+
+def test_duplicate_ids_are_skipped_and_seqs_stay_aligned():
+    connection = RecordingConnection()
+    table = gcpTable(connection, ['g1', 'g2', 'g3'], ['site1'] * 3, [1.0, 2.0, 3.0])
+
+    with openKeyIndex(connection):
+        seq_list = table.insertRows2db()
+
+    assert seq_list == [1, None, 2]
+    insert = [args for query, args in connection.executed if query.startswith('INSERT')][0]
+    assert insert == ['site1', 'g1', 1.0, 'site1', 'g3', 3.0]
+
+
+def test_missing_foreign_key_stops_the_insert():
+    connection = RecordingConnection()
+    table = gcpTable(connection, ['g1'], ['site9'], [1.0])
+
+    with openKeyIndex(connection):
+        with pytest.raises(SystemExit):
+            table.insertRows2db()
+
+    assert connection.executed == []
+
+
+def test_column_lengths_must_match():
+    connection = RecordingConnection()
+    table = gcpTable(connection, ['g1', 'g3'], ['site1', 'site1'], [1.0, 3.0])
+    table.x.value_list.pop()
+
+    with openKeyIndex(connection):
+        with pytest.raises(SystemExit):
+            table.insertRows2db()
@@ -0,0 +1,28 @@
+from coastcamDBfuncs import get_rows_in, loadSiteSnapshot, snapshot2list
+
+
+def test_get_rows_in_chunks_and_skips_blanks(site_db):
+    result = get_rows_in('camera', 'id', ['c3', 'c1', None, '', 'c1', 'missing', 'c2'], site_db, chunkSize=2)
+
+    assert sorted(result['id'].tolist()) == ['c1', 'c2', 'c3']
+    assert get_rows_in('camera', 'id', [], site_db).empty
+
+
+def test_snapshot_holds_only_the_site_rows(site_db):
+    snapshot = loadSiteSnapshot('site1', site_db)
+
+    assert list(snapshot.keys()) == ['site', 'station', 'camera', 'cameramodel', 'lensmodel', 'ip', 'gcp', 'geometry', 'usedgcp']
+    assert snapshot['station']['id'].tolist() == ['st1', 'st2']
+    assert snapshot['camera']['id'].tolist() == ['c1', 'c2', 'c3']
+    #shared by every camera, listed once
+    assert snapshot['cameramodel']['id'].tolist() == ['model1']
+    assert snapshot['ip']['id'].tolist() == ['ip1']
+    assert snapshot['geometry']['seq'].tolist() == [1, 2, 3]
+    assert snapshot['usedgcp']['seq'].tolist() == [1, 2]
+
+
+def test_snapshot2list_drops_empty_tables(site_db):
+    site_db.execute("DELETE FROM usedgcp")
+    df_list = snapshot2list(loadSiteSnapshot('site1', site_db))
+
+    assert [table for table, result in df_list] == ['site', 'station', 'camera', 'cameramodel', 'lensmodel', 'ip', 'gcp', 'geometry']
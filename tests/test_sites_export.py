@@ -0,0 +1,46 @@
+import os
+import sqlite3
+
+from coastcamDBfuncs import DBSession, sites2csv
+
+
+class SQLiteSession(DBSession):
+    '''
+    DBSession whose pooled connections are opened on a SQLite file instead of a MySQL server.
+    '''
+
+    def __init__(self, path, poolSize=2):
+        DBSession.__init__(self, poolSize=poolSize)
+        self.path = path
+        self.opened = 0
+
+    def newConnection(self):
+        self.opened = self.opened + 1
+        return sqlite3.connect(self.path, check_same_thread=False)
+
+
+def test_sites_are_exported_in_parallel(site_db, station_db_path, tmp_path):
+    session = SQLiteSession(station_db_path)
+
+    results = sites2csv(['site1', 'site2'], str(tmp_path), session, maxWorkers=2)
+
+    assert [result['siteID'] for result in results] == ['site1', 'site2']
+    assert [result['error'] for result in results] == [None, None]
+    assert results[0]['tables'] == 9
+    assert os.path.exists(str(tmp_path) + '/sites/site1/tables/usedgcp.csv')
+    assert os.path.exists(str(tmp_path) + '/sites/site2/tables/camera.csv')
+    assert session.opened <= 2
+
+
+def test_failed_site_does_not_stop_the_rest(site_db, station_db_path, tmp_path):
+    session = SQLiteSession(station_db_path, poolSize=1)
+
+    #a file where the site folder should go makes the export of site2 fail
+    os.makedirs(str(tmp_path) + '/sites')
+    open(str(tmp_path) + '/sites/site2', 'w').close()
+
+    results = sites2csv(['site2', 'site1'], str(tmp_path), session, maxWorkers=2)
+
+    assert results[0]['error'] != None
+    assert results[1]['error'] == None
+    assert results[1]['seconds'] >= 0
@@ -0,0 +1,110 @@
+import sqlite3
+
+import pytest
+
+import coastcamDBfuncs
+from coastcamDBfuncs import ShortNameMatcher, StationIndex, stationIndexFor, statementTable, executeStatement, UnitOfWork
+from conftest import buildStationDB
+
+
+@pytest.fixture(autouse=True)
+def fresh_station_indexes(monkeypatch):
+    monkeypatch.setattr(coastcamDBfuncs, 'station_indexes', {})
+
+
+def test_matcher_finds_every_pattern():
+    matcher = ShortNameMatcher(['he', 'she', 'his', 'hers'])
+
+    assert matcher.findAll('ushers') == ['she', 'he', 'hers']
+    assert matcher.findAll('xyz') == []
+
+
+def test_matcher_overlapping_and_empty_patterns():
+    matcher = ShortNameMatcher(['', 'aa', 'a'])
+
+    assert matcher.findAll('aaa') == ['a', 'aa', 'a', 'aa', 'a']
+    assert ShortNameMatcher([]).findAll('anything') == []
+
+
+def test_lookup_argus_filename_is_exact(station_db):
+    index = StationIndex()
+
+    assert index.lookup('dir/1200.Thu.Jan.01_00_00_00.GMT.1970.examplexx.c1.snap.jpg', station_db) == ('examplexx', 'st1')
+    assert index.getID('examplexxlong') == 'st2'
+    assert index.getID('missing') is None
+
+
+def test_lookup_fallback_prefers_longest_match(station_db):
+    index = StationIndex()
+
+    assert index.lookup('C:\\images\\examplexxlong_cam1.jpg', station_db) == ('examplexxlong', 'st2')
+    assert index.lookup('examplexx_cam1.jpg', station_db) == ('examplexx', 'st1')
+    assert index.lookup('unknown.jpg', station_db) == (None, None)
+
+
+def test_refresh_only_when_station_table_changes(station_db):
+    index = StationIndex(checkInterval=0)
+    index.ensureCurrent(station_db)
+    signature = index.signature
+
+    index.ensureCurrent(station_db)
+    assert index.signature == signature
+
+    station_db.execute("INSERT INTO station VALUES (3, 'st3', 'site1', 'New station', 'newstation')")
+    index.ensureCurrent(station_db)
+    assert index.signature != signature
+    assert index.getID('newstation') == 'st3'
+
+
+def test_check_interval_delays_refresh(station_db):
+    index = StationIndex(checkInterval=3600)
+    index.ensureCurrent(station_db)
+
+    station_db.execute("INSERT INTO station VALUES (3, 'st3', 'site1', 'New station', 'newstation')")
+    index.ensureCurrent(station_db)
+    assert index.getID('newstation') is None
+
+    index.refresh(station_db)
+    assert index.getID('newstation') == 'st3'
+
+
+def test_each_connection_has_its_own_index(station_db, tmp_path):
+    #a mirror that doesn't have station st2 yet
+    mirror_path = str(tmp_path / 'mirror.db')
+    buildStationDB(mirror_path)
+    mirror = sqlite3.connect(mirror_path)
+    mirror.execute("DELETE FROM station WHERE id = 'st2'")
+
+    assert stationIndexFor(station_db) is stationIndexFor(station_db)
+    assert stationIndexFor(mirror) is not stationIndexFor(station_db)
+    assert stationIndexFor(station_db).lookup('examplexxlong_cam1.jpg', station_db) == ('examplexxlong', 'st2')
+    assert stationIndexFor(mirror).lookup('examplexxlong_cam1.jpg', mirror) == ('examplexx', 'st1')
+    mirror.close()
+
+
+def test_statementTable():
+    assert statementTable("UPDATE station SET shortName = %s WHERE id = %s") == 'station'
+    assert statementTable("INSERT INTO `Station` (id) VALUES (%s)") == 'station'
+    assert statementTable("INSERT IGNORE INTO camera(id) VALUES (%s)") == 'camera'
+    assert statementTable("DELETE FROM station WHERE id = %s") == 'station'
+    assert statementTable("SELECT * FROM station") == None
+
+
+def test_station_writes_invalidate_the_index(station_db):
+    index = stationIndexFor(station_db)
+    index.checkInterval = 3600
+    index.ensureCurrent(station_db)
+
+    #a rename doesn't change the row count or MAX(seq)
+    executeStatement(station_db, "UPDATE station SET shortName = ? WHERE id = ?", ('renamed', 'st1'))
+    assert index.lookup('renamed_cam1.jpg', station_db) == ('renamed', 'st1')
+
+    #rows from a rolled back transaction don't stay in the index
+    with pytest.raises(RuntimeError):
+        with UnitOfWork(station_db):
+            executeStatement(station_db, "UPDATE station SET shortName = ? WHERE id = ?", ('rolledback', 'st1'))
+            assert index.getID('rolledback') == None
+            assert index.lookup('rolledback_cam1.jpg', station_db) == ('rolledback', 'st1')
+            raise RuntimeError('failed')
+    assert index.lookup('rolledback_cam1.jpg', station_db) == (None, None)
+    assert index.getID('renamed') == 'st1'
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from coastcamDBfuncs import getStationRows, getParameterDicts, rows2parameterDicts
+from conftest import K1, kc1, K2
+
+
+def test_getStationRows_joins_every_camera_geometry_pair(station_db):
+    rows = getStationRows('st1', station_db)
+
+    assert [(row['cameraID'], row['geometrySequence']) for row in rows] == [('c1', 1), ('c1', 2), ('c2', 3)]
+    assert rows[0]['stationName'] == 'Example station'
+    assert rows[0]['width'] == 2448
+    assert rows[0]['UTMEasting'] == 400000.0
+
+
+def test_getStationRows_filters_on_unix_time(station_db):
+    rows = getStationRows('st1', station_db, useUnix=True, unix_time=1200)
+    assert set(row['cameraID'] for row in rows) == {'c1'}
+
+    rows = getStationRows('st1', station_db, useUnix=True, unix_time=2500)
+    assert set(row['cameraID'] for row in rows) == {'c2'}
+
+
+def test_rows2parameterDicts_uses_first_geometry_row(station_db):
+    extrinsics, intrinsics, metadata, local_origin = rows2parameterDicts(getStationRows('st1', station_db))
+
+    assert len(extrinsics) == len(intrinsics) == len(metadata) == 2
+    assert extrinsics[0] == {'x': 10.0, 'y': 20.0, 'z': 30.0, 'a': 0.1, 't': 1.2, 'r': 0.01}
+    assert metadata[1]['serial_number'] == 'SN2'
+    assert local_origin == {'x': 400000.0, 'y': 3700000.0, 'angd': 30.0}
+
+
+def test_rows2parameterDicts_decodes_blob_and_text_arrays(station_db):
+    extrinsics, intrinsics, metadata, local_origin = rows2parameterDicts(getStationRows('st1', station_db))
+
+    assert intrinsics[0]['fx'] == K1[0][0]
+    assert intrinsics[0]['c0V'] == K1[1][2]
+    assert intrinsics[0]['d1'] == pytest.approx(kc1[0])
+    assert intrinsics[1]['fy'] == pytest.approx(K2[1][1])
+    assert intrinsics[1]['NU'] == 2448
+
+
+def test_rows2parameterDicts_null_arrays_give_none(station_db):
+    extrinsics, intrinsics, metadata, local_origin = rows2parameterDicts(getStationRows('st2', station_db))
+
+    for field in ['fx', 'fy', 'c0U', 'c0V', 'd1', 'd2', 'd3', 't1', 't2']:
+        assert intrinsics[0][field] is None
+    assert extrinsics[0]['a'] is None
+
+
+def test_getParameterDicts_unknown_station_returns_none(station_db):
+    assert getParameterDicts('missing', station_db) is None
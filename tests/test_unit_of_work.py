@@ -0,0 +1,90 @@
+import threading
+
+import pymysql
+import pytest
+
+import coastcamDBfuncs
+from coastcamDBfuncs import UnitOfWork, DBSession, commitWrite, executeBatch, executeStatement, inUnitOfWork
+from conftest import RecordingConnection
+
+
+class FailingConnection(RecordingConnection):
+
+    def cursor(self, *args):
+        cursor = RecordingConnection.cursor(self)
+
+        def execute(query, args=None):
+            raise pymysql.MySQLError('write failed')
+
+        cursor.execute = execute
+        return cursor
+
+
+class RecordingSession(DBSession):
+
+    def newConnection(self):
+        return RecordingConnection()
+
+
+def test_commits_are_deferred_to_the_end():
+    connection = RecordingConnection()
+
+    with UnitOfWork(connection):
+        commitWrite(connection)
+        executeBatch(connection, "A", [(1,), (2,)], batchSize=1)
+        assert connection.commits == 0
+
+    assert connection.commits == 1
+    assert coastcamDBfuncs.open_units_of_work == {}
+
+
+def test_only_the_outer_unit_commits():
+    connection = RecordingConnection()
+
+    with UnitOfWork(connection):
+        with UnitOfWork(connection):
+            commitWrite(connection)
+        assert connection.commits == 0
+        assert inUnitOfWork(connection)
+
+    assert connection.commits == 1
+    assert not inUnitOfWork(connection)
+
+
+def test_rollback_on_error():
+    connection = RecordingConnection()
+
+    with pytest.raises(RuntimeError):
+        with UnitOfWork(connection):
+            raise RuntimeError('failed')
+
+    assert connection.commits == 0
+    assert connection.rollbacks == 1
+
+
+def test_db_errors_are_raised_inside_a_unit_of_work():
+    connection = FailingConnection()
+
+    #printed and skipped outside
+    assert executeStatement(connection, "A", (1,)) == 0
+
+    with pytest.raises(pymysql.MySQLError):
+        with UnitOfWork(connection):
+            executeStatement(connection, "A", (1,))
+    assert connection.rollbacks == 1
+
+
+def test_session_unit_of_work_belongs_to_one_thread():
+    session = RecordingSession(poolSize=2)
+    seen = []
+
+    with UnitOfWork(session):
+        assert inUnitOfWork(session)
+        assert inUnitOfWork(session.threadConnection())
+
+        thread = threading.Thread(target=lambda: seen.append(inUnitOfWork(session)))
+        thread.start()
+        thread.join()
+
+    assert seen == [False]
+    assert session.threadConnection().commits == 1